@@ -1,50 +1,305 @@
+import time
+_IMPORT_STARTED_AT = time.perf_counter()
+
+import hmac
+import io
+import multiprocessing as mp
 import os
-from flask import Flask, request, jsonify
+import sqlite3
+import tempfile
+from concurrent.futures import TimeoutError as OCRTimeout
+from flask import Flask, Request, Response, g, request, jsonify
 from flask_cors import CORS
-from ocr_engine import extract_plate_text
-from models import find_owner_by_plate
+from ocr_engine import (OCRQueueFull, extract_plate_text, extract_plate_texts,
+                        image_cache, ocr_stats)
+from models import (find_owner_by_plate, find_plate_candidates, find_sightings, owner_cache,
+                    parse_timestamp)
+from image_io import archive
+from sightings import sighting_writer
+from plate_index import plate_index
+from stream_recognizer import VideoTooLong, recognize_video
+from bulk_import import import_rows
+import metrics
+import startup
+
+MAX_UPLOAD_MB = int(os.environ.get("MAX_UPLOAD_MB", "16"))
+OCR_RETRY_AFTER_S = int(os.environ.get("OCR_RETRY_AFTER_S", "1"))
+DB_RETRY_AFTER_S = int(os.environ.get("DB_RETRY_AFTER_S", "1"))
+# Sin ADMIN_TOKEN los endpoints de administración quedan deshabilitados.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+ADMIN_MAX_ROWS = int(os.environ.get("ADMIN_MAX_ROWS", "10000"))
+# /api/lookup_video procesa el video dentro de la petición: estos límites lo
+# mantienen por debajo del --timeout de Gunicorn (60 s en el Procfile).
+# 0 desactiva el límite.
+VIDEO_MAX_FRAMES = int(os.environ.get("VIDEO_MAX_FRAMES", "1800")) or None
+VIDEO_MAX_SECONDS = float(os.environ.get("VIDEO_MAX_SECONDS", "45")) or None
+
+class InMemoryRequest(Request):
+    # Werkzeug manda a un archivo temporal las subidas de más de 500 KB;
+    # las imágenes se mantienen en memoria (acotadas por MAX_CONTENT_LENGTH).
+    def _get_file_stream(self, total_content_length, content_type,
+                         filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024
 CORS(app)
 
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+startup.record_import(_IMPORT_STARTED_AT)
+# El modelo y la BD se cargan en segundo plano. No se arranca en los procesos
+# del pool de OCR ni en el proceso vigilante del reloader de Flask.
+if mp.parent_process() is None and (
+        __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+    startup.start_warmup()
+
+# Errores que los endpoints dejan pasar para que los atiendan los manejadores
+# de abajo con su propio código HTTP (en vez de un 500 genérico).
+PASSTHROUGH_ERRORS = (OCRQueueFull, OCRTimeout, sqlite3.Error)
+
+def error_response(kind, message, status, **extra):
+    # `kind` es la etiqueta del error en /metrics.
+    g.error_kind = kind
+    return jsonify({"error": message, **extra}), status
+
+@app.before_request
+def start_request_metrics():
+    metrics.begin_request()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or "unknown"
+    if endpoint == "prometheus_metrics":
+        return response
+
+    metrics.requests_seconds.observe(metrics.request_elapsed(), endpoint=endpoint,
+                                     status=response.status_code)
+    if response.status_code >= 400:
+        kind = g.get("error_kind", f"http_{response.status_code}")
+        metrics.errors.inc(endpoint=endpoint, error=kind)
+    if metrics.METRICS_SERVER_TIMING:
+        response.headers["Server-Timing"] = metrics.server_timing()
+    return response
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return error_response("too_large", f"El archivo excede {MAX_UPLOAD_MB} MB.", 413)
+
+@app.errorhandler(OCRQueueFull)
+def ocr_queue_full(e):
+    response, status = error_response("queue_full", "Servidor saturado, intenta de nuevo.", 503)
+    response.headers["Retry-After"] = str(OCR_RETRY_AFTER_S)
+    return response, status
+
+@app.errorhandler(OCRTimeout)
+def ocr_timeout(e):
+    return error_response("ocr_timeout", "El OCR tardó demasiado, intenta de nuevo.", 504)
+
+@app.errorhandler(sqlite3.Error)
+def database_error(e):
+    response, status = error_response("database", "Base de datos no disponible.", 503)
+    response.headers["Retry-After"] = str(DB_RETRY_AFTER_S)
+    return response, status
 
 @app.route("/", methods=["GET"])
 def index():
     return jsonify({"status": "API activa", "message": "Sistema de detección de placas"}), 200
 
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok"}), 200
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    report = startup.readiness()
+    return jsonify(report), 200 if report["ready"] else 503
+
 @app.route("/api/lookup_plate", methods=["POST"])
 def lookup_plate():
     try:
         if "image" not in request.files:
-            return jsonify({"error": "No se envió ninguna imagen."}), 400
+            return error_response("bad_request", "No se envió ninguna imagen.", 400)
 
         file = request.files["image"]
         if file.filename == "":
-            return jsonify({"error": "Archivo vacío."}), 400
+            return error_response("bad_request", "Archivo vacío.", 400)
 
-        image_path = os.path.join(UPLOAD_FOLDER, file.filename)
-        file.save(image_path)
+        with metrics.stage("upload"):
+            data = file.read()
+        if archive is not None:
+            archive.submit(data, file.filename)
 
-        plate_text, confidence = extract_plate_text(image_path)
+        plate_text, confidence = extract_plate_text(data)
+        if sighting_writer is not None:
+            sighting_writer.record(plate_text, request.form.get("camera"), confidence)
 
         if not plate_text:
-            return jsonify({
-                "error": "No se detectó ninguna placa.",
-                "ocr_confidence": confidence
-            }), 404
+            return error_response("no_plate", "No se detectó ninguna placa.", 404,
+                                  ocr_confidence=confidence)
 
         owner = find_owner_by_plate(plate_text)
-
-        return jsonify({
+        response = {
             "plate": plate_text,
             "ocr_confidence": confidence,
             "owner": owner
-        }), 200
+        }
+        if owner is None:
+            # La lectura puede traer errores del OCR (O/0, B/8...): se
+            # proponen las placas registradas más parecidas.
+            response["candidates"] = find_plate_candidates(plate_text)
+
+        return jsonify(response), 200
+
+    except PASSTHROUGH_ERRORS:
+        raise
+    except Exception as e:
+        return error_response("internal", str(e), 500)
+
+@app.route("/api/lookup_plates", methods=["POST"])
+def lookup_plates():
+    try:
+        files = [f for f in request.files.getlist("images") if f.filename != ""]
+        if not files:
+            return error_response("bad_request", "No se envió ninguna imagen.", 400)
+
+        images = []
+        for file in files:
+            with metrics.stage("upload"):
+                data = file.read()
+            if archive is not None:
+                archive.submit(data, file.filename)
+            images.append(data)
+
+        camera = request.form.get("camera")
+        results = []
+        for file, (plate_text, confidence) in zip(files, extract_plate_texts(images)):
+            if sighting_writer is not None:
+                sighting_writer.record(plate_text, camera, confidence)
+            if not plate_text:
+                results.append({
+                    "filename": file.filename,
+                    "error": "No se detectó ninguna placa.",
+                    "ocr_confidence": confidence
+                })
+                continue
+
+            result = {
+                "filename": file.filename,
+                "plate": plate_text,
+                "ocr_confidence": confidence,
+                "owner": find_owner_by_plate(plate_text)
+            }
+            if result["owner"] is None:
+                result["candidates"] = find_plate_candidates(plate_text)
+            results.append(result)
+
+        return jsonify({"results": results}), 200
 
+    except PASSTHROUGH_ERRORS:
+        raise
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response("internal", str(e), 500)
+
+@app.route("/api/lookup_video", methods=["POST"])
+def lookup_video():
+    try:
+        if "video" not in request.files:
+            return error_response("bad_request", "No se envió ningún video.", 400)
+
+        file = request.files["video"]
+        if file.filename == "":
+            return error_response("bad_request", "Archivo vacío.", 400)
+
+        # OpenCV solo abre videos desde una ruta: se usa un temporal único.
+        suffix = os.path.splitext(file.filename)[1] or ".mp4"
+        with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+            file.save(tmp)
+            tmp.flush()
+            vehicles, stats = recognize_video(tmp.name, max_frames=VIDEO_MAX_FRAMES,
+                                              max_seconds=VIDEO_MAX_SECONDS, strict=True)
+
+        camera = request.form.get("camera")
+        for vehicle in vehicles:
+            vehicle["owner"] = find_owner_by_plate(vehicle["plate"])
+            if sighting_writer is not None:
+                sighting_writer.record(vehicle["plate"], camera, vehicle["confidence"],
+                                       source="video")
+
+        return jsonify({"vehicles": vehicles, "stats": stats}), 200
+
+    except PASSTHROUGH_ERRORS:
+        raise
+    except VideoTooLong as e:
+        return error_response("too_large", str(e), 413)
+    except ValueError as e:
+        return error_response("bad_request", str(e), 400)
+    except Exception as e:
+        return error_response("internal", str(e), 500)
+
+@app.route("/api/sightings", methods=["GET"])
+def list_sightings():
+    try:
+        args = request.args
+        try:
+            since = parse_timestamp(args.get("since"))
+            until = parse_timestamp(args.get("until"))
+            limit = int(args.get("limit", 50))
+            items, next_cursor = find_sightings(
+                plate=args.get("plate"), camera=args.get("camera"), since=since,
+                until=until, limit=limit, cursor=args.get("cursor"))
+        except ValueError:
+            return error_response("bad_request", "Parámetros de consulta inválidos.", 400)
+
+        return jsonify({"sightings": items, "next_cursor": next_cursor}), 200
+
+    except PASSTHROUGH_ERRORS:
+        raise
+    except Exception as e:
+        return error_response("internal", str(e), 500)
+
+def _is_admin(req):
+    if not ADMIN_TOKEN:
+        return False
+    token = req.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(token, ADMIN_TOKEN)
+
+@app.route("/api/admin/vehicles", methods=["POST"])
+def admin_upsert_vehicles():
+    if not _is_admin(request):
+        return error_response("unauthorized", "No autorizado.", 401)
+
+    try:
+        payload = request.get_json(silent=True)
+        rows = payload.get("vehicles") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not rows:
+            return error_response("bad_request", "Se espera una lista de vehículos.", 400)
+        if len(rows) > ADMIN_MAX_ROWS:
+            return error_response(
+                "too_large", f"Máximo {ADMIN_MAX_ROWS} vehículos por petición; usa bulk_import.py.", 413)
+
+        summary = import_rows(rows)
+        return jsonify(summary), 200
+
+    except sqlite3.Error:
+        raise
+    except Exception as e:
+        return error_response("internal", str(e), 500)
+
+@app.route("/api/ocr/stats", methods=["GET"])
+def ocr_status():
+    return jsonify(ocr_stats()), 200
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({
+        "owner_cache": owner_cache.stats(),
+        "image_cache": image_cache.stats() if image_cache is not None else None,
+        "plate_index": {"plates": len(plate_index)} if plate_index is not None else None
+    }), 200
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,126 @@
+"""bench_detector.py — Tiempo por etapa del detector original vs. el modo rápido (pirámide + top-N).
+
+Conjuntos de imágenes:
+- sample:    cuadros de los videos de demostración del módulo (MODULO 4/*.mp4)
+- synthetic: escenas sintéticas con placa en perspectiva, ruido y desenfoque,
+             con verdad de terreno para medir la tasa de acierto (IoU >= 0.5).
+
+Uso:
+    python benchmarks/bench_detector.py --synthetic 50 --frames 10 --top-n 3
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from plate_detector import detect_plate_candidates  # noqa: E402
+from synthetic import box_iou, sample_video_frames, synthetic_scene  # noqa: E402
+
+VIDEO_GLOB = os.path.join(HERE, "..", "..", "..", "*.mp4")
+
+
+def legacy_detect(image, timings):
+    """Detector original (resolución completa + máscara por candidata), con tiempos por etapa."""
+    t = time.perf_counter()
+
+    def lap(stage):
+        nonlocal t
+        now = time.perf_counter()
+        timings[stage] += now - t
+        t = now
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    lap("gray")
+    bfilter = cv2.bilateralFilter(gray, 11, 17, 17)
+    edged = cv2.Canny(bfilter, 30, 200)
+    lap("edges")
+    keypoints = cv2.findContours(edged.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    contours = keypoints[0] if len(keypoints) == 2 else keypoints[1]
+    lap("contours")
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)[:10]
+    box = None
+    for c in contours:
+        perimeter = cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, 0.018 * perimeter, True)
+        if len(approx) == 4:
+            mask = np.zeros(gray.shape, np.uint8)
+            cv2.drawContours(mask, [approx], 0, 255, -1)
+            x, y = np.where(mask == 255)
+            if len(x) == 0:
+                continue
+            box = (int(y.min()), int(x.min()), int(y.max() - y.min() + 1), int(x.max() - x.min() + 1))
+            break
+    lap("ranking")
+    if box is not None:
+        bx, by, bw, bh = box
+        _ = gray[by:by + bh, bx:bx + bw]
+    lap("crop")
+    return [box] if box is not None else []
+
+
+def fast_detect(image, timings, top_n, max_side):
+    candidates = detect_plate_candidates(image, top_n=top_n, max_side=max_side, timings=timings)
+    return [c["box"] for c in candidates]
+
+
+def run(name, images, detect, truths=None):
+    timings = defaultdict(float)
+    total = 0.0
+    hits = 0
+    for i, image in enumerate(images):
+        t0 = time.perf_counter()
+        boxes = detect(image, timings)
+        total += time.perf_counter() - t0
+        if truths is not None and any(box_iou(b, truths[i]) >= 0.5 for b in boxes):
+            hits += 1
+
+    n = max(len(images), 1)
+    stages = "  ".join(f"{k}={v / n * 1000:.2f}" for k, v in timings.items())
+    line = f"  {name:<7} total={total / n * 1000:.2f} ms/img  [{stages}]"
+    if truths is not None:
+        line += f"  acierto={hits / n:.0%}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark por etapa del detector de placas")
+    parser.add_argument("--synthetic", type=int, default=50, help="Escenas sintéticas")
+    parser.add_argument("--frames", type=int, default=10, help="Cuadros por video de muestra")
+    parser.add_argument("--top-n", type=int, default=3, help="Candidatas del modo rápido")
+    parser.add_argument("--max-side", type=int, default=640, help="Lado mayor del nivel de pirámide")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fast = lambda image, timings: fast_detect(image, timings, args.top_n, args.max_side)  # noqa: E731
+
+    samples = []
+    for path in sorted(glob.glob(VIDEO_GLOB)):
+        samples.extend(sample_video_frames(path, args.frames))
+    if samples:
+        h, w = samples[0].shape[:2]
+        print(f"Muestras del repositorio: {len(samples)} cuadros de {w}x{h}")
+        run("legacy", samples, legacy_detect)
+        run("fast", samples, fast)
+
+    rng = np.random.default_rng(args.seed)
+    scenes = [synthetic_scene(rng) for _ in range(args.synthetic)]
+    images = [s[0] for s in scenes]
+    truths = [s[2] for s in scenes]
+    print(f"Sintéticas: {len(images)} escenas de 1280x720")
+    run("legacy", images, legacy_detect, truths)
+    run("fast", images, fast, truths)
+
+
+if __name__ == "__main__":
+    main()
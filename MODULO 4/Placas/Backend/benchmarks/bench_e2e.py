@@ -0,0 +1,283 @@
+"""bench_e2e.py — Benchmark de punta a punta del backend de placas, sin red ni datos externos.
+
+1. Genera escenas sintéticas (placa en perspectiva, ruido y desenfoque) y un
+   padrón sintético en una BD temporal; una parte de las placas de las
+   escenas no está registrada a propósito.
+2. Mide la exactitud por etapa: detección (IoU >= 0.5 con la caja real),
+   lectura del OCR (placa exacta y por carácter) y propietario devuelto.
+3. Lanza carga concurrente contra la app Flask (cliente de pruebas, un
+   hilo por usuario) y mide rendimiento y latencias p50/p95/p99.
+4. Agrega una línea JSON con la configuración y los resultados al archivo
+   de salida, para comparar corridas en el tiempo.
+
+La configuración del backend (DETECTOR_MODE, OCR_MODE, OCR_WORKERS...) se
+toma de las variables de entorno como en producción. La caché de imágenes
+se apaga salvo con --image-cache, para no medir solo aciertos de caché.
+
+Uso:
+    python benchmarks/bench_e2e.py --scenes 100 --registry 100000 --requests 400 --concurrency 1 4 8
+    DETECTOR_MODE=fast OCR_MODE=recognize python benchmarks/bench_e2e.py
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(HERE, "..")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, HERE)
+
+from synthetic import box_iou, random_plate_text, synthetic_scene  # noqa: E402
+
+CONFIG_VARS = ("DETECTOR_MODE", "DETECTOR_TOP_N", "OCR_MODE", "OCR_WORKERS", "OCR_BATCH_MAX_SIZE",
+               "OCR_BATCH_MAX_WAIT_MS", "IMAGE_CACHE_SIZE", "PLATE_INDEX_ENABLED")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def peak_rss_mb():
+    # ru_maxrss está en KB en Linux; los hijos son los procesos del pool de OCR.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"process": own / 1024, "largest_child": children / 1024}
+
+
+def make_dataset(rng, scenes, registered_ratio):
+    dataset = []
+    for _ in range(scenes):
+        image, text, box = synthetic_scene(rng)
+        _, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        dataset.append({
+            "image": image,
+            "jpeg": encoded.tobytes(),
+            "plate": text,
+            "box": box,
+            "registered": bool(rng.random() < registered_ratio),
+        })
+    return dataset
+
+
+def registry_rows(rng, dataset, size):
+    """Filas del padrón: las placas registradas de las escenas y relleno aleatorio."""
+    taken = {d["plate"] for d in dataset}
+    owner_id = 0
+    for d in dataset:
+        if d["registered"]:
+            owner_id += 1
+            d["owner_name"] = f"Propietario {owner_id}"
+            yield {"owner_id": owner_id, "owner_name": d["owner_name"], "plate": d["plate"],
+                   "brand": "Nissan", "model": "Versa", "year": 2020}
+    while owner_id < size:
+        plate = random_plate_text(rng)
+        if plate in taken:
+            continue
+        taken.add(plate)
+        owner_id += 1
+        yield {"owner_id": owner_id, "owner_name": f"Propietario {owner_id}", "plate": plate,
+               "brand": "Toyota", "model": "Corolla", "year": 2018}
+
+
+def detection_hit(image, truth):
+    from plate_detector import DETECTOR_MODE, detect_plate_box, detect_plate_candidates
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if DETECTOR_MODE == "fast":
+        boxes = [c["box"] for c in detect_plate_candidates(gray)]
+    else:
+        box = detect_plate_box(gray)
+        boxes = [box] if box is not None else []
+    return any(box_iou(b, truth) >= 0.5 for b in boxes)
+
+
+def char_accuracy(read, truth):
+    if not read:
+        return 0.0
+    return sum(a == b for a, b in zip(read, truth)) / max(len(read), len(truth))
+
+
+def post_image(client, sample, camera="bench"):
+    start = time.perf_counter()
+    response = client.post("/api/lookup_plate", data={
+        "image": (BytesIO(sample["jpeg"]), "scene.jpg"),
+        "camera": camera,
+    })
+    return time.perf_counter() - start, response.status_code, response.get_json(silent=True) or {}
+
+
+def measure_accuracy(app, dataset):
+    client = app.test_client()
+    detected = exact = 0
+    chars = 0.0
+    owner_ok = owner_expected = false_owner = unregistered = 0
+    for sample in dataset:
+        detected += detection_hit(sample["image"], sample["box"])
+        _, _, body = post_image(client, sample)
+        plate = body.get("plate")
+        exact += plate == sample["plate"]
+        chars += char_accuracy(plate, sample["plate"])
+
+        owner = body.get("owner")
+        if sample["registered"]:
+            owner_expected += 1
+            owner_ok += bool(owner) and owner.get("owner_name") == sample["owner_name"]
+        else:
+            unregistered += 1
+            false_owner += owner is not None
+
+    n = len(dataset)
+    return {
+        "detection_hit_rate": detected / n,
+        "ocr_exact_rate": exact / n,
+        "ocr_char_accuracy": chars / n,
+        "owner_correct_rate": owner_ok / owner_expected if owner_expected else None,
+        "false_owner_rate": false_owner / unregistered if unregistered else None,
+    }
+
+
+def run_load(app, dataset, requests, concurrency):
+    local = threading.local()
+    latencies = np.empty(requests)
+    statuses = [0] * requests
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        latencies[i], statuses[i], _ = post_image(client, dataset[i % len(dataset)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - start
+
+    codes = {}
+    for status in statuses:
+        codes[str(status)] = codes.get(str(status), 0) + 1
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": requests / wall,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "status_codes": codes,
+    }
+
+
+def stage_means_ms(metrics):
+    return {labels[0]: 1000 * total / count
+            for labels, (count, total) in sorted(metrics.stage_seconds.totals().items()) if count}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta del backend de placas")
+    parser.add_argument("--scenes", type=int, default=100, help="Escenas sintéticas distintas")
+    parser.add_argument("--registry", type=int, default=100_000, help="Vehículos en el padrón sintético")
+    parser.add_argument("--registered-ratio", type=float, default=0.8,
+                        help="Fracción de placas de las escenas que están en el padrón")
+    parser.add_argument("--requests", type=int, default=400, help="Peticiones por nivel de concurrencia")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--image-cache", action="store_true", help="Deja activa la caché de imágenes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(HERE, "results", "e2e.jsonl"),
+                        help="Archivo JSONL al que se agrega el resultado")
+    args = parser.parse_args()
+
+    if not args.image_cache:
+        os.environ["IMAGE_CACHE_SIZE"] = "0"
+    os.environ.setdefault("SIGHTINGS_QUEUE_SIZE", str(max(10_000, args.requests * 2)))
+
+    folder = tempfile.mkdtemp(prefix="bench_e2e_")
+    cwd = os.getcwd()
+    try:
+        # vehicles.db y el archivo de imágenes (si está activo) quedan en el temporal.
+        os.chdir(folder)
+        import database
+
+        database.DB_NAME = os.path.join(folder, "vehicles.db")
+        rng = np.random.default_rng(args.seed)
+
+        t0 = time.perf_counter()
+        dataset = make_dataset(rng, args.scenes, args.registered_ratio)
+        print(f"{args.scenes} escenas generadas en {time.perf_counter() - t0:.1f} s")
+
+        from bulk_import import import_rows
+
+        summary = import_rows(registry_rows(rng, dataset, args.registry), update_index=False)
+        print(f"Padrón: {summary['written']} vehículos a {summary['rows_per_s']:.0f} filas/s")
+
+        t0 = time.perf_counter()
+        import api
+        import metrics
+        import startup
+
+        while not startup.is_ready():
+            report = startup.readiness()
+            if any(p["status"] == "error" for p in report["phases"].values()):
+                raise RuntimeError(f"El arranque falló: {report['phases']}")
+            time.sleep(0.05)
+        ready_s = time.perf_counter() - t0
+        print(f"Arranque completo en {ready_s:.1f} s")
+
+        accuracy = measure_accuracy(api.app, dataset)
+        print("Exactitud: " + "  ".join(
+            f"{k}={v:.1%}" for k, v in accuracy.items() if v is not None))
+
+        load = []
+        for concurrency in args.concurrency:
+            result = run_load(api.app, dataset, args.requests, concurrency)
+            load.append(result)
+            print(f"  c={concurrency:<3} {result['throughput_rps']:7.1f} req/s  "
+                  f"p50={result['p50_ms']:.1f} ms  p95={result['p95_ms']:.1f} ms  "
+                  f"p99={result['p99_ms']:.1f} ms  {result['status_codes']}")
+
+        stages = stage_means_ms(metrics)
+        print("Etapas (ms promedio): " + "  ".join(f"{k}={v:.2f}" for k, v in stages.items()))
+        rss = peak_rss_mb()
+        print(f"Memoria máxima: {rss['process']:.0f} MB (hijo más grande {rss['largest_child']:.0f} MB)")
+
+        record = {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "config": {name: os.environ.get(name) for name in CONFIG_VARS},
+            "dataset": {"scenes": args.scenes, "registry": args.registry,
+                        "registered_ratio": args.registered_ratio, "seed": args.seed},
+            "time_to_ready_s": ready_s,
+            "accuracy": accuracy,
+            "load": load,
+            "stage_mean_ms": stages,
+            "peak_rss_mb": rss,
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"Resultado agregado a {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""bench_image_path.py — Compara la ruta en disco vs. en memoria para las imágenes subidas.
+
+Ruta anterior: file.save(uploads/<nombre>) + cv2.imread
+Ruta nueva:    cv2.imdecode directamente desde los bytes de la petición
+
+Uso:
+    python benchmarks/bench_image_path.py --n 500 --width 1280 --height 720
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from image_io import decode_image  # noqa: E402
+
+
+def read_proc_io():
+    """Contadores de E/S del proceso (solo Linux); None si no están disponibles."""
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(":") for line in f)}
+    except OSError:
+        return None
+
+
+def synthetic_jpeg(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    img = cv2.GaussianBlur(img, (9, 9), 0)
+    x0, y0 = width // 3, height // 2
+    cv2.rectangle(img, (x0, y0), (x0 + width // 4, y0 + height // 10), (255, 255, 255), -1)
+    cv2.putText(img, "VBA1234", (x0 + 10, y0 + height // 12), cv2.FONT_HERSHEY_SIMPLEX,
+                height / 600, (0, 0, 0), 2)
+    ok, buf = cv2.imencode(".jpg", img)
+    return buf.tobytes()
+
+
+def disk_path(data, folder):
+    path = os.path.join(folder, "photo.jpg")
+    with open(path, "wb") as f:
+        f.write(data)
+    return cv2.imread(path)
+
+
+def memory_path(data, folder):
+    return decode_image(data)
+
+
+def run(name, fn, data, n, folder):
+    io_before = read_proc_io()
+    latencies = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        image = fn(data, folder)
+        latencies[i] = time.perf_counter() - t0
+        assert image is not None
+    io_after = read_proc_io()
+
+    row = {
+        "path": name,
+        "mean_ms": latencies.mean() * 1000,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p99_ms": np.percentile(latencies, 99) * 1000,
+    }
+    if io_before and io_after:
+        syscalls = (io_after["syscr"] - io_before["syscr"]) + (io_after["syscw"] - io_before["syscw"])
+        row["io_ops_per_req"] = syscalls / n
+        row["iops"] = syscalls / latencies.sum()
+        row["kb_written_per_req"] = (io_after["wchar"] - io_before["wchar"]) / n / 1024
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de la ruta de imagen (disco vs memoria)")
+    parser.add_argument("--n", type=int, default=300, help="Peticiones simuladas por ruta")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    data = synthetic_jpeg(args.width, args.height)
+    folder = tempfile.mkdtemp(prefix="bench_uploads_")
+    try:
+        print(f"Imagen: {args.width}x{args.height}, {len(data) / 1024:.1f} KB, n={args.n}")
+        for name, fn in (("disk", disk_path), ("memory", memory_path)):
+            run(name, fn, data, min(20, args.n), folder)  # calentamiento
+            row = run(name, fn, data, args.n, folder)
+            print("  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                            for k, v in row.items()))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""bench_plate_lookup.py — p50/p99 de find_owner_by_plate antes y después del índice normalizado.
+
+Antes:   WHERE UPPER(vehicles.plate) = UPPER(?) con una conexión nueva por consulta.
+Después: WHERE vehicles.plate_key = ? (índice) con el pool de conexiones.
+
+Uso:
+    python benchmarks/bench_plate_lookup.py --vehicles 1000000 --queries 2000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import database  # noqa: E402
+import models  # noqa: E402
+
+LEGACY_QUERY = """
+    SELECT owners.name, owners.phone, owners.email,
+           vehicles.brand, vehicles.model, vehicles.year
+    FROM vehicles
+    INNER JOIN owners ON vehicles.owner_id = owners.id
+    WHERE UPPER(vehicles.plate) = UPPER(?)
+"""
+
+
+def synthetic_plates(n, seed=0):
+    rng = random.Random(seed)
+    plates = set()
+    while len(plates) < n:
+        plates.add("".join(rng.choices(string.ascii_uppercase, k=3))
+                   + "".join(rng.choices(string.digits, k=4)))
+    return list(plates)
+
+
+def seed_legacy_db(path, plates, chunk=50_000):
+    """Crea la BD con el esquema original (sin plate_key) y N vehículos."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE owners (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, phone TEXT, email TEXT)")
+    conn.execute("""CREATE TABLE vehicles (id INTEGER PRIMARY KEY AUTOINCREMENT, plate TEXT NOT NULL UNIQUE,
+                    brand TEXT, model TEXT, year INTEGER, owner_id INTEGER NOT NULL,
+                    FOREIGN KEY (owner_id) REFERENCES owners (id))""")
+    for start in range(0, len(plates), chunk):
+        block = plates[start:start + chunk]
+        ids = range(start + 1, start + len(block) + 1)
+        conn.executemany("INSERT INTO owners (id, name, phone, email) VALUES (?, ?, ?, ?)",
+                         ((i, f"Owner {i}", "6670000000", f"owner{i}@example.com") for i in ids))
+        conn.executemany("INSERT INTO vehicles (plate, brand, model, year, owner_id) VALUES (?, ?, ?, ?, ?)",
+                         ((p, "Nissan", "Versa", 2020, i) for p, i in zip(block, ids)))
+        conn.commit()
+    conn.close()
+
+
+def legacy_lookup(path, plate):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(LEGACY_QUERY, (plate,)).fetchone()
+    conn.close()
+    return row
+
+
+def measure(fn, queries):
+    latencies = np.empty(len(queries))
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        fn(q)
+        latencies[i] = time.perf_counter() - t0
+    return {
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p99_ms": np.percentile(latencies, 99) * 1000,
+        "qps": len(queries) / latencies.sum(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de propietario por placa")
+    parser.add_argument("--vehicles", type=int, default=1_000_000, help="Vehículos sintéticos")
+    parser.add_argument("--queries", type=int, default=1000, help="Consultas por escenario")
+    parser.add_argument("--legacy-queries", type=int, default=50,
+                        help="Consultas para la versión anterior (cada una recorre toda la tabla)")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_lookup_")
+    path = os.path.join(folder, "vehicles.db")
+    try:
+        plates = synthetic_plates(args.vehicles)
+        t0 = time.perf_counter()
+        seed_legacy_db(path, plates)
+        print(f"BD sembrada con {args.vehicles:,} vehículos en {time.perf_counter() - t0:.1f} s")
+
+        rng = random.Random(1)
+        # Mezcla de aciertos (en minúsculas, como puede devolverlas el OCR) y fallos.
+        queries = [p.lower() if rng.random() < 0.5 else p for p in rng.choices(plates, k=args.queries)]
+        queries += ["ZZZ0000"] * (args.queries // 10)
+        rng.shuffle(queries)
+
+        before = measure(lambda q: legacy_lookup(path, q), queries[:args.legacy_queries])
+        print("antes   " + "  ".join(f"{k}={v:.3f}" for k, v in before.items()))
+
+        database.DB_NAME = path
+        t0 = time.perf_counter()
+        database.ensure_db()
+        print(f"Migración a plate_key + índice en {time.perf_counter() - t0:.1f} s")
+
+        assert models.find_owner_by_plate(plates[0].lower()) is not None
+        after = measure(models.find_owner_by_plate, queries)
+        print("después " + "  ".join(f"{k}={v:.3f}" for k, v in after.items()))
+        print(f"Mejora p50: x{before['p50_ms'] / after['p50_ms']:.0f}")
+    finally:
+        database.get_pool().close_all()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
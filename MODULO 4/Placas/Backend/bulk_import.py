@@ -0,0 +1,220 @@
+"""Importación masiva del padrón vehicular (CSV o JSONL) a vehicles.db.
+
+El archivo se lee en streaming y se escribe por bloques: cada bloque es una
+transacción con dos `executemany` (propietarios y vehículos), así que la
+memoria no depende del tamaño del archivo. Las filas existentes se
+actualizan (upsert): propietarios por `owner_id` y vehículos por placa
+normalizada (`plate_key`), así "ABC-123" actualiza el registro de "ABC123".
+
+Columnas: owner_id, owner_name, owner_phone, owner_email, plate, brand,
+model, year.
+
+Uso:
+    python bulk_import.py padron.csv
+    python bulk_import.py padron.jsonl --chunk-size 10000
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from database import ensure_db, get_connection, get_pool, normalize_plate
+from models import invalidate_owners
+from plate_index import plate_index
+
+BULK_IMPORT_CHUNK = int(os.environ.get("BULK_IMPORT_CHUNK", "5000"))
+MAX_REPORTED_ERRORS = 20
+
+UPSERT_OWNER_SQL = """
+    INSERT INTO owners (id, name, phone, email) VALUES (?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        phone = excluded.phone,
+        email = excluded.email
+"""
+
+UPSERT_VEHICLE_SQL = """
+    INSERT INTO vehicles (plate, brand, model, year, owner_id)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(plate_key) DO UPDATE SET
+        brand = excluded.brand,
+        model = excluded.model,
+        year = excluded.year,
+        owner_id = excluded.owner_id
+"""
+
+
+def _text(row, field):
+    value = row.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_row(row):
+    """Tuplas (propietario, vehículo) de una fila; ValueError si no es válida."""
+    try:
+        owner_id = int(row.get("owner_id"))
+    except (TypeError, ValueError):
+        raise ValueError("owner_id inválido")
+
+    name = _text(row, "owner_name")
+    if name is None:
+        raise ValueError("owner_name vacío")
+
+    plate = _text(row, "plate")
+    if plate is None:
+        raise ValueError("plate vacía")
+    plate = normalize_plate(plate)
+
+    year = _text(row, "year")
+    try:
+        year = int(year) if year is not None else None
+    except ValueError:
+        raise ValueError(f"year inválido: {year}")
+
+    owner = (owner_id, name, _text(row, "owner_phone"), _text(row, "owner_email"))
+    vehicle = (plate, _text(row, "brand"), _text(row, "model"), year, owner_id)
+    return owner, vehicle
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_rows(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt == "csv":
+        return read_csv(path)
+    if fmt in ("jsonl", "ndjson"):
+        return read_jsonl(path)
+    raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def _write_chunk(conn, owners, vehicles):
+    with conn:
+        conn.executemany(UPSERT_OWNER_SQL, owners)
+        conn.executemany(UPSERT_VEHICLE_SQL, vehicles)
+
+
+def import_rows(rows, chunk_size=BULK_IMPORT_CHUNK, conn=None, progress=None,
+                update_index=True):
+    """Upsert de un iterable de filas (dicts) en bloques de `chunk_size`.
+
+    Devuelve un resumen con filas escritas, rechazadas y filas por segundo.
+    `progress`, si se indica, se llama con el resumen parcial tras cada bloque.
+    Con `update_index` las placas se agregan al índice difuso de este proceso.
+    """
+    ensure_db()
+    stats = {"rows": 0, "written": 0, "rejected": 0, "errors": [], "chunks": 0}
+    start = time.perf_counter()
+    rows = iter(rows)
+    line = 0
+
+    def run(conn):
+        nonlocal line
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            owners, vehicles = [], []
+            for row in chunk:
+                line += 1
+                try:
+                    owner, vehicle = parse_row(row)
+                except (ValueError, AttributeError) as e:
+                    stats["rejected"] += 1
+                    if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                        stats["errors"].append({"row": line, "error": str(e)})
+                    continue
+                owners.append(owner)
+                vehicles.append(vehicle)
+
+            _write_chunk(conn, owners, vehicles)
+            if update_index and plate_index is not None:
+                for vehicle in vehicles:
+                    plate_index.add(vehicle[0])
+
+            stats["rows"] = line
+            stats["written"] += len(vehicles)
+            stats["chunks"] += 1
+            if progress is not None:
+                progress(_summary(stats, start))
+
+    try:
+        if conn is not None:
+            run(conn)
+        else:
+            with get_pool().connection() as pooled:
+                run(pooled)
+    finally:
+        # Cambió quién es dueño de qué placa: la caché de propietarios no sirve.
+        if stats["written"]:
+            invalidate_owners()
+
+    return _summary(stats, start)
+
+
+def _summary(stats, start):
+    seconds = time.perf_counter() - start
+    return dict(stats, errors=list(stats["errors"]), seconds=seconds,
+                rows_per_s=stats["rows"] / seconds if seconds > 0 else 0.0)
+
+
+def import_file(path, fmt=None, chunk_size=BULK_IMPORT_CHUNK, progress=None):
+    # Desde la línea de comandos no se llena el índice en memoria: la API
+    # levanta los vehículos nuevos por id en su siguiente recarga.
+    ensure_db()
+    conn = get_connection()
+    # Las páginas mapeadas de un archivo de cientos de MB cuentan como memoria
+    # residente del proceso; la importación escribe una sola vez cada página.
+    conn.execute("PRAGMA mmap_size = 0")
+    try:
+        return import_rows(read_rows(path, fmt), chunk_size=chunk_size, conn=conn,
+                           progress=progress, update_index=False)
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    import resource  # solo Unix; la API no lo necesita
+
+    parser = argparse.ArgumentParser(description="Importación masiva del padrón vehicular")
+    parser.add_argument("path", help="Archivo CSV o JSONL")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="Formato (por defecto, según la extensión)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_IMPORT_CHUNK,
+                        help="Filas por transacción")
+    args = parser.parse_args()
+
+    def progress(summary):
+        if summary["chunks"] % 20 == 0:
+            print(f"{summary['rows']} filas, {summary['rows_per_s']:.0f} filas/s", flush=True)
+
+    summary = import_file(args.path, fmt=args.format, chunk_size=args.chunk_size,
+                          progress=progress)
+    for error in summary["errors"]:
+        print(f"Fila {error['row']} rechazada: {error['error']}")
+
+    # ru_maxrss está en KB en Linux.
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Importadas {summary['written']} de {summary['rows']} filas "
+          f"({summary['rejected']} rechazadas) en {summary['seconds']:.1f} s: "
+          f"{summary['rows_per_s']:.0f} filas/s, memoria máxima {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
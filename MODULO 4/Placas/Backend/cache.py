@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUTTLCache:
+    """Caché LRU acotada con expiración por tiempo, segura entre hilos."""
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _lookup(self, key, count):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return MISSING
+
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def get(self, key, default=MISSING):
+        value = self._lookup(key, count=True)
+        return default if value is MISSING else value
+
+    def peek(self, key):
+        # Como get(), pero sin afectar los contadores de aciertos/fallos.
+        return self._lookup(key, count=False)
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=MISSING):
+        with self._lock:
+            if key is MISSING:
+                self.invalidations += len(self._data)
+                self._data.clear()
+            elif self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def __contains__(self, key):
+        # No cuenta como acceso: ni contadores ni orden LRU.
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class ImageResultCache:
+    """Resultados de OCR por imagen: hash exacto del contenido y hash perceptual.
+
+    Con `perceptual=False` solo se buscan imágenes con los mismos bytes. Las
+    búsquedas por hash perceptual aceptan hasta `max_distance` bits de
+    diferencia. El hash se parte en `max_distance + 1` bandas: si dos hashes
+    difieren en a lo más `max_distance` bits, al menos una banda coincide, así
+    que solo se comparan los candidatos que comparten alguna banda.
+    """
+
+    def __init__(self, maxsize=2048, ttl=600.0, max_distance=0, hash_bits=256,
+                 perceptual=False):
+        self.perceptual = bool(perceptual)
+        self.max_distance = max(0, int(max_distance))
+        self._results = LRUTTLCache(maxsize, ttl)
+        self._indexed = set()
+        self._bands = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+        n_bands = self.max_distance + 1
+        width = -(-hash_bits // n_bands)
+        self._band_slices = [(i * width, (1 << width) - 1) for i in range(n_bands)]
+
+    def _band_keys(self, phash):
+        return [(i, (phash >> shift) & mask)
+                for i, (shift, mask) in enumerate(self._band_slices)]
+
+    def lookup_digest(self, digest):
+        result = self._results.peek(("sha", digest))
+        if result is not MISSING:
+            self.exact_hits += 1
+        elif not self.perceptual:
+            # Sin hash perceptual esta es la única búsqueda.
+            self.misses += 1
+        return result
+
+    def lookup_phash(self, phash):
+        # Es el último paso de la búsqueda: si falla, cuenta como fallo.
+        result = self._results.peek(("phash", phash))
+        if result is MISSING and self.max_distance > 0:
+            result = self._lookup_similar(phash)
+
+        if result is MISSING:
+            self.misses += 1
+        else:
+            self.similar_hits += 1
+        return result
+
+    def _lookup_similar(self, phash):
+        with self._lock:
+            candidates = set()
+            for band in self._band_keys(phash):
+                candidates.update(self._bands.get(band, ()))
+
+        best, best_distance = None, self.max_distance + 1
+        for candidate in candidates:
+            distance = bin(candidate ^ phash).count("1")
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+
+        if best is None:
+            return MISSING
+        return self._results.peek(("phash", best))
+
+    def set(self, result, digest=None, phash=None):
+        if digest is not None:
+            self._results.set(("sha", digest), result)
+        if phash is not None:
+            self._results.set(("phash", phash), result)
+            with self._lock:
+                if phash not in self._indexed:
+                    self._indexed.add(phash)
+                    for band in self._band_keys(phash):
+                        self._bands.setdefault(band, set()).add(phash)
+                self._prune()
+
+    def _prune(self):
+        # El índice de bandas no debe crecer más que la caché.
+        if len(self._indexed) <= 2 * self._results.maxsize:
+            return
+        for phash in list(self._indexed):
+            if ("phash", phash) not in self._results:
+                self._indexed.discard(phash)
+                for band in self._band_keys(phash):
+                    members = self._bands.get(band)
+                    if members is not None:
+                        members.discard(phash)
+                        if not members:
+                            del self._bands[band]
+
+    def invalidate(self):
+        self._results.invalidate()
+        with self._lock:
+            self._indexed.clear()
+            self._bands.clear()
+
+    def stats(self):
+        results = self._results.stats()
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "size": results["size"],
+            "maxsize": results["maxsize"],
+            "ttl_s": results["ttl_s"],
+            "perceptual": self.perceptual,
+            "max_distance": self.max_distance,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+            "evictions": results["evictions"],
+            "expirations": results["expirations"],
+        }
@@ -1,14 +1,93 @@
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
 
 DB_NAME = "vehicles.db"
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+
+# Clave normalizada de la placa: sin espacios ni guiones y en mayúsculas.
+# La expresión SQL y normalize_plate() deben producir exactamente lo mismo.
+PLATE_KEY_SQL = "UPPER(REPLACE(REPLACE({col}, ' ', ''), '-', ''))"
+
+PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA busy_timeout = 5000",
+)
+
+_db_ready = False
+_db_lock = threading.Lock()
+
+def normalize_plate(plate):
+    return plate.replace(" ", "").replace("-", "").upper()
 
 def get_connection():
-    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
 
-def init_db():
+class ConnectionPool:
+    """Pool de conexiones SQLite reutilizables y seguro entre hilos.
+
+    Cada conexión la usa un solo hilo a la vez; al reutilizarlas también se
+    reaprovecha su caché de sentencias preparadas.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE):
+        self.size = max(1, int(size))
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return get_connection()
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close_all(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+_pool = None
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        ensure_db()
+        with _db_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+def init_db(drop_duplicates=False):
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -33,9 +112,81 @@ def init_db():
     );
     """)
 
+    _migrate_plate_key(cursor, drop_duplicates)
+
+    # Historial de lecturas. Sin AUTOINCREMENT: es una tabla de solo inserción
+    # y así no se actualiza sqlite_sequence en cada lote.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sightings (
+        id INTEGER PRIMARY KEY,
+        plate TEXT NOT NULL,
+        camera TEXT,
+        confidence REAL,
+        source TEXT,
+        seen_at REAL NOT NULL
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sightings_plate_time ON sightings (plate, seen_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sightings_camera_time ON sightings (camera, seen_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sightings_time ON sightings (seen_at)")
+
     conn.commit()
+    conn.execute("PRAGMA journal_mode = WAL")
     conn.close()
 
+def _migrate_plate_key(cursor, drop_duplicates=False):
+    # plate_key es una columna generada: SQLite la calcula en el mismo INSERT
+    # o UPDATE, sin importar quién escriba, y el índice UNIQUE impide dos
+    # registros de la misma placa escrita distinto ("ABC-123" y "abc123").
+    columns = {row["name"]: row for row in cursor.execute("PRAGMA table_xinfo(vehicles)")}
+    plate_key = columns.get("plate_key")
+    if plate_key is not None and plate_key["hidden"] == 0:
+        # Versión anterior: columna normal mantenida con triggers.
+        cursor.execute("DROP TRIGGER IF EXISTS trg_vehicles_plate_key_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_vehicles_plate_key_update")
+        cursor.execute("DROP INDEX IF EXISTS idx_vehicles_plate_key")
+        cursor.execute("ALTER TABLE vehicles DROP COLUMN plate_key")
+        plate_key = None
+    if plate_key is None:
+        cursor.execute(f"""
+        ALTER TABLE vehicles ADD COLUMN plate_key TEXT
+        GENERATED ALWAYS AS ({PLATE_KEY_SQL.format(col='plate')}) VIRTUAL
+        """)
+
+    has_index = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_vehicles_plate_key'"
+    ).fetchone()
+    if not has_index:
+        _check_duplicate_keys(cursor, drop_duplicates)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_vehicles_plate_key ON vehicles (plate_key)")
+
+def _check_duplicate_keys(cursor, drop_duplicates):
+    # Antes del índice UNIQUE podían existir variantes de la misma placa. No se
+    # borra nada al arrancar: la migración se detiene y lista los conflictos.
+    # Con drop_duplicates (python database.py --drop-duplicate-plates) se
+    # conserva el registro más reciente (id mayor) de cada placa.
+    conflicts = cursor.execute("""
+        SELECT plate_key, GROUP_CONCAT(plate, ', ') AS plates FROM vehicles
+        GROUP BY plate_key HAVING COUNT(*) > 1 ORDER BY plate_key
+    """).fetchall()
+    if not conflicts:
+        return
+    listed = "; ".join(f"{row['plate_key']}: {row['plates']}" for row in conflicts[:20])
+    if len(conflicts) > 20:
+        listed += "; ..."
+    if not drop_duplicates:
+        raise RuntimeError(
+            f"Migración de plate_key detenida: {len(conflicts)} placas tienen registros "
+            f"duplicados ({listed}). Corrígelos a mano o ejecuta "
+            f"'python database.py --drop-duplicate-plates' para conservar el más reciente."
+        )
+    removed = cursor.execute("""
+        DELETE FROM vehicles
+        WHERE id NOT IN (SELECT MAX(id) FROM vehicles GROUP BY plate_key)
+    """).rowcount
+    print(f"Migración de plate_key: se eliminaron {removed} registros duplicados ({listed}).",
+          flush=True)
+
 def seed_data():
     conn = get_connection()
     cursor = conn.cursor()
@@ -49,6 +200,28 @@ def seed_data():
     conn.commit()
     conn.close()
 
-if not os.path.exists(DB_NAME):
-    init_db()
-    seed_data()
+def ensure_db():
+    # Se llama en el arranque (hilo de calentamiento) y no al importar el
+    # módulo, para no bloquear el inicio del proceso.
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_lock:
+        if not _db_ready:
+            is_new = not os.path.exists(DB_NAME)
+            init_db()
+            if is_new:
+                seed_data()
+            _db_ready = True
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Creación y migración de la base de datos")
+    parser.add_argument("--drop-duplicate-plates", action="store_true",
+                        help="Conserva solo el registro más reciente de cada placa duplicada")
+    args = parser.parse_args()
+    init_db(drop_duplicates=args.drop_duplicate_plates)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+ARCHIVE_UPLOADS = os.environ.get("ARCHIVE_UPLOADS", "0") == "1"
+ARCHIVE_FOLDER = os.environ.get("ARCHIVE_FOLDER", "uploads")
+ARCHIVE_QUEUE_SIZE = int(os.environ.get("ARCHIVE_QUEUE_SIZE", "256"))
+
+
+def decode_image(data):
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+def load_image(source):
+    """Devuelve una imagen BGR a partir de un arreglo, bytes, stream o ruta."""
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return decode_image(source)
+    if hasattr(source, "read"):
+        return decode_image(source.read())
+    return cv2.imread(os.fspath(source))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(image, hash_size=16):
+    """dHash de hash_size*hash_size bits: robusto a recompresión y ruido leve."""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class UploadArchive:
+    """Guarda las imágenes recibidas en segundo plano, nombradas por su hash.
+
+    El archivo es de mejor esfuerzo: si la cola está llena la imagen se
+    descarta en lugar de frenar la petición.
+    """
+
+    def __init__(self, folder=ARCHIVE_FOLDER, queue_size=ARCHIVE_QUEUE_SIZE):
+        self.folder = folder
+        self.saved = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                os.makedirs(self.folder, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._loop, name="upload-archive", daemon=True)
+                self._thread.start()
+
+    def submit(self, data, filename=""):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((bytes(data), filename))
+        except queue.Full:
+            self.dropped += 1
+
+    def path_for(self, data, filename=""):
+        ext = os.path.splitext(filename)[1].lower() or ".jpg"
+        return os.path.join(self.folder, content_hash(data) + ext)
+
+    def _loop(self):
+        while True:
+            data, filename = self._queue.get()
+            try:
+                path = self.path_for(data, filename)
+                if not os.path.exists(path):
+                    tmp_path = path + ".tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                self.saved += 1
+            except OSError:
+                self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        self._queue.join()
+
+
+archive = UploadArchive() if ARCHIVE_UPLOADS else None
@@ -0,0 +1,211 @@
+"""Métricas del pipeline de placas en formato de texto de Prometheus.
+
+Contadores e histogramas en memoria del proceso, sin dependencias externas.
+Cada observación es un `perf_counter`, una búsqueda binaria en los límites
+del histograma y una suma bajo un lock: se puede dejar siempre activo.
+
+    with metrics.stage("detect"):
+        regions = detect_plate_regions(image)
+
+Además del histograma global, cada etapa se acumula en el registro de la
+petición en curso (por hilo), que la API puede devolver en `Server-Timing`.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# `1` agrega a cada respuesta el encabezado Server-Timing con sus etapas.
+METRICS_SERVER_TIMING = os.environ.get("METRICS_SERVER_TIMING", "0") == "1"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0)
+
+_registry = []
+_request = threading.local()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Por combinación de etiquetas: [conteos por cubeta (+Inf al final), suma, total]
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self):
+        """{etiquetas: (observaciones, suma)} de cada serie."""
+        with self._lock:
+            return {k: (s[2], s[1]) for k, s in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Valor leído al momento de exponer las métricas.
+
+    `fn` devuelve un número o una lista de pares (dict de etiquetas, valor).
+    Con `kind="counter"` expone un contador que ya lleva otro objeto (p. ej.
+    los aciertos de una caché).
+    """
+
+    def __init__(self, name, documentation, fn, labelnames=(), kind="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.kind = kind
+        _registry.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            value = self.fn()
+        except Exception:
+            return lines
+        if value is None:
+            return lines
+        if isinstance(value, (int, float)):
+            value = [({}, value)]
+        for labels, v in value:
+            key = tuple(labels.get(n, "") for n in self.labelnames)
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+requests_seconds = Histogram(
+    "plate_request_seconds", "Latencia de las peticiones HTTP.", ("endpoint", "status"))
+stage_seconds = Histogram(
+    "plate_stage_seconds", "Latencia de cada etapa del pipeline.", ("stage",))
+errors = Counter(
+    "plate_errors_total", "Errores por endpoint y tipo.", ("endpoint", "error"))
+detections = Counter(
+    "plate_detections_total",
+    "Imágenes con región de placa detectada o enviadas completas al OCR.", ("result",))
+decode_failures = Counter(
+    "plate_decode_failures_total", "Imágenes que no se pudieron decodificar.")
+ocr_reads = Counter(
+    "plate_ocr_reads_total", "Lecturas del OCR con y sin texto de placa.", ("result",))
+ocr_confidence = Histogram(
+    "plate_ocr_confidence", "Confianza de la lectura elegida por imagen.",
+    buckets=CONFIDENCE_BUCKETS)
+owner_lookups = Counter(
+    "plate_owner_lookups_total",
+    "Búsquedas de propietario por resultado (found/not_found) y origen (cache/db).",
+    ("result", "source"))
+
+
+def begin_request():
+    _request.stages = {}
+    _request.started_at = time.perf_counter()
+
+
+def request_stages():
+    return getattr(_request, "stages", None) or {}
+
+
+def request_elapsed():
+    started_at = getattr(_request, "started_at", None)
+    return time.perf_counter() - started_at if started_at is not None else 0.0
+
+
+def observe_stage(name, seconds):
+    stage_seconds.observe(seconds, stage=name)
+    stages = getattr(_request, "stages", None)
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+def server_timing():
+    """Valor del encabezado Server-Timing para la petición en curso."""
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in request_stages().items()]
+    parts.append(f"total;dur={request_elapsed() * 1000:.2f}")
+    return ", ".join(parts)
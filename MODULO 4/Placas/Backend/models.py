@@ -1,23 +1,74 @@
-from database import get_connection
+import os
+from datetime import datetime, timezone
+
+import metrics
+from cache import MISSING, LRUTTLCache
+from database import get_pool, normalize_plate
+from plate_index import plate_index
+
+# Las escrituras hechas a través de este módulo invalidan la caché; el TTL
+# acota cuánto tarda en verse un cambio hecho por otro proceso.
+OWNER_CACHE_SIZE = int(os.environ.get("OWNER_CACHE_SIZE", "10000"))
+OWNER_CACHE_TTL_S = float(os.environ.get("OWNER_CACHE_TTL_S", "300"))
+
+owner_cache = LRUTTLCache(OWNER_CACHE_SIZE, OWNER_CACHE_TTL_S)
+
+metrics.Gauge("plate_owner_cache_entries", "Entradas en la caché de propietarios.",
+              lambda: len(owner_cache))
+
+FIND_OWNER_SQL = """
+    SELECT owners.name,
+           owners.phone,
+           owners.email,
+           vehicles.brand,
+           vehicles.model,
+           vehicles.year
+    FROM vehicles
+    INNER JOIN owners ON vehicles.owner_id = owners.id
+    WHERE vehicles.plate_key = ?
+    LIMIT 1
+"""
+
+def invalidate_vehicle(plate):
+    owner_cache.invalidate(normalize_plate(plate))
+
+def invalidate_owners():
+    # Un propietario puede tener varios vehículos: se vacía toda la caché.
+    owner_cache.invalidate()
 
 def find_owner_by_plate(plate):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT owners.name,
-               owners.phone,
-               owners.email,
-               vehicles.brand,
-               vehicles.model,
-               vehicles.year
-        FROM vehicles
-        INNER JOIN owners ON vehicles.owner_id = owners.id
-        WHERE UPPER(vehicles.plate) = UPPER(?)
-    """, (plate,))
-
-    result = cursor.fetchone()
-    conn.close()
+    key = normalize_plate(plate)
+    owner = owner_cache.get(key)
+    source = "cache"
+    if owner is MISSING:
+        with metrics.stage("db"):
+            owner = _query_owner(key)
+        owner_cache.set(key, owner)
+        source = "db"
+
+    metrics.owner_lookups.inc(result="found" if owner is not None else "not_found",
+                              source=source)
+
+    return dict(owner) if owner is not None else None
+
+def find_plate_candidates(plate):
+    """Placas registradas parecidas a una lectura sin coincidencia exacta."""
+    if plate_index is None:
+        return []
+
+    with metrics.stage("fuzzy"):
+        matches = plate_index.search(plate)
+
+    candidates = []
+    for match in matches:
+        owner = find_owner_by_plate(match["plate"])
+        if owner is not None:
+            candidates.append(dict(match, owner=owner))
+    return candidates
+
+def _query_owner(key):
+    with get_pool().connection() as conn:
+        result = conn.execute(FIND_OWNER_SQL, (key,)).fetchone()
 
     if not result:
         return None
@@ -30,3 +81,73 @@ def find_owner_by_plate(plate):
         "vehicle_model": result["model"],
         "vehicle_year": result["year"],
     }
+
+SIGHTINGS_MAX_LIMIT = int(os.environ.get("SIGHTINGS_MAX_LIMIT", "500"))
+
+def parse_timestamp(value):
+    """Segundos Unix o fecha ISO 8601 (sin zona se toma como UTC)."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def _encode_cursor(seen_at, row_id):
+    return f"{seen_at!r}_{row_id}"
+
+def _decode_cursor(cursor):
+    seen_at, row_id = cursor.rsplit("_", 1)
+    return float(seen_at), int(row_id)
+
+def find_sightings(plate=None, camera=None, since=None, until=None, limit=50, cursor=None):
+    """Avistamientos del más reciente al más antiguo, paginados por cursor.
+
+    La paginación es por llave (seen_at, id) y no por OFFSET: cada página
+    cuesta lo mismo sin importar qué tan atrás esté en el historial.
+    Devuelve (avistamientos, cursor de la siguiente página o None).
+    """
+    limit = max(1, min(int(limit), SIGHTINGS_MAX_LIMIT))
+    where, params = [], []
+    if plate:
+        where.append("plate = ?")
+        params.append(normalize_plate(plate))
+    if camera:
+        where.append("camera = ?")
+        params.append(camera)
+    if since is not None:
+        where.append("seen_at >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("seen_at < ?")
+        params.append(until)
+    if cursor:
+        where.append("(seen_at, id) < (?, ?)")
+        params.extend(_decode_cursor(cursor))
+
+    sql = "SELECT id, plate, camera, confidence, source, seen_at FROM sightings"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY seen_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    with get_pool().connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]["seen_at"], rows[-1]["id"])
+
+    return [{
+        "id": row["id"],
+        "plate": row["plate"],
+        "camera": row["camera"],
+        "confidence": row["confidence"],
+        "source": row["source"],
+        "seen_at": datetime.fromtimestamp(row["seen_at"], timezone.utc).isoformat(),
+    } for row in rows], next_cursor
@@ -1,17 +1,72 @@
-import easyocr
+import functools
+import multiprocessing as mp
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+
 import cv2
-from plate_detector import detect_plate_region
+import numpy as np
 
-reader = easyocr.Reader(['en'])
+import metrics
+from cache import MISSING, ImageResultCache
+from image_io import content_hash, load_image, perceptual_hash
+from plate_detector import detect_plate_crops
+from ocr_pool import OCR_QUEUE_SIZE, OCR_WORKERS, OCRQueueFull, OCRWorkerPool
 
-def extract_plate_text(image_path):
-    image = cv2.imread(image_path)
-    if image is None:
-        return None, 0.0
+# Micro-batching: las regiones de placa de peticiones concurrentes se
+# acumulan durante OCR_BATCH_MAX_WAIT_MS (o hasta OCR_BATCH_MAX_SIZE) y
+# se reconocen en una sola llamada a EasyOCR.
+OCR_BATCH_MAX_SIZE = int(os.environ.get("OCR_BATCH_MAX_SIZE", "8"))
+OCR_BATCH_MAX_WAIT_MS = float(os.environ.get("OCR_BATCH_MAX_WAIT_MS", "5"))
+OCR_TIMEOUT_S = float(os.environ.get("OCR_TIMEOUT_S", "30"))
+
+# "full": detección de texto + reconocimiento de EasyOCR sobre cada región.
+# "recognize": en los recortes que el detector ya marcó como placa se omite
+# la detección de texto y solo se reconoce, con el alfabeto de las placas.
+# Si la lectura es dudosa o no tiene formato de placa se repite con "full".
+OCR_MODE = os.environ.get("OCR_MODE", "full")
+OCR_FAST_MIN_CONFIDENCE = float(os.environ.get("OCR_FAST_MIN_CONFIDENCE", "0.5"))
+PLATE_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+# Expresiones separadas por ";" (la coma aparece en cuantificadores como {3,4}).
+OCR_PLATE_PATTERNS = os.environ.get(
+    "OCR_PLATE_PATTERNS", r"[A-Z]{3}[0-9]{3,4}[A-Z]?;[A-Z]{2}[0-9]{4,5}")
+PLATE_PATTERNS = [re.compile(p) for p in OCR_PLATE_PATTERNS.split(";") if p.strip()]
+
+# Caché de resultados por imagen. Por defecto solo reutiliza el resultado de
+# una foto con exactamente los mismos bytes. El hash perceptual es de la
+# imagen completa: con la misma cámara y el mismo fondo, dos autos distintos
+# pueden quedar a pocos bits, así que buscar por parecido
+# (IMAGE_CACHE_PERCEPTUAL=1) solo conviene si llegan reenvíos recomprimidos de
+# la misma toma.
+IMAGE_CACHE_SIZE = int(os.environ.get("IMAGE_CACHE_SIZE", "2048"))
+IMAGE_CACHE_TTL_S = float(os.environ.get("IMAGE_CACHE_TTL_S", "600"))
+IMAGE_CACHE_PERCEPTUAL = os.environ.get("IMAGE_CACHE_PERCEPTUAL", "0") == "1"
+IMAGE_CACHE_MAX_DISTANCE = int(os.environ.get("IMAGE_CACHE_MAX_DISTANCE", "0"))
+
+image_cache = None
+if IMAGE_CACHE_SIZE > 0:
+    image_cache = ImageResultCache(IMAGE_CACHE_SIZE, IMAGE_CACHE_TTL_S,
+                                   IMAGE_CACHE_MAX_DISTANCE, perceptual=IMAGE_CACHE_PERCEPTUAL)
+
+reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    global reader
+    if reader is None:
+        with _reader_lock:
+            if reader is None:
+                # easyocr importa torch: se difiere hasta que se necesita.
+                import easyocr
+                reader = easyocr.Reader(['en'])
+    return reader
 
-    plate_region = detect_plate_region(image)
-    results = reader.readtext(plate_region)
 
+def _best_result(results):
     if not results:
         return None, 0.0
 
@@ -27,3 +82,317 @@ def extract_plate_text(image_path):
         best_text = best_text.replace(" ", "").upper()
 
     return best_text, float(best_conf)
+
+
+def _pad_to(region, height, width):
+    # EasyOCR solo agrupa imágenes del mismo tamaño; se rellena con el borde
+    # en lugar de redimensionar para no deformar los caracteres.
+    h, w = region.shape[:2]
+    if h == height and w == width:
+        return region
+    return cv2.copyMakeBorder(region, 0, height - h, 0, width - w,
+                              cv2.BORDER_REPLICATE)
+
+
+def matches_plate_format(text):
+    if not PLATE_PATTERNS:
+        return True
+    return any(pattern.fullmatch(text) for pattern in PLATE_PATTERNS)
+
+
+def _read_full(regions):
+    if not regions:
+        return []
+    if len(regions) == 1:
+        return [_best_result(get_reader().readtext(regions[0]))]
+
+    height = max(r.shape[0] for r in regions)
+    width = max(r.shape[1] for r in regions)
+    batch = [_pad_to(r, height, width) for r in regions]
+
+    results = get_reader().readtext_batched(batch)
+    return [_best_result(r) for r in results]
+
+
+def _read_crops(regions):
+    """Solo reconocimiento: cada recorte completo es una línea de texto.
+
+    Los recortes se apilan en una sola imagen con una caja por recorte, para
+    que EasyOCR los reconozca en una llamada (en lote si hay GPU).
+    """
+    regions = [r if r.ndim == 2 else cv2.cvtColor(r, cv2.COLOR_BGR2GRAY) for r in regions]
+    width = max(r.shape[1] for r in regions)
+    canvas = np.zeros((sum(r.shape[0] for r in regions), width), np.uint8)
+    boxes, rows = [], {}
+    y = 0
+    for i, r in enumerate(regions):
+        h, w = r.shape
+        canvas[y:y + h, :w] = r
+        boxes.append([0, w, y, y + h])
+        rows[y] = i
+        y += h
+
+    results = get_reader().recognize(canvas, horizontal_list=boxes, free_list=[],
+                                     allowlist=PLATE_ALLOWLIST, batch_size=len(boxes))
+    reads = [(None, 0.0)] * len(regions)
+    for box, text, conf in results:
+        i = rows.get(int(box[0][1]))
+        if i is not None:
+            reads[i] = _best_result([(box, text, conf)])
+    return reads
+
+
+def recognize_regions(regions, crops=None):
+    """Texto y confianza de cada región.
+
+    `crops[i]` indica si la región i es un recorte del detector; con
+    OCR_MODE=recognize esas regiones van primero por el camino rápido.
+    """
+    if not regions:
+        return []
+
+    results = [None] * len(regions)
+    if OCR_MODE == "recognize" and crops:
+        quick = [i for i, crop in enumerate(crops) if crop]
+        if quick:
+            for i, (text, conf) in zip(quick, _read_crops([regions[i] for i in quick])):
+                if text and conf >= OCR_FAST_MIN_CONFIDENCE and matches_plate_format(text):
+                    results[i] = (text, conf)
+
+    full = [i for i, result in enumerate(results) if result is None]
+    for i, result in zip(full, _read_full([regions[i] for i in full])):
+        results[i] = result
+    return results
+
+
+def _resolve(futures, results=None, error=None):
+    for i, f in enumerate(futures):
+        if error is not None:
+            f.set_exception(error)
+        else:
+            f.set_result(results[i])
+
+
+def _chain(futures, job):
+    error = job.exception()
+    if error is not None:
+        _resolve(futures, error=error)
+    else:
+        _resolve(futures, job.result())
+
+
+class OCRBatcher:
+    # `runner` recibe las regiones (y si cada una es un recorte del detector)
+    # y devuelve la lista de resultados, o un Future con ella cuando el lote
+    # se despacha al pool de procesos.
+    def __init__(self, max_batch_size=OCR_BATCH_MAX_SIZE,
+                 max_wait_ms=OCR_BATCH_MAX_WAIT_MS, runner=recognize_regions,
+                 max_pending=OCR_QUEUE_SIZE):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._runner = runner
+        self._queue = queue.Queue(maxsize=max(0, int(max_pending)))
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="ocr-batcher", daemon=True)
+                self._thread.start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, region, crop=False):
+        future = Future()
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((region, crop, future))
+        except queue.Full:
+            raise OCRQueueFull("Cola de OCR llena.")
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            pending = [(r, c, f) for (r, c, f) in batch
+                       if f.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+
+            regions = [r for (r, _, _) in pending]
+            crops = [c for (_, c, _) in pending]
+            futures = [f for (_, _, f) in pending]
+
+            try:
+                results = self._runner(regions, crops)
+            except Exception as e:
+                _resolve(futures, error=e)
+                continue
+
+            if isinstance(results, Future):
+                results.add_done_callback(functools.partial(_chain, futures))
+            else:
+                _resolve(futures, results)
+
+
+pool = None
+if OCR_WORKERS > 0:
+    pool = OCRWorkerPool(OCR_WORKERS, OCR_QUEUE_SIZE)
+    # El hilo del batcher espera turno en el pool; al llenarse, la presión
+    # llega a la cola del batcher y las peticiones nuevas reciben 503.
+    batcher = OCRBatcher(runner=pool.submit)
+else:
+    batcher = OCRBatcher()
+
+
+metrics.Gauge("plate_ocr_queue_depth", "Regiones esperando lote de OCR.",
+              lambda: batcher.pending)
+if image_cache is not None:
+    metrics.Gauge("plate_image_cache_hits_total", "Aciertos de la caché de imágenes por tipo.",
+                  lambda: [({"match": "exact"}, image_cache.exact_hits),
+                           ({"match": "similar"}, image_cache.similar_hits)],
+                  ("match",), kind="counter")
+if pool is not None:
+    metrics.Gauge("plate_ocr_workers_busy", "Procesos de OCR ocupados.",
+                  lambda: pool.stats().get("workers_busy", 0))
+
+
+def start_pool():
+    if pool is not None and mp.parent_process() is None:
+        pool.start()
+
+
+def warm_up_ocr(poll_s=0.1):
+    if pool is None:
+        get_reader()
+        return
+
+    start_pool()
+    while not pool.ready:
+        if pool.stats().get("workers_alive", 0) == 0:
+            raise RuntimeError("Los procesos de OCR terminaron durante el arranque.")
+        time.sleep(poll_s)
+
+
+def ocr_ready():
+    if pool is not None:
+        return pool.ready
+    return reader is not None
+
+
+def ocr_stats():
+    stats = {
+        "mode": "pool" if pool is not None else "in_process",
+        "batch_queue_depth": batcher.pending,
+        "batch_queue_capacity": OCR_QUEUE_SIZE,
+        "max_batch_size": batcher.max_batch_size,
+    }
+    if pool is not None:
+        stats["pool"] = pool.stats()
+    return stats
+
+
+def _load(source):
+    with metrics.stage("decode"):
+        image = load_image(source)
+    if image is None:
+        metrics.decode_failures.inc()
+    return image
+
+
+def _cached_result(source):
+    digest = phash = None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with metrics.stage("cache"):
+            digest = content_hash(source)
+            cached = image_cache.lookup_digest(digest)
+        if cached is not MISSING:
+            return cached, None, (digest, phash)
+
+    image = _load(source)
+    if image is None:
+        return (None, 0.0), None, (digest, phash)
+    if not image_cache.perceptual:
+        return MISSING, image, (digest, phash)
+
+    with metrics.stage("cache"):
+        phash = perceptual_hash(image)
+        cached = image_cache.lookup_phash(phash)
+    return cached, image, (digest, phash)
+
+
+def extract_plate_texts(sources):
+    results = [None] * len(sources)
+    regions = [None] * len(sources)
+    cache_keys = [None] * len(sources)
+
+    for i, source in enumerate(sources):
+        if image_cache is not None:
+            cached, image, cache_keys[i] = _cached_result(source)
+            if cached is not MISSING:
+                results[i] = cached
+                continue
+        else:
+            image = _load(source)
+            if image is None:
+                results[i] = (None, 0.0)
+                continue
+
+        # Con DETECTOR_MODE=fast puede haber varias candidatas por imagen.
+        with metrics.stage("detect"):
+            regions[i] = detect_plate_crops(image)
+
+    # Se encolan todas las regiones juntas para que caigan en el mismo lote.
+    futures = [None] * len(sources)
+    try:
+        for i, candidates in enumerate(regions):
+            if candidates is not None:
+                futures[i] = []
+                for region, crop in candidates:
+                    futures[i].append(batcher.submit(region, crop))
+    except OCRQueueFull:
+        for group in futures:
+            for f in group or ():
+                f.cancel()
+        raise
+
+    for i, group in enumerate(futures):
+        if group is None:
+            continue
+        # Incluye la espera en la cola del batcher y, si lo hay, en el pool.
+        with metrics.stage("ocr"):
+            reads = [f.result(timeout=OCR_TIMEOUT_S) for f in group]
+        results[i] = max(reads, key=lambda read: (read[0] is not None, read[1]),
+                         default=(None, 0.0))
+        metrics.ocr_reads.inc(result="plate" if results[i][0] else "empty")
+        metrics.ocr_confidence.observe(results[i][1])
+        if image_cache is not None:
+            image_cache.set(results[i], *cache_keys[i])
+
+    return results
+
+
+def extract_plate_text(source):
+    return extract_plate_texts([source])[0]
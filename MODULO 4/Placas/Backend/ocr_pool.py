@@ -0,0 +1,206 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", "0"))
+OCR_QUEUE_SIZE = int(os.environ.get("OCR_QUEUE_SIZE", "32"))
+# Cada cuánto se revisa que los procesos sigan vivos.
+OCR_WATCHDOG_S = float(os.environ.get("OCR_WATCHDOG_S", "1.0"))
+
+
+class OCRQueueFull(Exception):
+    pass
+
+
+class OCRWorkerDied(RuntimeError):
+    pass
+
+
+# Estado de cada proceso en el arreglo compartido: cargando el modelo, libre,
+# o el id del trabajo que está procesando.
+LOADING = -2
+IDLE = -1
+
+
+def _worker_main(slot, jobs, results, current):
+    # Cada proceso carga su propio modelo una sola vez al arrancar.
+    import ocr_engine
+    ocr_engine.get_reader()
+    current[slot] = IDLE
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        job_id, regions, crops = job
+        current[slot] = job_id
+
+        start = time.perf_counter()
+        try:
+            output, error = ocr_engine.recognize_regions(regions, crops), None
+        except Exception as e:
+            output, error = None, f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+
+        results.put((job_id, output, error, elapsed))
+        current[slot] = IDLE
+
+
+class OCRWorkerPool:
+    """Procesos de OCR precalentados con una cola de trabajos acotada.
+
+    Como máximo hay `workers + queue_size` trabajos en vuelo; `submit`
+    bloquea (o lanza OCRQueueFull con block=False) cuando se alcanza el límite.
+
+    Si un proceso muere (p. ej. por falta de memoria), el trabajo que tenía
+    falla con OCRWorkerDied, su lugar en la cola se libera y el proceso se
+    reemplaza. Un proceso que muere antes de cargar el modelo no se reemplaza:
+    el arranque falla y /readyz lo reporta.
+    """
+
+    def __init__(self, workers=OCR_WORKERS, queue_size=OCR_QUEUE_SIZE,
+                 watchdog_s=OCR_WATCHDOG_S):
+        self.workers = max(1, int(workers))
+        self.queue_size = max(0, int(queue_size))
+        self.watchdog_s = float(watchdog_s)
+        self._ctx = mp.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._ids = itertools.count()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._processes = []
+        self._started_at = None
+        self._busy_seconds = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def start(self):
+        with self._lock:
+            if self._processes:
+                return
+            self._jobs = self._ctx.Queue()
+            self._results = self._ctx.Queue()
+            self._current = self._ctx.Array("q", [LOADING] * self.workers, lock=False)
+            self._processes = [self._spawn(i) for i in range(self.workers)]
+
+            self._started_at = time.monotonic()
+            threading.Thread(target=self._collect, args=(self._processes,),
+                             name="ocr-pool-results", daemon=True).start()
+
+    def _spawn(self, slot):
+        self._current[slot] = LOADING
+        p = self._ctx.Process(
+            target=_worker_main, name=f"ocr-worker-{slot}", daemon=True,
+            args=(slot, self._jobs, self._results, self._current))
+        p.start()
+        return p
+
+    def submit(self, regions, crops=None, block=True):
+        self.start()
+        if not self._slots.acquire(blocking=block):
+            self.rejected += 1
+            raise OCRQueueFull("Cola de OCR llena.")
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+        job_id = next(self._ids)
+        with self._lock:
+            self._futures[job_id] = future
+        self._jobs.put((job_id, regions, crops))
+        return future
+
+    def _finish(self, job_id, output=None, error=None, elapsed=0.0):
+        # Un trabajo se resuelve una sola vez: si el proceso murió después de
+        # enviar su resultado, el segundo aviso se ignora.
+        with self._lock:
+            future = self._futures.pop(job_id, None)
+            if future is None:
+                return
+            self._busy_seconds += elapsed
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+
+        if error is None:
+            future.set_result(output)
+        else:
+            future.set_exception(error)
+
+    def _collect(self, processes):
+        # `processes` es la lista de esta ejecución; shutdown() la vacía.
+        while processes:
+            try:
+                job_id, output, error, elapsed = self._results.get(timeout=self.watchdog_s)
+            except queue.Empty:
+                pass
+            else:
+                self._finish(job_id, output,
+                             None if error is None else RuntimeError(error), elapsed)
+            self._check_workers(processes)
+
+    def _check_workers(self, processes):
+        lost = []
+        with self._lock:
+            for slot, p in enumerate(processes):
+                if p.is_alive() or self._current[slot] == LOADING:
+                    continue
+                if self._current[slot] >= 0:
+                    lost.append((self._current[slot], p))
+                print(f"Proceso de OCR {p.name} terminó con código {p.exitcode}; "
+                      "se reemplaza.", flush=True)
+                processes[slot] = self._spawn(slot)
+                self.restarts += 1
+
+        for job_id, p in lost:
+            self._finish(job_id, error=OCRWorkerDied(
+                f"El proceso de OCR {p.name} terminó con código {p.exitcode}."))
+
+    @property
+    def ready(self):
+        return bool(self._processes) and all(
+            state != LOADING for state in self._current[:self.workers])
+
+    def stats(self):
+        if not self._processes:
+            return {"workers": self.workers, "started": False}
+
+        with self._lock:
+            in_flight = len(self._futures)
+            busy_seconds = self._busy_seconds
+        states = self._current[:self.workers]
+        busy = sum(state >= 0 for state in states)
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+
+        return {
+            "workers": self.workers,
+            "workers_ready": sum(state != LOADING for state in states),
+            "workers_alive": sum(p.is_alive() for p in self._processes),
+            "workers_busy": busy,
+            "workers_restarted": self.restarts,
+            "queue_capacity": self.queue_size,
+            "queue_depth": max(0, in_flight - busy),
+            "utilization_now": busy / self.workers,
+            "utilization_avg": min(1.0, busy_seconds / (uptime * self.workers)),
+            "jobs_completed": self.completed,
+            "jobs_failed": self.failed,
+            "jobs_rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            # Vaciar la misma lista detiene el hilo de _collect.
+            processes = list(self._processes)
+            self._processes.clear()
+        for _ in processes:
+            self._jobs.put(None)
+        for p in processes:
+            p.join(timeout=5)
@@ -1,12 +1,39 @@
+import os
+import time
+
 import cv2
 import numpy as np
 
-def detect_plate_region(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+import metrics
+from image_io import load_image
+
+# "legacy": primera región de 4 lados sobre la imagen completa.
+# "fast": detección sobre un nivel reducido de la pirámide y las N mejores
+# candidatas según la proporción y el área típicas de una placa.
+DETECTOR_MODE = os.environ.get("DETECTOR_MODE", "legacy")
+DETECTOR_MAX_SIDE = int(os.environ.get("DETECTOR_MAX_SIDE", "640"))
+DETECTOR_TOP_N = int(os.environ.get("DETECTOR_TOP_N", "3"))
+DETECTOR_FALLBACK_MAX_SIDE = int(os.environ.get("DETECTOR_FALLBACK_MAX_SIDE", "1280"))
+
+# Proporción ancho/alto esperada (placas mexicanas ~2:1, europeas ~4.7:1).
+PLATE_ASPECT_MIN = 1.5
+PLATE_ASPECT_MAX = 6.0
+PLATE_ASPECT_IDEAL = 2.5
+PLATE_AREA_MIN = 0.002
+PLATE_AREA_MAX = 0.25
+
+
+def _gray(image):
+    # Los cuadros de video y algunas cargas ya llegan en escala de grises.
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def detect_plate_box(gray):
+    """Caja (x, y, w, h) de la primera región de 4 lados, o None."""
     bfilter = cv2.bilateralFilter(gray, 11, 17, 17)
     edged = cv2.Canny(bfilter, 30, 200)
 
-    keypoints = cv2.findContours(edged.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    keypoints = cv2.findContours(edged, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
     contours = keypoints[0] if len(keypoints) == 2 else keypoints[1]
 
     contours = sorted(contours, key=cv2.contourArea, reverse=True)[:10]
@@ -16,17 +43,180 @@ def detect_plate_region(image):
         approx = cv2.approxPolyDP(c, 0.018 * perimeter, True)
 
         if len(approx) == 4:
-            mask = np.zeros(gray.shape, np.uint8)
-            cv2.drawContours(mask, [approx], 0, 255, -1)
+            # Mismo resultado que rasterizar el polígono en una máscara del
+            # tamaño del cuadro y buscar sus extremos, sin reservar la máscara.
+            return tuple(int(v) for v in cv2.boundingRect(approx))
+
+    return None
+
+
+class _StageTimer:
+    def __init__(self, timings):
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        if self.timings is None:
+            return
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+
+def _pyramid_level(gray, max_side):
+    scale = 1.0
+    while max(gray.shape[:2]) > max_side:
+        gray = cv2.pyrDown(gray)
+        scale *= 0.5
+    return gray, scale
+
+
+def _plate_score(contour, box, frame_area):
+    x, y, w, h = box
+    if h == 0 or w == 0:
+        return 0.0
+
+    aspect = w / float(h)
+    area = (w * h) / frame_area
+    if not (PLATE_ASPECT_MIN <= aspect <= PLATE_ASPECT_MAX):
+        return 0.0
+    if not (PLATE_AREA_MIN <= area <= PLATE_AREA_MAX):
+        return 0.0
+
+    aspect_score = 1.0 / (1.0 + abs(np.log(aspect / PLATE_ASPECT_IDEAL)))
+    # Qué tanto llena el contorno su caja: una placa es casi un rectángulo.
+    fill = min(1.0, abs(cv2.contourArea(contour)) / float(w * h))
+    perimeter = cv2.arcLength(contour, True)
+    quad = 1.0 if len(cv2.approxPolyDP(contour, 0.018 * perimeter, True)) == 4 else 0.6
+    # Entre placas igual de plausibles se prefiere la más grande (más legible).
+    return aspect_score * (0.5 + 0.5 * fill) * quad * (1.0 + np.sqrt(area))
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def detect_plate_candidates(image, top_n=DETECTOR_TOP_N, max_side=DETECTOR_MAX_SIDE,
+                            timings=None):
+    """Las `top_n` regiones más parecidas a una placa, de mejor a peor.
+
+    Devuelve una lista de dicts con `box` (x, y, w, h en la resolución
+    original), `score` y `crop` (recorte en gris a resolución completa).
+    Si `timings` es un dict, acumula ahí el tiempo de cada etapa.
+    """
+    timer = _StageTimer(timings)
+    image = load_image(image)
+    if image is None:
+        return []
+    gray = _gray(image)
+    timer.lap("gray")
 
-            x, y = np.where(mask == 255)
-            if len(x) == 0 or len(y) == 0:
-                continue
+    small, scale = _pyramid_level(gray, max_side)
+    timer.lap("pyramid")
 
-            topX, topY = np.min(x), np.min(y)
-            bottomX, bottomY = np.max(x), np.max(y)
+    bfilter = cv2.bilateralFilter(small, 7, 17, 17)
+    edged = cv2.Canny(bfilter, 30, 200)
+    timer.lap("edges")
+
+    keypoints = cv2.findContours(edged, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    contours = keypoints[0] if len(keypoints) == 2 else keypoints[1]
+    timer.lap("contours")
+
+    frame_area = float(small.shape[0] * small.shape[1])
+    min_side = 4
+    scored = []
+    for c in contours:
+        box = cv2.boundingRect(c)
+        if box[2] < min_side or box[3] < min_side:
+            continue
+        score = _plate_score(c, box, frame_area)
+        if score > 0:
+            scored.append((score, box))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    selected = []
+    for score, box in scored:
+        if all(_iou(box, other) < 0.5 for _, other in selected):
+            selected.append((score, box))
+            if len(selected) >= top_n:
+                break
+    timer.lap("ranking")
+
+    h, w = gray.shape[:2]
+    candidates = []
+    for score, (x, y, bw, bh) in selected:
+        # Margen de un píxel del nivel reducido para no cortar los bordes.
+        x0 = max(0, int((x - 1) / scale))
+        y0 = max(0, int((y - 1) / scale))
+        x1 = min(w, int(np.ceil((x + bw + 1) / scale)))
+        y1 = min(h, int(np.ceil((y + bh + 1) / scale)))
+        candidates.append({
+            "box": (x0, y0, x1 - x0, y1 - y0),
+            "score": float(score),
+            "crop": gray[y0:y1, x0:x1],
+        })
+    timer.lap("crop")
+
+    return candidates
+
+
+def fallback_region(gray, max_side=DETECTOR_FALLBACK_MAX_SIDE):
+    # Sin candidatas, el OCR recibe la imagen reducida y no la completa.
+    small, _ = _pyramid_level(gray, max_side)
+    return small
+
+
+def detect_plate_crops(image, top_n=DETECTOR_TOP_N):
+    """Pares (región, detectada) para el OCR según DETECTOR_MODE.
+
+    `detectada` es False cuando no hubo candidata y la región es la imagen
+    completa (o su versión reducida). Siempre hay al menos una región.
+    """
+    image = load_image(image)
+    if image is None:
+        return []
+
+    gray = _gray(image)
+    if DETECTOR_MODE == "fast":
+        candidates = detect_plate_candidates(gray, top_n=top_n)
+        metrics.detections.inc(result="detected" if candidates else "fallback")
+        if candidates:
+            return [(c["crop"], True) for c in candidates]
+        return [(fallback_region(gray), False)]
+
+    region, found = _legacy_region(gray)
+    metrics.detections.inc(result="detected" if found else "fallback")
+    return [(region, found)]
+
+
+def detect_plate_regions(image, top_n=DETECTOR_TOP_N):
+    """Regiones para el OCR según DETECTOR_MODE (siempre al menos una)."""
+    return [region for region, _ in detect_plate_crops(image, top_n)]
+
+
+def _legacy_region(gray):
+    box = detect_plate_box(gray)
+    if box is None:
+        return gray, False
+
+    x, y, w, h = box
+    return gray[y:y+h, x:x+w], True
+
+
+def detect_plate_region(image):
+    image = load_image(image)
+    if image is None:
+        return None
 
-            cropped = gray[topX:bottomX+1, topY:bottomY+1]
-            return cropped
+    gray = _gray(image)
+    if DETECTOR_MODE == "fast":
+        candidates = detect_plate_candidates(gray, top_n=1)
+        return candidates[0]["crop"] if candidates else fallback_region(gray)
 
-    return gray
+    return _legacy_region(gray)[0]
@@ -0,0 +1,192 @@
+"""Índice en memoria de placas registradas, tolerante a errores típicos del OCR.
+
+El OCR confunde O/0, I/1, B/8, S/5, etc. Cada placa se reduce a una clave
+canónica (cada grupo de caracteres confundibles se colapsa a uno solo); dos
+placas que solo difieren en confusiones tienen la misma clave canónica.
+
+Para tolerar además un error "real" (una sustitución, inserción o borrado)
+se indexa cada clave canónica por su prefijo y su sufijo: si dos cadenas
+están a una edición de distancia, la edición cae en una mitad y la otra
+mitad coincide exactamente. Así una búsqueda solo revisa dos cubetas por
+longitud posible, en vez de recorrer todo el registro.
+"""
+import os
+import threading
+
+from database import get_pool, normalize_plate
+
+PLATE_INDEX_ENABLED = os.environ.get("PLATE_INDEX_ENABLED", "1") == "1"
+PLATE_FUZZY_MAX_DISTANCE = float(os.environ.get("PLATE_FUZZY_MAX_DISTANCE", "1.5"))
+PLATE_FUZZY_LIMIT = int(os.environ.get("PLATE_FUZZY_LIMIT", "5"))
+PLATE_INDEX_REFRESH_S = float(os.environ.get("PLATE_INDEX_REFRESH_S", "1.0"))  # 0 = sin hilo
+
+CONFUSION_GROUPS = ("0ODQ", "1IL", "2Z", "5S", "6G", "8B")
+CONFUSION_COST = 0.2
+
+CANONICAL = {c: group[0] for group in CONFUSION_GROUPS for c in group}
+_CANONICAL_TABLE = str.maketrans(CANONICAL)
+
+
+def canonical_key(plate):
+    return normalize_plate(plate).translate(_CANONICAL_TABLE)
+
+
+def weighted_distance(a, b):
+    """Levenshtein donde sustituir caracteres confundibles cuesta CONFUSION_COST."""
+    prev = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        cur = [float(i)]
+        ca_canonical = CANONICAL.get(ca, ca)
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                sub = 0.0
+            elif ca_canonical == CANONICAL.get(cb, cb):
+                sub = CONFUSION_COST
+            else:
+                sub = 1.0
+            cur.append(min(prev[j] + 1.0, cur[j - 1] + 1.0, prev[j - 1] + sub))
+        prev = cur
+    return prev[-1]
+
+
+def _within_one_edit(a, b):
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+
+    i = 0
+    while i < la and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def _halves(key):
+    split = len(key) // 2
+    return key[:split], key[split:]
+
+
+class PlateIndex:
+    def __init__(self):
+        self._plates = []
+        self._prefix = {}
+        self._suffix = {}
+        self._known = set()
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._plates)
+
+    def add(self, plate):
+        plate = normalize_plate(plate)
+        with self._lock:
+            if plate in self._known:
+                return
+            self._known.add(plate)
+            idx = len(self._plates)
+            self._plates.append(plate)
+
+            key = plate.translate(_CANONICAL_TABLE)
+            prefix, suffix = _halves(key)
+            self._prefix.setdefault((len(key), prefix), []).append(idx)
+            self._suffix.setdefault((len(key), suffix), []).append(idx)
+
+    def refresh(self, batch_size=50_000):
+        """Agrega los vehículos insertados desde la última carga (por id)."""
+        with self._refresh_lock:
+            self._refresh(batch_size)
+
+    def _refresh(self, batch_size):
+        with get_pool().connection() as conn:
+            while True:
+                rows = conn.execute(
+                    "SELECT id, plate_key FROM vehicles WHERE id > ? ORDER BY id LIMIT ?",
+                    (self._last_id, batch_size)).fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    if row["plate_key"]:
+                        self.add(row["plate_key"])
+                self._last_id = rows[-1]["id"]
+        self.loaded = True
+
+    def start_refresher(self, interval=PLATE_INDEX_REFRESH_S):
+        """Recarga incremental cada `interval` segundos en un hilo propio.
+
+        Las búsquedas solo leen el índice en memoria. Las escrituras de este
+        proceso (importación, API de administración) agregan sus placas al
+        momento; el hilo levanta las de otros procesos.
+        """
+        if interval <= 0 or (self._refresher is not None and self._refresher.is_alive()):
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, args=(interval,),
+                                           name="plate-index-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_refresher(self):
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def _refresh_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"No se pudo recargar el índice de placas: {e}", flush=True)
+
+    def _candidates(self, key):
+        seen = set()
+        for length in (len(key) - 1, len(key), len(key) + 1):
+            if length <= 0:
+                continue
+            split = length // 2
+            # Prefijo y sufijo que tendría una placa de esa longitud.
+            for table, part in ((self._prefix, key[:split]),
+                                (self._suffix, key[len(key) - (length - split):])):
+                for idx in table.get((length, part), ()):
+                    if idx not in seen:
+                        seen.add(idx)
+                        yield idx
+
+    def search(self, plate, limit=PLATE_FUZZY_LIMIT, max_distance=PLATE_FUZZY_MAX_DISTANCE):
+        """Placas registradas más parecidas, de mejor a peor.
+
+        Cada resultado trae `plate`, `distance` (ponderada) y `score` en [0, 1].
+        """
+        query = normalize_plate(plate)
+        key = query.translate(_CANONICAL_TABLE)
+        matches = []
+        for idx in self._candidates(key):
+            candidate = self._plates[idx]
+            if not _within_one_edit(key, candidate.translate(_CANONICAL_TABLE)):
+                continue
+            distance = weighted_distance(query, candidate)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+
+        matches.sort()
+        return [{
+            "plate": candidate,
+            "distance": round(distance, 3),
+            "score": round(max(0.0, 1.0 - distance / max(len(candidate), 1)), 3),
+        } for distance, candidate in matches[:limit]]
+
+
+plate_index = PlateIndex() if PLATE_INDEX_ENABLED else None
+
+
+def load_plate_index():
+    if plate_index is not None:
+        plate_index.refresh()
+        plate_index.start_refresher()
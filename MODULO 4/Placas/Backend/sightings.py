@@ -0,0 +1,139 @@
+"""Registro de avistamientos (placa, cámara, confianza, hora) con escritura diferida.
+
+Las peticiones solo encolan el avistamiento; un hilo lo escribe en la tabla
+`sightings` por lotes, en una transacción por lote, así que la latencia de la
+BD no se suma a la respuesta. Si la cola se llena el avistamiento se
+descarta y se cuenta, en lugar de frenar la petición.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+import metrics
+from database import ensure_db, get_connection, normalize_plate
+
+SIGHTINGS_ENABLED = os.environ.get("SIGHTINGS_ENABLED", "1") == "1"
+SIGHTINGS_QUEUE_SIZE = int(os.environ.get("SIGHTINGS_QUEUE_SIZE", "10000"))
+SIGHTINGS_BATCH_SIZE = int(os.environ.get("SIGHTINGS_BATCH_SIZE", "500"))
+SIGHTINGS_FLUSH_MS = float(os.environ.get("SIGHTINGS_FLUSH_MS", "200"))
+
+# Marca que flush() encola para que el lote en curso se escriba sin esperar
+# a que venza SIGHTINGS_FLUSH_MS.
+_FLUSH = object()
+
+INSERT_SIGHTING_SQL = """
+    INSERT INTO sightings (plate, camera, confidence, source, seen_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class SightingWriter:
+    def __init__(self, queue_size=SIGHTINGS_QUEUE_SIZE, batch_size=SIGHTINGS_BATCH_SIZE,
+                 flush_ms=SIGHTINGS_FLUSH_MS):
+        self.batch_size = batch_size
+        self.flush_s = flush_ms / 1000.0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="sightings-writer", daemon=True)
+                self._thread.start()
+
+    def record(self, plate, camera=None, confidence=None, source="image", seen_at=None):
+        if not plate:
+            return
+        self._ensure_started()
+        row = (normalize_plate(plate), camera or None, confidence, source,
+               time.time() if seen_at is None else seen_at)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        batch = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_s
+        while item is not _FLUSH:
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                return batch
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch
+        self._queue.task_done()
+        return batch
+
+    def _loop(self):
+        ensure_db()
+        conn = get_connection()
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                with conn:
+                    conn.executemany(INSERT_SIGHTING_SQL, batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"No se pudieron guardar {len(batch)} avistamientos: {e}", flush=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout=None):
+        """Espera a que se escriba lo encolado (como mucho `timeout` segundos)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        alive = self._thread is not None and self._thread.is_alive()
+        if alive and self._queue.unfinished_tasks:
+            try:
+                self._queue.put(_FLUSH, timeout=timeout)
+            except queue.Full:
+                return False
+        while self._queue.unfinished_tasks:
+            if self._thread is None or not self._thread.is_alive():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+sighting_writer = SightingWriter() if SIGHTINGS_ENABLED else None
+
+if sighting_writer is not None:
+    # Al salir se escriben los avistamientos que queden en la cola.
+    atexit.register(sighting_writer.flush, timeout=5.0)
+    metrics.Gauge("plate_sightings_pending", "Avistamientos esperando escritura.",
+                  lambda: sighting_writer.pending)
+    metrics.Gauge("plate_sightings_dropped_total", "Avistamientos descartados por cola llena.",
+                  lambda: sighting_writer.dropped, kind="counter")
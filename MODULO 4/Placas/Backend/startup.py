@@ -0,0 +1,74 @@
+import threading
+import time
+
+import database
+import ocr_engine
+import plate_index
+
+# Fases de arranque en el orden en que se ejecutan en el hilo de calentamiento.
+PHASES = [
+    ("database", database.ensure_db),
+    ("plate_index", plate_index.load_plate_index),
+    ("ocr_model", ocr_engine.warm_up_ocr),
+]
+
+_state = {
+    "started_at": None,
+    "import_seconds": None,
+    "time_to_ready_seconds": None,
+    "phases": {name: {"status": "pending", "seconds": None} for name, _ in PHASES},
+}
+_lock = threading.Lock()
+_thread = None
+
+
+def record_import(started_at):
+    with _lock:
+        _state["started_at"] = started_at
+        _state["import_seconds"] = time.perf_counter() - started_at
+
+
+def _run_phases():
+    for name, fn in PHASES:
+        phase = _state["phases"][name]
+        phase["status"] = "running"
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            phase.update(status="error", error=str(e),
+                         seconds=time.perf_counter() - start)
+            print(f"Fase de arranque '{name}' falló: {e}", flush=True)
+            return
+        phase.update(status="done", seconds=time.perf_counter() - start)
+        print(f"Fase de arranque '{name}' lista en {phase['seconds']:.2f} s", flush=True)
+
+    with _lock:
+        if _state["started_at"] is not None:
+            _state["time_to_ready_seconds"] = time.perf_counter() - _state["started_at"]
+    print(f"API lista en {_state['time_to_ready_seconds'] or 0.0:.2f} s", flush=True)
+
+
+def start_warmup():
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run_phases, name="warmup", daemon=True)
+        _thread.start()
+
+
+def is_ready():
+    return (all(p["status"] == "done" for p in _state["phases"].values())
+            and ocr_engine.ocr_ready())
+
+
+def readiness():
+    with _lock:
+        report = {
+            "ready": is_ready(),
+            "import_seconds": _state["import_seconds"],
+            "time_to_ready_seconds": _state["time_to_ready_seconds"],
+            "phases": {name: dict(p) for name, p in _state["phases"].items()},
+        }
+    return report
@@ -0,0 +1,360 @@
+"""Reconocimiento de placas en video o en un flujo de cuadros de cámara.
+
+Cada cuadro pasa por una compuerta de movimiento; solo en los cuadros que
+cambian respecto al último procesado se ejecuta la detección. Las cajas de
+placa se siguen entre cuadros, cada vehículo se manda al OCR unas pocas
+veces y al final se emite una sola placa por vehículo, por votación.
+
+Uso:
+    python stream_recognizer.py video.mp4
+    python stream_recognizer.py 0            # cámara local
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+import ocr_engine
+from ocr_pool import OCRQueueFull
+from plate_detector import (DETECTOR_MODE, DETECTOR_TOP_N, detect_plate_box,
+                            detect_plate_candidates)
+
+STREAM_DETECT_MAX_SIDE = int(os.environ.get("STREAM_DETECT_MAX_SIDE", "960"))
+STREAM_MOTION_THRESHOLD = float(os.environ.get("STREAM_MOTION_THRESHOLD", "2.0"))
+STREAM_MAX_SKIP = int(os.environ.get("STREAM_MAX_SKIP", "15"))
+STREAM_MAX_OCR_PER_TRACK = int(os.environ.get("STREAM_MAX_OCR_PER_TRACK", "3"))
+STREAM_TRACK_MAX_MISSED = int(os.environ.get("STREAM_TRACK_MAX_MISSED", "5"))
+
+
+class MotionGate:
+    """Deja pasar un cuadro si difiere lo suficiente del último procesado.
+
+    La diferencia se mide como el promedio absoluto (0-255) entre versiones
+    reducidas y suavizadas de ambos cuadros. Cada `max_skip` cuadros se deja
+    pasar uno aunque no haya movimiento, para no perder vehículos detenidos.
+    """
+
+    def __init__(self, threshold=STREAM_MOTION_THRESHOLD, max_skip=STREAM_MAX_SKIP,
+                 width=160):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.width = width
+        self._last = None
+        self._skipped = 0
+
+    def _signature(self, frame):
+        # Submuestreo con paso fijo antes de promediar: es mucho más barato
+        # que INTER_AREA sobre el cuadro completo y basta para medir cambios.
+        step = max(1, frame.shape[1] // (2 * self.width))
+        frame = frame[::step, ::step]
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(1, int(h * self.width / w))),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def accept(self, frame):
+        signature = self._signature(frame)
+        if self._last is not None and self._skipped < self.max_skip:
+            if float(cv2.absdiff(signature, self._last).mean()) < self.threshold:
+                self._skipped += 1
+                return False
+
+        self._last = signature
+        self._skipped = 0
+        return True
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _center_distance(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    d = np.hypot((ax + aw / 2) - (bx + bw / 2), (ay + ah / 2) - (by + bh / 2))
+    return d / max(np.hypot(aw, ah), 1.0)
+
+
+class PlateTrack:
+    def __init__(self, track_id, box, frame_index):
+        self.id = track_id
+        self.box = box
+        self.first_frame = frame_index
+        self.last_frame = frame_index
+        self.missed = 0
+        self.hits = 1
+        self.reads = []
+        self.pending = []
+
+    @property
+    def ocr_requests(self):
+        return len(self.reads) + len(self.pending)
+
+    def collect(self, wait=False):
+        still_pending = []
+        for future in self.pending:
+            if not wait and not future.done():
+                still_pending.append(future)
+                continue
+            try:
+                text, conf = future.result(timeout=ocr_engine.OCR_TIMEOUT_S)
+            except Exception:
+                continue
+            if text:
+                self.reads.append((text, conf))
+        self.pending = still_pending
+
+
+def consensus(reads):
+    """Placa por votación carácter a carácter, ponderada por la confianza.
+
+    Solo votan las lecturas con la longitud más frecuente (ponderada), para
+    que una lectura con un carácter de más no desalinee a las demás.
+    """
+    if not reads:
+        return None, 0.0
+
+    by_length = defaultdict(float)
+    for text, conf in reads:
+        by_length[len(text)] += conf
+    length = max(by_length, key=by_length.get)
+    voters = [(t, c) for t, c in reads if len(t) == length]
+
+    chars = []
+    agreement = []
+    total = sum(c for _, c in voters) or 1.0
+    for i in range(length):
+        votes = defaultdict(float)
+        for text, conf in voters:
+            votes[text[i]] += conf
+        char = max(votes, key=votes.get)
+        chars.append(char)
+        agreement.append(votes[char] / total)
+
+    mean_conf = sum(c for _, c in voters) / len(voters)
+    return "".join(chars), float(mean_conf * min(agreement))
+
+
+class StreamRecognizer:
+    def __init__(self, detect_max_side=STREAM_DETECT_MAX_SIDE,
+                 max_ocr_per_track=STREAM_MAX_OCR_PER_TRACK,
+                 max_missed=STREAM_TRACK_MAX_MISSED, gate=None):
+        self.detect_max_side = detect_max_side
+        self.max_ocr_per_track = max_ocr_per_track
+        self.max_missed = max_missed
+        self.gate = gate or MotionGate()
+        self.tracks = []
+        self._next_id = 1
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.ocr_requests = 0
+        self.ocr_rejected = 0
+        self._started_at = None
+        self._busy_seconds = 0.0
+
+    def _detect(self, gray):
+        if DETECTOR_MODE == "fast":
+            # Ya trabaja sobre la pirámide y admite varias placas por cuadro.
+            candidates = detect_plate_candidates(gray, top_n=DETECTOR_TOP_N)
+            return [c["box"] for c in candidates]
+
+        h, w = gray.shape[:2]
+        scale = min(1.0, self.detect_max_side / float(max(h, w)))
+        small = gray if scale == 1.0 else cv2.resize(
+            gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+        box = detect_plate_box(small)
+        if box is None:
+            return []
+
+        x, y, bw, bh = (int(round(v / scale)) for v in box)
+        return [(x, y, min(bw, w - x), min(bh, h - y))]
+
+    def _match(self, box):
+        best, best_score = None, 0.0
+        for track in self.tracks:
+            score = _iou(track.box, box)
+            if score < 0.1 and _center_distance(track.box, box) < 1.0:
+                score = 0.1
+            if score > best_score:
+                best, best_score = track, score
+        return best
+
+    def _request_ocr(self, track, gray):
+        if track.ocr_requests >= self.max_ocr_per_track:
+            return
+        x, y, w, h = track.box
+        crop = gray[y:y + h, x:x + w]
+        if crop.size == 0:
+            return
+        try:
+            track.pending.append(ocr_engine.batcher.submit(np.ascontiguousarray(crop), crop=True))
+            self.ocr_requests += 1
+        except OCRQueueFull:
+            self.ocr_rejected += 1
+
+    def process(self, frame, frame_index=None):
+        """Procesa un cuadro BGR; devuelve los vehículos que ya salieron de escena."""
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+        self.frames_received += 1
+        frame_index = self.frames_received - 1 if frame_index is None else frame_index
+
+        start = time.perf_counter()
+        finished = []
+
+        # La compuerta trabaja sobre el cuadro reducido: los cuadros
+        # descartados no pagan la conversión a gris de la resolución completa.
+        if self.gate.accept(frame):
+            self.frames_processed += 1
+            gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            matched = set()
+            for box in self._detect(gray):
+                track = self._match(box)
+                if track is None or track.id in matched:
+                    track = PlateTrack(self._next_id, box, frame_index)
+                    self._next_id += 1
+                    self.tracks.append(track)
+                else:
+                    track.box = box
+                    track.last_frame = frame_index
+                    track.hits += 1
+                    track.missed = 0
+                matched.add(track.id)
+                self._request_ocr(track, gray)
+
+            for track in self.tracks:
+                if track.id not in matched:
+                    track.missed += 1
+
+            alive = []
+            for track in self.tracks:
+                (finished if track.missed > self.max_missed else alive).append(track)
+            self.tracks = alive
+
+        for track in self.tracks:
+            track.collect()
+
+        self._busy_seconds += time.perf_counter() - start
+        return [self._summarize(t) for t in finished]
+
+    def finish(self):
+        """Cierra todos los seguimientos abiertos y devuelve sus vehículos."""
+        finished, self.tracks = self.tracks, []
+        return [self._summarize(t) for t in finished]
+
+    def _summarize(self, track):
+        track.collect(wait=True)
+        plate, confidence = consensus(track.reads)
+        return {
+            "track_id": track.id,
+            "plate": plate,
+            "confidence": confidence,
+            "reads": [text for text, _ in track.reads],
+            "first_frame": track.first_frame,
+            "last_frame": track.last_frame,
+        }
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "frames_received": self.frames_received,
+            "frames_processed": self.frames_processed,
+            "processed_ratio": (self.frames_processed / self.frames_received
+                                if self.frames_received else 0.0),
+            "ocr_requests": self.ocr_requests,
+            "ocr_rejected": self.ocr_rejected,
+            "elapsed_s": elapsed,
+            "throughput_fps": self.frames_received / elapsed if elapsed > 0 else 0.0,
+            "busy_ms_per_frame": (1000 * self._busy_seconds / self.frames_received
+                                  if self.frames_received else 0.0),
+        }
+
+
+class VideoTooLong(Exception):
+    """El video supera el límite de cuadros o de tiempo de recognize_video."""
+
+
+def recognize_video(source, max_frames=None, max_seconds=None, strict=False, **kwargs):
+    """Procesa un video (ruta) o una cámara (índice) completo.
+
+    max_frames y max_seconds (segundos de procesamiento) acotan el trabajo:
+    al llegar a cualquiera se deja de leer y stats["truncated"] es True. Con
+    strict=True se lanza VideoTooLong, sin procesar nada si el contenedor ya
+    declara más de max_frames cuadros.
+    """
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"No se pudo abrir el video: {source}")
+
+    if strict and max_frames is not None:
+        declared = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if declared > max_frames:
+            capture.release()
+            raise VideoTooLong(f"El video tiene {declared} cuadros; el máximo es {max_frames}.")
+
+    input_fps = capture.get(cv2.CAP_PROP_FPS) or None
+    recognizer = StreamRecognizer(**kwargs)
+    deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+    vehicles = []
+    truncated = False
+    try:
+        while True:
+            limit = None
+            if max_frames is not None and recognizer.frames_received >= max_frames:
+                limit = f"más de {max_frames} cuadros"
+            elif deadline is not None and time.perf_counter() > deadline:
+                limit = f"más de {max_seconds:g} s de procesamiento"
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if limit is not None:
+                # Quedan cuadros sin leer.
+                if strict:
+                    raise VideoTooLong(f"El video requiere {limit}.")
+                truncated = True
+                break
+            vehicles.extend(recognizer.process(frame))
+        vehicles.extend(recognizer.finish())
+    finally:
+        capture.release()
+
+    stats = recognizer.stats()
+    stats["input_fps"] = input_fps
+    stats["truncated"] = truncated
+    return [v for v in vehicles if v["plate"]], stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconocimiento de placas en video o cámara")
+    parser.add_argument("source", help="Ruta del video o índice de la cámara")
+    parser.add_argument("--max-frames", type=int, default=None, help="Límite de cuadros a leer")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Límite de segundos de procesamiento")
+    parser.add_argument("--max-ocr", type=int, default=STREAM_MAX_OCR_PER_TRACK,
+                        help="Lecturas de OCR por vehículo")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    vehicles, stats = recognize_video(source, max_frames=args.max_frames,
+                                      max_seconds=args.max_seconds,
+                                      max_ocr_per_track=args.max_ocr)
+    for vehicle in vehicles:
+        print(json.dumps(vehicle, ensure_ascii=False))
+    print(json.dumps({"stats": stats}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKES = os.path.join(BACKEND, "tests", "fakes")
+
+sys.path.insert(0, BACKEND)
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """vehicles.db nueva en un directorio temporal, con los datos de ejemplo."""
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "vehicles.db"))
+    monkeypatch.setattr(database, "_db_ready", False)
+    monkeypatch.setattr(database, "_pool", None)
+    database.ensure_db()
+    yield database
+    if database._pool is not None:
+        database._pool.close_all()
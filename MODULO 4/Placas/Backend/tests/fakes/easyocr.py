@@ -0,0 +1,20 @@
+"""Sustituto de EasyOCR para las pruebas: no carga modelos.
+
+Lee el "texto" de la imagen a partir de su primer píxel: 255 hace que el
+proceso termine de golpe (como si lo matara el sistema por falta de memoria).
+"""
+import os
+
+
+class Reader:
+    def __init__(self, languages, **kwargs):
+        self.languages = languages
+
+    def readtext(self, image):
+        value = int(image.flat[0])
+        if value == 255:
+            os._exit(1)
+        return [(None, f"ABC{value:03d}", 0.9)]
+
+    def readtext_batched(self, images):
+        return [self.readtext(image) for image in images]
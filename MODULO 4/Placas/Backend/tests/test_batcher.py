@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from ocr_engine import OCRBatcher, OCRQueueFull
+
+
+class Runner:
+    """Devuelve el texto de cada región y registra los lotes recibidos."""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, regions, crops):
+        self.batches.append(list(regions))
+        time.sleep(self.delay)
+        return [(f"R{r}", 0.9) for r in regions]
+
+
+def test_each_future_gets_its_own_result_in_order():
+    runner = Runner()
+    batcher = OCRBatcher(max_batch_size=4, max_wait_ms=20, runner=runner, max_pending=100)
+    futures = [batcher.submit(i) for i in range(10)]
+
+    assert [f.result(timeout=5) for f in futures] == [(f"R{i}", 0.9) for i in range(10)]
+    assert [r for batch in runner.batches for r in batch] == list(range(10))
+    assert max(len(batch) for batch in runner.batches) <= 4
+
+
+def test_concurrent_requests_share_a_batch():
+    runner = Runner()
+    batcher = OCRBatcher(max_batch_size=8, max_wait_ms=200, runner=runner, max_pending=100)
+    barrier = threading.Barrier(8)
+    results = [None] * 8
+
+    def request(i):
+        barrier.wait()
+        results[i] = batcher.submit(i).result(timeout=5)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [(f"R{i}", 0.9) for i in range(8)]
+    assert len(runner.batches) < 8
+
+
+def test_partial_batch_is_sent_after_max_wait():
+    runner = Runner()
+    batcher = OCRBatcher(max_batch_size=100, max_wait_ms=30, runner=runner, max_pending=100)
+    start = time.monotonic()
+    assert batcher.submit(1).result(timeout=5) == ("R1", 0.9)
+    elapsed = time.monotonic() - start
+    assert 0.025 <= elapsed < 1.0
+
+
+def test_runner_errors_reach_every_future_and_the_loop_survives():
+    calls = []
+
+    def runner(regions, crops):
+        calls.append(regions)
+        if len(calls) == 1:
+            raise ValueError("falla")
+        return [(None, 0.0)] * len(regions)
+
+    batcher = OCRBatcher(max_batch_size=2, max_wait_ms=50, runner=runner, max_pending=100)
+    failed = [batcher.submit(i) for i in range(2)]
+    for f in failed:
+        with pytest.raises(ValueError):
+            f.result(timeout=5)
+    assert batcher.submit(3).result(timeout=5) == (None, 0.0)
+
+
+def test_runner_returning_a_future_is_chained():
+    pending = []
+
+    def runner(regions, crops):
+        job = Future()
+        pending.append((job, regions))
+        return job
+
+    batcher = OCRBatcher(max_batch_size=2, max_wait_ms=50, runner=runner, max_pending=100)
+    futures = [batcher.submit(i) for i in range(2)]
+    deadline = time.monotonic() + 5
+    while not pending:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    job, regions = pending[0]
+    assert not futures[0].done()
+    job.set_result([(f"R{r}", 0.5) for r in regions])
+    assert [f.result(timeout=5) for f in futures] == [("R0", 0.5), ("R1", 0.5)]
+
+
+def test_timed_out_request_is_cancelled_before_ocr():
+    release = threading.Event()
+
+    def runner(regions, crops):
+        release.wait(5)
+        return [("X", 1.0)] * len(regions)
+
+    batcher = OCRBatcher(max_batch_size=1, max_wait_ms=0, runner=runner, max_pending=10)
+    first = batcher.submit(0)        # ocupa el hilo del batcher
+    waiting = batcher.submit(1)
+    with pytest.raises(TimeoutError):
+        waiting.result(timeout=0.05)
+    assert waiting.cancel()          # quien se rindió ya no gasta OCR
+    release.set()
+    assert first.result(timeout=5) == ("X", 1.0)
+    assert batcher.submit(2).result(timeout=5) == ("X", 1.0)
+
+
+def test_full_queue_rejects_new_regions():
+    release = threading.Event()
+
+    def runner(regions, crops):
+        release.wait(5)
+        return [("X", 1.0)] * len(regions)
+
+    batcher = OCRBatcher(max_batch_size=1, max_wait_ms=0, runner=runner, max_pending=2)
+    futures = [batcher.submit(0)]
+    time.sleep(0.05)                 # el primero ya salió de la cola
+    futures += [batcher.submit(1), batcher.submit(2)]
+    with pytest.raises(OCRQueueFull):
+        batcher.submit(3)
+    release.set()
+    assert [f.result(timeout=5) for f in futures] == [("X", 1.0)] * 3
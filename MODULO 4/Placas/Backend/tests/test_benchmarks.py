@@ -0,0 +1,45 @@
+import re
+
+import numpy as np
+
+from benchmarks import bench_e2e
+from benchmarks.synthetic import box_iou, random_plate_text, render_plate, synthetic_scene
+
+
+def test_scenes_are_reproducible_and_box_holds_the_plate():
+    a, text_a, box_a = synthetic_scene(np.random.default_rng(5), width=640, height=360)
+    b, text_b, box_b = synthetic_scene(np.random.default_rng(5), width=640, height=360)
+    np.testing.assert_array_equal(a, b)
+    assert (text_a, box_a) == (text_b, box_b)
+    assert re.fullmatch(r"[A-Z]{3}[0-9]{4}", text_a)
+
+    x, y, w, h = box_a
+    assert 0 <= x and x + w <= 640 and 0 <= y and y + h <= 360
+    # La placa es clara: el interior de la caja es más brillante que el promedio.
+    assert a[y + h // 4:y + 3 * h // 4, x + w // 4:x + 3 * w // 4].mean() > a.mean()
+    assert render_plate("ABC1234").shape == (150, 300, 3)
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == 50 / 150
+    assert box_iou((0, 0, 10, 10), (20, 20, 5, 5)) == 0.0
+
+
+def test_registry_contains_registered_scenes_and_unique_filler():
+    rng = np.random.default_rng(0)
+    dataset = [{"plate": random_plate_text(rng), "registered": i % 2 == 0} for i in range(6)]
+    rows = list(bench_e2e.registry_rows(rng, dataset, 50))
+
+    plates = [row["plate"] for row in rows]
+    assert len(rows) == 50 and len(set(plates)) == 50
+    assert plates[:3] == [d["plate"] for d in dataset if d["registered"]]
+    assert not {d["plate"] for d in dataset if not d["registered"]} & set(plates)
+    assert [row["owner_id"] for row in rows] == list(range(1, 51))
+
+
+def test_char_accuracy():
+    assert bench_e2e.char_accuracy("ABC1234", "ABC1234") == 1.0
+    assert bench_e2e.char_accuracy("A8C1234", "ABC1234") == 6 / 7
+    assert bench_e2e.char_accuracy("ABC123", "ABC1234") == 6 / 7
+    assert bench_e2e.char_accuracy(None, "ABC1234") == 0.0
@@ -0,0 +1,82 @@
+import bulk_import
+import models
+
+
+def _row(plate, owner_id=1, name="Ana", **extra):
+    return dict({"owner_id": owner_id, "owner_name": name, "plate": plate}, **extra)
+
+
+def _vehicles(db):
+    with db.get_pool().connection() as conn:
+        return [tuple(row) for row in conn.execute(
+            "SELECT plate, plate_key, brand, year, owner_id FROM vehicles ORDER BY id")]
+
+
+def test_upsert_matches_existing_plate_in_any_spelling(db):
+    # La BD de ejemplo ya tiene VBA1234 (owner 1) y ABC9876 (owner 2).
+    summary = bulk_import.import_rows([
+        _row("vba-1234", owner_id=3, name="Nuevo", brand="Mazda", year="2022"),
+        _row(" abc 9876 ", owner_id=2, name="María López", year="2019"),
+    ], update_index=False)
+
+    assert summary["written"] == 2 and summary["rejected"] == 0
+    assert _vehicles(db) == [
+        ("VBA1234", "VBA1234", "Mazda", 2022, 3),
+        ("ABC9876", "ABC9876", None, 2019, 2),
+    ]
+
+
+def test_existing_unnormalized_spelling_is_updated_not_duplicated(db):
+    with db.get_pool().connection() as conn, conn:
+        conn.execute("INSERT INTO vehicles (plate, owner_id) VALUES ('xyz-9', 1)")
+
+    bulk_import.import_rows([_row("XYZ9", owner_id=2, brand="Kia")], update_index=False)
+
+    rows = [row for row in _vehicles(db) if row[1] == "XYZ9"]
+    assert rows == [("xyz-9", "XYZ9", "Kia", None, 2)]
+
+
+def test_conflicts_inside_one_chunk_and_across_chunks(db):
+    rows = [_row(f"NEW{i:03d}", brand="A") for i in range(5)]
+    rows += [_row(f"new-{i:03d}", brand="B") for i in range(5)]
+    summary = bulk_import.import_rows(rows, chunk_size=3, update_index=False)
+
+    assert summary["chunks"] == 4
+    new = [row for row in _vehicles(db) if row[1].startswith("NEW")]
+    assert [(row[1], row[2]) for row in new] == [(f"NEW{i:03d}", "B") for i in range(5)]
+
+
+def test_invalid_rows_are_rejected_and_reported(db):
+    summary = bulk_import.import_rows([
+        _row("OK1"),
+        {"owner_id": "x", "owner_name": "A", "plate": "BAD1"},
+        _row(""),
+        _row("BAD2", year="dos mil"),
+        _row("OK2", name="Ana María"),
+    ], update_index=False)
+
+    assert (summary["rows"], summary["written"], summary["rejected"]) == (5, 2, 3)
+    assert [e["row"] for e in summary["errors"]] == [2, 3, 4]
+    with db.get_pool().connection() as conn:
+        owner = conn.execute("SELECT name FROM owners WHERE id = 1").fetchone()
+    assert owner["name"] == "Ana María"
+
+
+def test_import_invalidates_owner_cache(db):
+    models.invalidate_owners()
+    assert models.find_owner_by_plate("ABC9876")["owner_name"] == "María López"
+    bulk_import.import_rows([_row("ABC9876", owner_id=7, name="Otra")], update_index=False)
+    assert models.find_owner_by_plate("ABC9876")["owner_name"] == "Otra"
+
+
+def test_reads_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "padron.csv"
+    csv_path.write_text("owner_id,owner_name,plate\n1,Ana,AAA111\n", encoding="utf-8")
+    jsonl_path = tmp_path / "padron.jsonl"
+    jsonl_path.write_text('{"owner_id": 1, "owner_name": "Ana", "plate": "AAA111"}\n\n',
+                          encoding="utf-8")
+
+    assert list(bulk_import.read_rows(str(csv_path))) == [
+        {"owner_id": "1", "owner_name": "Ana", "plate": "AAA111"}]
+    assert list(bulk_import.read_rows(str(jsonl_path))) == [
+        {"owner_id": 1, "owner_name": "Ana", "plate": "AAA111"}]
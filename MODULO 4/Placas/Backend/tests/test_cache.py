@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+import cache
+from cache import MISSING, ImageResultCache, LRUTTLCache
+from image_io import perceptual_hash
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUTTLCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1          # "a" pasa a ser la más reciente
+    lru.set("c", 3)
+
+    assert "b" not in lru
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries(clock):
+    lru = LRUTTLCache(maxsize=10, ttl=5)
+    lru.set("a", None)                # también se guardan los "no encontrado"
+    clock.now += 4.9
+    assert lru.get("a", "default") is None
+    clock.now += 0.2
+    assert lru.get("a", "default") == "default"
+
+    stats = lru.stats()
+    assert stats["expirations"] == 1
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_set_renews_ttl(clock):
+    lru = LRUTTLCache(maxsize=10, ttl=5)
+    lru.set("a", 1)
+    clock.now += 4
+    lru.set("a", 2)
+    clock.now += 4
+    assert lru.get("a") == 2
+
+
+def test_invalidate_one_or_all():
+    lru = LRUTTLCache(maxsize=10, ttl=60)
+    for key in "abc":
+        lru.set(key, key)
+    lru.invalidate("a")
+    assert "a" not in lru and len(lru) == 2
+    lru.invalidate()
+    assert len(lru) == 0
+    assert lru.stats()["invalidations"] == 3
+
+
+def test_peek_does_not_count():
+    lru = LRUTTLCache(maxsize=10, ttl=60)
+    lru.set("a", 1)
+    assert lru.peek("a") == 1
+    assert lru.peek("b") is MISSING
+    assert (lru.hits, lru.misses) == (0, 0)
+
+
+def _frame(seed, plate_value):
+    # Mismo fondo de cámara; solo cambia la zona de la placa.
+    rng = np.random.default_rng(seed)
+    frame = (rng.random((240, 320)) * 255).astype(np.uint8)
+    frame[185:195, 150:180] = plate_value
+    return frame
+
+
+def test_image_cache_reuses_only_identical_bytes_by_default():
+    images = ImageResultCache(maxsize=10, ttl=60)
+    first, second = _frame(0, 90), _frame(0, 160)
+    images.set(("ABC123", 0.9), digest="sha-1", phash=perceptual_hash(first))
+
+    assert images.lookup_digest("sha-1") == ("ABC123", 0.9)
+    assert images.lookup_digest("sha-2") is MISSING
+    assert images.stats()["misses"] == 1
+    assert not images.perceptual
+    # Dos autos distintos frente a la misma cámara quedan a pocos bits.
+    assert bin(perceptual_hash(first) ^ perceptual_hash(second)).count("1") <= 6
+
+
+def test_image_cache_perceptual_lookup_is_opt_in():
+    images = ImageResultCache(maxsize=10, ttl=60, max_distance=6, perceptual=True)
+    phash = perceptual_hash(_frame(0, 40))
+    images.set(("ABC123", 0.9), phash=phash)
+
+    assert images.lookup_phash(phash ^ 0b101) == ("ABC123", 0.9)
+    assert images.lookup_phash(phash ^ (2 ** 7 - 1)) is MISSING
+    stats = images.stats()
+    assert (stats["similar_hits"], stats["misses"]) == (1, 1)
@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+import database
+
+LEGACY_SCHEMA = """
+    CREATE TABLE owners (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                         phone TEXT, email TEXT);
+    CREATE TABLE vehicles (id INTEGER PRIMARY KEY AUTOINCREMENT, plate TEXT NOT NULL UNIQUE,
+                           brand TEXT, model TEXT, year INTEGER, owner_id INTEGER NOT NULL);
+    INSERT INTO owners (id, name) VALUES (1, 'Uno'), (2, 'Dos');
+"""
+
+
+def _plate_key(conn, plate):
+    row = conn.execute("SELECT plate_key FROM vehicles WHERE plate = ?", (plate,)).fetchone()
+    return row[0]
+
+
+def test_plate_key_is_computed_on_insert_and_update(db):
+    with db.get_pool().connection() as conn:
+        with conn:
+            conn.execute("INSERT INTO vehicles (plate, owner_id) VALUES ('xyz-12 3', 1)")
+        assert _plate_key(conn, "xyz-12 3") == "XYZ123"
+        with conn:
+            conn.execute("UPDATE vehicles SET plate = 'q-1' WHERE plate = 'xyz-12 3'")
+        assert _plate_key(conn, "q-1") == "Q1"
+        assert db.normalize_plate("xyz-12 3") == "XYZ123"
+
+
+def test_plate_key_is_unique(db):
+    with db.get_pool().connection() as conn:
+        with pytest.raises(sqlite3.IntegrityError):
+            with conn:
+                conn.execute("INSERT INTO vehicles (plate, owner_id) VALUES ('vba-1234', 1)")
+
+
+def test_lookup_uses_plate_key_index(db):
+    with db.get_pool().connection() as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM vehicles WHERE plate_key = ?",
+                            ("VBA1234",)).fetchall()
+    assert "idx_vehicles_plate_key" in " ".join(row["detail"] for row in plan)
+
+
+def _migrate(path, monkeypatch, **kwargs):
+    monkeypatch.setattr(database, "DB_NAME", str(path))
+    monkeypatch.setattr(database, "_db_ready", False)
+    database.init_db(**kwargs)
+    return _read(path)
+
+
+def _read(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT plate, plate_key FROM vehicles ORDER BY id").fetchall()
+    triggers = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    conn.close()
+    return rows, triggers
+
+
+def _legacy_with_duplicates(tmp_path):
+    path = tmp_path / "vehicles.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA + """
+        INSERT INTO vehicles (plate, owner_id) VALUES ('ABC-123', 1), ('XYZ9', 1), ('abc123', 2);
+    """)
+    conn.close()
+    return path
+
+
+def test_migration_stops_on_duplicate_keys_without_deleting(tmp_path, monkeypatch):
+    path = _legacy_with_duplicates(tmp_path)
+
+    with pytest.raises(RuntimeError, match="ABC123: ABC-123, abc123"):
+        _migrate(path, monkeypatch)
+    rows, _ = _read(path)
+    assert [plate for plate, _ in rows] == ["ABC-123", "XYZ9", "abc123"]
+
+    # El siguiente arranque vuelve a detenerse: el índice UNIQUE no se creó.
+    with pytest.raises(RuntimeError):
+        _migrate(path, monkeypatch)
+    assert len(_read(path)[0]) == 3
+
+
+def test_drop_duplicates_keeps_newest(tmp_path, monkeypatch):
+    path = _legacy_with_duplicates(tmp_path)
+
+    rows, triggers = _migrate(path, monkeypatch, drop_duplicates=True)
+    assert rows == [("XYZ9", "XYZ9"), ("abc123", "ABC123")]
+    assert triggers == []
+    assert _migrate(path, monkeypatch) == (rows, triggers)
+
+
+def test_migrates_trigger_maintained_plate_key(tmp_path, monkeypatch):
+    path = tmp_path / "vehicles.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA + """
+        ALTER TABLE vehicles ADD COLUMN plate_key TEXT;
+        CREATE INDEX idx_vehicles_plate_key ON vehicles (plate_key);
+        CREATE TRIGGER trg_vehicles_plate_key_insert AFTER INSERT ON vehicles
+        BEGIN
+            UPDATE vehicles SET plate_key = UPPER(NEW.plate) WHERE id = NEW.id;
+        END;
+        INSERT INTO vehicles (plate, owner_id) VALUES ('ab-1', 1);
+    """)
+    conn.close()
+
+    rows, triggers = _migrate(path, monkeypatch)
+    assert rows == [("ab-1", "AB1")]
+    assert triggers == []
+    # Una segunda migración no cambia nada.
+    assert _migrate(path, monkeypatch) == (rows, triggers)
@@ -0,0 +1,52 @@
+import io
+import os
+
+import cv2
+import numpy as np
+
+from image_io import UploadArchive, content_hash, decode_image, load_image
+
+
+def _jpeg(value=120):
+    image = np.full((40, 60, 3), value, np.uint8)
+    ok, data = cv2.imencode(".jpg", image)
+    assert ok
+    return data.tobytes()
+
+
+def test_decodes_bytes_streams_paths_and_arrays(tmp_path):
+    data = _jpeg()
+    path = tmp_path / "foto.jpg"
+    path.write_bytes(data)
+    array = decode_image(data)
+
+    assert array.shape == (40, 60, 3)
+    for source in (data, bytearray(data), memoryview(data), io.BytesIO(data), str(path), path):
+        np.testing.assert_array_equal(load_image(source), array)
+    assert load_image(array) is array
+
+
+def test_invalid_or_empty_uploads_decode_to_none():
+    assert decode_image(b"") is None
+    assert decode_image(b"no es una imagen") is None
+
+
+def test_archive_names_files_by_content_and_skips_duplicates(tmp_path):
+    archive = UploadArchive(folder=str(tmp_path / "uploads"), queue_size=10)
+    data = _jpeg()
+    archive.submit(data, "IMG_1.JPG")
+    archive.submit(data, "otra.jpg")
+    archive.submit(_jpeg(30), "")
+    archive.flush()
+
+    names = sorted(os.listdir(tmp_path / "uploads"))
+    assert names == sorted([content_hash(data) + ".jpg", content_hash(_jpeg(30)) + ".jpg"])
+    assert archive.saved == 3 and archive.dropped == 0
+
+
+def test_archive_drops_when_queue_is_full(tmp_path):
+    archive = UploadArchive(folder=str(tmp_path / "uploads"), queue_size=1)
+    archive._ensure_started = lambda: None       # sin hilo: la cola no se vacía
+    archive.submit(b"a")
+    archive.submit(b"b")
+    assert archive.dropped == 1
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import ocr_engine
+
+
+class FakeReader:
+    """Lee el texto según el valor de los píxeles de cada región o recorte."""
+
+    def __init__(self, texts):
+        self.texts = texts           # valor de píxel -> (texto, confianza)
+        self.recognize_calls = []
+        self.full_calls = 0
+
+    def recognize(self, canvas, horizontal_list, free_list, allowlist, batch_size):
+        self.recognize_calls.append(len(horizontal_list))
+        results = []
+        for x0, x1, y0, y1 in horizontal_list:
+            text, conf = self.texts[int(canvas[y0, x0])]
+            results.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, conf))
+        return results
+
+    def readtext(self, image):
+        self.full_calls += 1
+        text, conf = self.texts[int(image.flat[0])]
+        return [(None, text.lower(), conf)]
+
+    def readtext_batched(self, images):
+        return [self.readtext(image) for image in images]
+
+
+@pytest.fixture
+def reader(monkeypatch):
+    reader = FakeReader({10: ("ABC1234", 0.9), 20: ("ABC1234", 0.3), 30: ("HOLA", 0.95),
+                         40: ("XYZ987", 0.8)})
+    monkeypatch.setattr(ocr_engine, "reader", reader)
+    monkeypatch.setattr(ocr_engine, "OCR_MODE", "recognize")
+    return reader
+
+
+def _region(value, shape=(20, 60)):
+    return np.full(shape, value, np.uint8)
+
+
+def test_confident_plate_crops_skip_full_ocr(reader):
+    results = ocr_engine.recognize_regions([_region(10), _region(10, (25, 40))], [True, True])
+    assert results == [("ABC1234", 0.9), ("ABC1234", 0.9)]
+    assert reader.recognize_calls == [2]      # un solo llamado para ambos recortes
+    assert reader.full_calls == 0
+
+
+def test_doubtful_or_unformatted_reads_fall_back_to_full(reader):
+    regions = [_region(20), _region(30), _region(10), _region(40)]
+    results = ocr_engine.recognize_regions(regions, [True, True, True, False])
+    assert results == [("ABC1234", 0.3), ("HOLA", 0.95), ("ABC1234", 0.9), ("XYZ987", 0.8)]
+    assert reader.recognize_calls == [3]      # la región 3 no es recorte del detector
+    assert reader.full_calls == 3
+
+
+def test_full_mode_ignores_crop_flags(reader, monkeypatch):
+    monkeypatch.setattr(ocr_engine, "OCR_MODE", "full")
+    assert ocr_engine.recognize_regions([_region(10)], [True]) == [("ABC1234", 0.9)]
+    assert reader.recognize_calls == []
+
+
+def test_plate_format():
+    assert ocr_engine.matches_plate_format("ABC1234")
+    assert ocr_engine.matches_plate_format("AB12345")
+    assert not ocr_engine.matches_plate_format("HOLA")
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+import pytest
+
+from conftest import FAKES
+from ocr_pool import OCRQueueFull, OCRWorkerDied, OCRWorkerPool
+
+
+def _region(value):
+    return np.full((10, 20), value, np.uint8)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Los procesos "spawn" heredan sys.path: cargan el EasyOCR falso.
+    monkeypatch.syspath_prepend(FAKES)
+    pool = OCRWorkerPool(workers=2, queue_size=1, watchdog_s=0.05)
+    pool.start()
+    deadline = time.monotonic() + 30
+    while not pool.ready:
+        assert time.monotonic() < deadline, "los procesos no arrancaron"
+        time.sleep(0.05)
+    yield pool
+    pool.shutdown()
+
+
+def test_results_in_submission_order(pool):
+    futures = [pool.submit([_region(i), _region(i + 1)]) for i in range(6)]
+    for i, future in enumerate(futures):
+        assert future.result(timeout=10) == [(f"ABC{i:03d}", 0.9), (f"ABC{i + 1:03d}", 0.9)]
+    assert pool.stats()["jobs_completed"] == 6
+
+
+def test_dead_worker_fails_its_job_and_is_replaced(pool):
+    future = pool.submit([_region(255)])
+    with pytest.raises(OCRWorkerDied):
+        future.result(timeout=10)
+
+    # Sus lugares en la cola se liberaron y el proceso se reemplazó.
+    futures = [pool.submit([_region(i)]) for i in range(10)]
+    assert [f.result(timeout=30) for f in futures] == [[(f"ABC{i:03d}", 0.9)] for i in range(10)]
+    stats = pool.stats()
+    assert stats["workers_restarted"] == 1
+    assert stats["workers_alive"] == 2
+    assert stats["jobs_failed"] == 1
+
+
+def test_rejects_when_full(pool):
+    # Cada proceso tiene un trabajo y la cola uno más: el siguiente no cabe.
+    pool._slots.acquire()
+    pool._slots.acquire()
+    pool._slots.acquire()
+    with pytest.raises(OCRQueueFull):
+        pool.submit([_region(1)], block=False)
+    for _ in range(3):
+        pool._slots.release()
+    assert pool.stats()["jobs_rejected"] == 1
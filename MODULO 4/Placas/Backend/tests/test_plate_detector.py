@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+import pytest
+
+import plate_detector
+from benchmarks.synthetic import synthetic_scene
+
+
+@pytest.fixture(params=["legacy", "fast"])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(plate_detector, "DETECTOR_MODE", request.param)
+    return request.param
+
+
+@pytest.fixture
+def scene():
+    image, _, box = synthetic_scene(np.random.default_rng(3), width=640, height=360)
+    return image, box
+
+
+def test_gray_and_color_inputs_give_the_same_regions(mode, scene):
+    image, _ = scene
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    color_crops = plate_detector.detect_plate_crops(image)
+    gray_crops = plate_detector.detect_plate_crops(gray)
+
+    assert len(color_crops) == len(gray_crops) >= 1
+    for (a, found_a), (b, found_b) in zip(color_crops, gray_crops):
+        assert found_a == found_b
+        np.testing.assert_array_equal(a, b)
+    assert plate_detector.detect_plate_region(gray).ndim == 2
+
+
+def test_always_returns_a_region(mode):
+    blank = np.zeros((120, 160), np.uint8)
+    (region, found), = plate_detector.detect_plate_crops(blank)
+    assert not found
+    assert region.size > 0
+
+
+def test_fast_mode_finds_the_plate(monkeypatch, scene):
+    monkeypatch.setattr(plate_detector, "DETECTOR_MODE", "fast")
+    image, (x, y, w, h) = scene
+    candidates = plate_detector.detect_plate_candidates(image, top_n=3)
+    assert candidates
+    assert any(abs(c["crop"].shape[1] - w) <= 0.25 * w for c in candidates)
@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import random_plate_text
+from plate_index import PlateIndex, canonical_key, weighted_distance
+
+
+@pytest.fixture(scope="module")
+def plates():
+    rng = np.random.default_rng(0)
+    return sorted({random_plate_text(rng) for _ in range(20000)})
+
+
+@pytest.fixture(scope="module")
+def index(plates):
+    index = PlateIndex()
+    for plate in plates:
+        index.add(plate)
+    return index
+
+
+def test_canonical_key_collapses_confusions():
+    assert canonical_key("b0s-1z") == canonical_key("8OS I2")
+    assert canonical_key("ABC123") != canonical_key("AXC123")
+    assert weighted_distance("ABC123", "A8C123") == pytest.approx(0.2)
+    assert weighted_distance("ABC123", "AXC123") == 1.0
+
+
+def test_recalls_confusions_and_one_edit(index, plates):
+    rng = np.random.default_rng(1)
+    confusions = {"O": "0", "0": "O", "B": "8", "8": "B", "S": "5", "5": "S", "I": "1", "1": "I"}
+    for plate in rng.choice(plates, 200):
+        misread = "".join(confusions.get(c, c) for c in plate)
+        assert index.search(misread)[0]["plate"] == plate
+
+        i = int(rng.integers(len(plate)))
+        for edited in (plate[:i] + "#" + plate[i + 1:],   # sustitución
+                       plate[:i] + plate[i + 1:],         # borrado
+                       plate[:i] + "#" + plate[i:]):      # inserción
+            assert plate in [m["plate"] for m in index.search(edited)]
+
+
+def test_rejects_reads_two_edits_away(index, plates):
+    rng = np.random.default_rng(2)
+    known = set(plates)
+    for plate in rng.choice(plates, 200):
+        far = "##" + plate[2:]
+        matches = index.search(far)
+        assert plate not in [m["plate"] for m in matches]
+        assert all(m["plate"] in known and m["distance"] <= 1.5 for m in matches)
+    assert index.search("QQQQQQQ") == []
+
+
+def test_results_are_sorted_and_limited(index, plates):
+    matches = index.search(plates[0][:-1] + "#", limit=3)
+    assert len(matches) <= 3
+    assert [m["distance"] for m in matches] == sorted(m["distance"] for m in matches)
+
+
+def test_search_reads_memory_only(db, monkeypatch):
+    index = PlateIndex()
+    index.refresh()
+    assert index.search("VBA-1234")[0]["plate"] == "VBA1234"
+
+    def no_db():
+        raise AssertionError("la búsqueda no debe consultar la BD")
+    monkeypatch.setattr(db, "get_pool", no_db)
+    monkeypatch.setattr("plate_index.get_pool", no_db)
+    assert index.search("ABC9B76")[0]["plate"] == "ABC9876"
+
+
+def test_background_refresh_picks_up_other_writers(db):
+    index = PlateIndex()
+    index.refresh()
+    index.start_refresher(interval=0.02)
+    try:
+        with db.get_pool().connection() as conn, conn:
+            conn.execute("INSERT INTO vehicles (plate, owner_id) VALUES ('NEW-4321', 1)")
+        deadline = time.monotonic() + 5
+        while not index.search("NEW4321"):
+            assert time.monotonic() < deadline, "el hilo no recargó el índice"
+            time.sleep(0.02)
+    finally:
+        index.stop_refresher()
@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+import models
+from conftest import BACKEND
+from sightings import SightingWriter
+
+
+def _count(db):
+    with db.get_pool().connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM sightings").fetchone()[0]
+
+
+def _insert(db, rows):
+    with db.get_pool().connection() as conn, conn:
+        conn.executemany("INSERT INTO sightings (plate, camera, seen_at) VALUES (?, ?, ?)", rows)
+
+
+def test_writes_in_batches(db):
+    writer = SightingWriter(batch_size=100, flush_ms=50)
+    for i in range(250):
+        writer.record(f"abc-{i:03d}", camera="cam1", confidence=0.9, seen_at=1000.0 + i)
+    assert writer.flush(timeout=5)
+    assert _count(db) == 250
+    assert writer.stats()["written"] == 250
+    assert writer.stats()["batches"] >= 3
+
+
+def test_flush_does_not_wait_for_the_batch_window(db):
+    writer = SightingWriter(batch_size=1000, flush_ms=60_000)
+    for i in range(10):
+        writer.record("ABC123", seen_at=float(i))
+    start = time.monotonic()
+    assert writer.flush(timeout=5)
+    assert time.monotonic() - start < 1.0
+    assert _count(db) == 10
+
+
+def test_full_queue_drops_instead_of_blocking(db):
+    writer = SightingWriter(queue_size=1, batch_size=1000, flush_ms=60_000)
+    for _ in range(50):
+        writer.record("ABC123")
+    assert writer.dropped > 0
+    writer.flush(timeout=5)
+
+
+def test_pending_sightings_are_written_at_exit(tmp_path):
+    # Proceso que encola y termina de inmediato: atexit debe vaciar la cola.
+    path = tmp_path / "vehicles.db"
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {BACKEND!r})
+        import database
+        database.DB_NAME = {str(path)!r}
+        from sightings import sighting_writer
+        for i in range(1234):
+            sighting_writer.record("ABC123", seen_at=float(i))
+    """)
+    env = dict(os.environ, SIGHTINGS_FLUSH_MS="60000", SIGHTINGS_BATCH_SIZE="5000")
+    start = time.monotonic()
+    subprocess.run([sys.executable, "-c", script], env=env, check=True, timeout=30)
+    assert time.monotonic() - start < 5.0
+
+    import sqlite3
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM sightings").fetchone()[0] == 1234
+    conn.close()
+
+
+@pytest.fixture
+def history(db):
+    # 7 avistamientos, tres de ellos con la misma hora (empates por id).
+    rows = [("AAA111", "cam1", 100.0), ("AAA111", "cam2", 200.0), ("BBB222", "cam1", 300.0),
+            ("AAA111", "cam1", 300.0), ("AAA111", "cam1", 300.0), ("BBB222", "cam2", 400.0),
+            ("AAA111", "cam1", 500.0)]
+    _insert(db, rows)
+    return rows
+
+
+def _all_pages(limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page, cursor = models.find_sightings(limit=limit, cursor=cursor, **filters)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 6, 7, 8])
+def test_keyset_pages_cover_history_without_gaps(history, limit):
+    pages = _all_pages(limit)
+    ids = [s["id"] for page in pages for s in page]
+
+    assert ids == [7, 6, 5, 4, 3, 2, 1]
+    assert all(len(page) == limit for page in pages[:-1])
+    # Si la última página llena justo el límite, no hay cursor de más.
+    assert len(pages) == -(-7 // limit)
+
+
+def test_filters_combine_with_pagination(history):
+    pages = _all_pages(1, plate="aaa-111", camera="cam1", since=100.0, until=500.0)
+    assert [s["id"] for page in pages for s in page] == [5, 4, 1]
+    assert pages[0][0]["seen_at"].startswith("1970-01-01T00:05:00")
+
+
+def test_limit_is_clamped(history):
+    page, cursor = models.find_sightings(limit=0)
+    assert len(page) == 1 and cursor is not None
+    assert models.parse_timestamp("1970-01-01T00:01:40Z") == 100.0
+    assert models.parse_timestamp("100") == 100.0
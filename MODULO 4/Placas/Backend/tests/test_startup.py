@@ -0,0 +1,52 @@
+import pytest
+
+import ocr_engine
+import startup
+
+
+@pytest.fixture
+def phases(monkeypatch):
+    def install(*phases):
+        monkeypatch.setattr(startup, "PHASES", list(phases))
+        monkeypatch.setattr(startup, "_state", {
+            "started_at": None, "import_seconds": None, "time_to_ready_seconds": None,
+            "phases": {name: {"status": "pending", "seconds": None} for name, _ in phases},
+        })
+    monkeypatch.setattr(ocr_engine, "ocr_ready", lambda: True)
+    return install
+
+
+def test_not_ready_until_every_phase_is_done(phases):
+    calls = []
+    phases(("uno", lambda: calls.append(1)), ("dos", lambda: calls.append(2)))
+    startup.record_import(0.0)
+
+    assert not startup.readiness()["ready"]
+    startup._run_phases()
+
+    report = startup.readiness()
+    assert calls == [1, 2]
+    assert report["ready"]
+    assert all(p["status"] == "done" and p["seconds"] >= 0 for p in report["phases"].values())
+    assert report["time_to_ready_seconds"] > 0
+
+
+def test_failed_phase_is_reported_and_stops_warmup(phases):
+    def broken():
+        raise RuntimeError("sin modelo")
+
+    phases(("uno", broken), ("dos", lambda: None))
+    startup._run_phases()
+
+    report = startup.readiness()
+    assert not report["ready"]
+    assert report["phases"]["uno"]["status"] == "error"
+    assert report["phases"]["uno"]["error"] == "sin modelo"
+    assert report["phases"]["dos"]["status"] == "pending"
+
+
+def test_waits_for_ocr_workers(phases, monkeypatch):
+    phases(("uno", lambda: None))
+    startup._run_phases()
+    monkeypatch.setattr(ocr_engine, "ocr_ready", lambda: False)
+    assert not startup.readiness()["ready"]
@@ -0,0 +1,124 @@
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+import pytest
+
+import ocr_engine
+import stream_recognizer
+from benchmarks.synthetic import synthetic_scene
+from stream_recognizer import (MotionGate, StreamRecognizer, VideoTooLong, consensus,
+                               recognize_video)
+
+
+class FakeBatcher:
+    """Devuelve las lecturas indicadas, en orden, como Futures ya resueltos."""
+
+    def __init__(self, reads):
+        self.reads = list(reads)
+        self.crops = []
+
+    def submit(self, region, crop=False):
+        self.crops.append((region.shape, crop))
+        future = Future()
+        future.set_result(self.reads.pop(0) if self.reads else (None, 0.0))
+        return future
+
+
+def test_consensus_votes_per_character():
+    reads = [("ABC1234", 0.9), ("A8C1234", 0.6), ("ABC1Z34", 0.5), ("ABC12345", 0.4)]
+    plate, confidence = consensus(reads)
+    assert plate == "ABC1234"
+    assert 0.0 < confidence < 0.9
+    assert consensus([]) == (None, 0.0)
+
+
+def test_motion_gate_skips_static_frames_up_to_max_skip():
+    gate = MotionGate(threshold=2.0, max_skip=3)
+    rng = np.random.default_rng(0)
+    frame = (rng.random((120, 160, 3)) * 255).astype(np.uint8)
+
+    accepted = [gate.accept(frame) for _ in range(9)]
+    assert accepted == [True, False, False, False, True, False, False, False, True]
+    assert gate.accept(255 - frame)
+
+
+@pytest.fixture
+def scene():
+    image, text, box = synthetic_scene(np.random.default_rng(3), width=640, height=360,
+                                       text="ABC1234")
+    return image, box
+
+
+def test_one_vehicle_per_track_with_bounded_ocr(monkeypatch, scene):
+    image, _ = scene
+    monkeypatch.setattr(stream_recognizer, "DETECTOR_MODE", "fast")
+    monkeypatch.setattr(stream_recognizer, "DETECTOR_TOP_N", 1)
+    batcher = FakeBatcher([("ABC1234", 0.9), ("A8C1234", 0.5), ("ABC1234", 0.8)])
+    monkeypatch.setattr(ocr_engine, "batcher", batcher)
+
+    recognizer = StreamRecognizer(max_ocr_per_track=3, gate=MotionGate(max_skip=2))
+    finished = []
+    for _ in range(12):
+        finished += recognizer.process(image)
+    finished += recognizer.finish()
+
+    plates = [v for v in finished if v["plate"]]
+    assert [v["plate"] for v in plates] == ["ABC1234"]
+    assert len(batcher.crops) <= 3 * len(finished)
+    assert all(crop for _, crop in batcher.crops)
+
+    stats = recognizer.stats()
+    assert stats["frames_received"] == 12
+    assert stats["frames_processed"] == 4      # el resto los descarta la compuerta
+
+
+def test_track_closes_after_missed_frames(monkeypatch, scene):
+    image, _ = scene
+    monkeypatch.setattr(stream_recognizer, "DETECTOR_MODE", "fast")
+    monkeypatch.setattr(stream_recognizer, "DETECTOR_TOP_N", 1)
+    monkeypatch.setattr(ocr_engine, "batcher", FakeBatcher([("ABC1234", 0.9)] * 10))
+
+    recognizer = StreamRecognizer(max_missed=1, gate=MotionGate(threshold=-1))
+    empty = np.zeros_like(image)
+    assert recognizer.process(image) == []
+    assert recognizer.process(empty) == []
+    closed = recognizer.process(empty)
+    assert [v["plate"] for v in closed if v["plate"]] == ["ABC1234"]
+
+
+@pytest.fixture
+def video(tmp_path, monkeypatch, scene):
+    image, _ = scene
+    monkeypatch.setattr(stream_recognizer, "DETECTOR_MODE", "fast")
+    monkeypatch.setattr(stream_recognizer, "DETECTOR_TOP_N", 1)
+    monkeypatch.setattr(ocr_engine, "batcher", FakeBatcher([("ABC1234", 0.9)] * 20))
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10,
+                             (image.shape[1], image.shape[0]))
+    for _ in range(20):
+        writer.write(image)
+    writer.release()
+    return path
+
+
+def test_video_limits_truncate_by_default(video):
+    _, stats = recognize_video(video, max_frames=5)
+    assert stats["frames_received"] == 5 and stats["truncated"]
+
+    vehicles, stats = recognize_video(video, max_frames=20, strict=True)
+    assert stats["frames_received"] == 20 and not stats["truncated"]
+    assert [v["plate"] for v in vehicles] == ["ABC1234"]
+
+
+def test_strict_video_limits_reject_long_clips(video, monkeypatch):
+    processed = []
+    monkeypatch.setattr(StreamRecognizer, "process", lambda self, frame: processed.append(1) or [])
+
+    # El contenedor declara 20 cuadros: se rechaza sin procesar ninguno.
+    with pytest.raises(VideoTooLong, match="20 cuadros"):
+        recognize_video(video, max_frames=10, strict=True)
+    assert processed == []
+
+    with pytest.raises(VideoTooLong, match="procesamiento"):
+        recognize_video(video, max_seconds=0, strict=True)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Asignación de tiendas a centros con índice espacial y anillos de cobertura.
+
+Las coordenadas WGS84 se convierten a vectores unitarios en 3D; sobre ellos
+un KD-tree (scipy.spatial.cKDTree) encuentra los centros más cercanos a cada
+tienda. La distancia en línea recta entre vectores (cuerda) crece igual que
+la distancia sobre la esfera, así que ordenar y filtrar por cuerda equivale a
+hacerlo por haversine, y se convierte a km sin aproximación.
+
+Cada tienda va al centro de menor costo entre sus `vecinos` centros más
+cercanos que estén dentro del radio de cobertura, respetando la capacidad de
+cada centro si se indica. Los anillos de cada centro salen de los cuantiles
+de la distancia real a sus tiendas.
+
+Elegir el más barato solo entre los más cercanos es una aproximación: es
+exacta cuando el costo crece con la distancia (como alpha * D + (1 - alpha)
+* C con C proporcional a D), pero con otro costo un centro más lejano y más
+barato puede quedar fuera; con vecinos=None se consideran todos los centros
+del radio. Con capacidad, la tienda cuyos candidatos están todos llenos
+busca además entre el resto de los centros del radio (query_ball_point), así
+que no queda sin centro mientras alguno alcanzable tenga lugar.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+R_TIERRA_KM = 6371.0088
+COL_LATITUD = "Latitud_WGS84"
+COL_LONGITUD = "Longitud_WGS84"
+
+ASIGNACION_VECINOS = 16              # centros candidatos por tienda
+ANILLOS_CUANTILES = (0.5, 0.8, 1.0)  # anillos: mediana, 80 % y la tienda más lejana
+
+
+def indices_por_tipo(tiendas):
+    """Índices (filas) de los centros y de las tiendas."""
+    tipo = tiendas['Tipo'].astype(str)
+    centros = np.flatnonzero(tipo.str.contains("Centro", case=False).values)
+    nodos_tienda = np.flatnonzero(tipo.str.contains("Tienda", case=False).values)
+    return centros, nodos_tienda
+
+
+def a_cartesianas(lat, lon):
+    """Coordenadas en grados a vectores unitarios (n, 3)."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def cuerda_a_km(cuerda):
+    return 2.0 * R_TIERRA_KM * np.arcsin(np.minimum(np.asarray(cuerda) / 2.0, 1.0))
+
+
+def km_a_cuerda(km):
+    return 2.0 * np.sin(np.minimum(km / R_TIERRA_KM, np.pi) / 2.0)
+
+
+def centros_cercanos(puntos, centros_xyz, k, radio_km=None):
+    """
+    Los k centros más cercanos de cada punto (dentro del radio, si se da).
+
+    Devuelve (indices, km), ambos (n, k); donde no hay centro el índice es -1
+    y la distancia inf.
+    """
+    k = max(1, min(int(k), len(centros_xyz)))
+    limite = np.inf if radio_km is None else km_a_cuerda(float(radio_km)) * (1 + 1e-12)
+    cuerda, idx = cKDTree(centros_xyz).query(puntos, k=k, distance_upper_bound=limite)
+    cuerda = cuerda.reshape(len(puntos), k)
+    idx = idx.reshape(len(puntos), k)
+    validos = np.isfinite(cuerda)
+    return np.where(validos, idx, -1), np.where(validos, cuerda_a_km(np.where(validos, cuerda, 0.0)), np.inf)
+
+
+def _por_centro(valor, n_centros, tiendas, centros, nombre):
+    """Escalar, arreglo o nombre de columna -> arreglo con un valor por centro."""
+    if isinstance(valor, str):
+        valor = tiendas[valor].values[centros]
+    valor = np.broadcast_to(np.asarray(valor, dtype=float), (n_centros,))
+    if np.any(valor < 0):
+        raise ValueError(f"{nombre} no puede ser negativa")
+    return valor
+
+
+def asignar_tiendas(tiendas, centros, nodos_tienda, M=None, radio_km=None,
+                    capacidad=None, demanda=None, vecinos=ASIGNACION_VECINOS):
+    """
+    Asigna cada tienda al centro alcanzable más barato.
+
+    - M: matriz de costo (n x n) con índices de fila; sin ella el costo es la
+      distancia haversine.
+    - radio_km: cobertura máxima (distancia geográfica) de cada centro.
+    - capacidad: límite por centro (escalar, arreglo o columna de `tiendas`)
+      en unidades de `demanda` (arreglo por tienda o columna; 1 por defecto).
+    - vecinos: centros candidatos por tienda, los más cercanos (None = todos
+      los del radio). Si con capacidad se llenan todos, se buscan los demás
+      centros del radio, del más barato al más caro.
+
+    Devuelve (asignado, km): por tienda, el número de centro (-1 si quedó sin
+    cobertura) y su distancia en km al centro asignado (nan si no tiene).
+    """
+    n_centros, n = len(centros), len(nodos_tienda)
+    asignado = np.full(n, -1, dtype=np.int64)
+    km = np.full(n, np.nan)
+    if n == 0 or n_centros == 0:
+        return asignado, km
+
+    lat = tiendas[COL_LATITUD].values
+    lon = tiendas[COL_LONGITUD].values
+    puntos = a_cartesianas(lat[nodos_tienda], lon[nodos_tienda])
+    centros_xyz = a_cartesianas(lat[centros], lon[centros])
+    idx, dist = centros_cercanos(puntos, centros_xyz,
+                                 n_centros if vecinos is None else vecinos, radio_km)
+    validos = idx >= 0
+    if M is None:
+        costo = dist.copy()
+    else:
+        costo = np.where(validos, M[nodos_tienda[:, None], centros[np.maximum(idx, 0)]], np.inf)
+
+    # Candidatos de cada tienda ordenados del más barato al más caro.
+    orden = np.argsort(costo, axis=1, kind="stable")
+    idx = np.take_along_axis(idx, orden, axis=1)
+    dist = np.take_along_axis(dist, orden, axis=1)
+    costo = np.take_along_axis(costo, orden, axis=1)
+    validos = idx >= 0
+
+    if capacidad is None:
+        filas = np.flatnonzero(validos[:, 0])
+        asignado[filas] = idx[filas, 0]
+        km[filas] = dist[filas, 0]
+        return asignado, km
+
+    restante = _por_centro(capacidad, n_centros, tiendas, centros, "La capacidad").copy()
+    if demanda is None:
+        demanda = np.ones(n)
+    elif isinstance(demanda, str):
+        demanda = tiendas[demanda].values[nodos_tienda].astype(float)
+    else:
+        demanda = np.asarray(demanda, dtype=float)
+
+    # Primero las tiendas que más pierden si no les toca su mejor centro
+    # (arrepentimiento) y, entre ellas, las de mayor demanda.
+    segundo = costo[:, 1] if costo.shape[1] > 1 else np.full(n, np.inf)
+    primero = np.where(validos[:, 0], costo[:, 0], 0.0)
+    arrepentimiento = np.where(validos[:, 0], segundo - primero, -np.inf)
+    prioridad = np.lexsort((-demanda, -arrepentimiento))
+
+    # Tiendas con la lista de candidatos completa: puede haber más centros
+    # en el radio fuera de ella.
+    completos = (validos[:, -1] & (idx.shape[1] < n_centros)).tolist()
+    arbol = None
+
+    def otros_centros(i):
+        """Centros del radio fuera de los candidatos de i, del más barato al más caro."""
+        nonlocal arbol
+        if radio_km is None:
+            extra = np.arange(n_centros)
+        else:
+            if arbol is None:
+                arbol = cKDTree(centros_xyz)
+            limite = km_a_cuerda(float(radio_km)) * (1 + 1e-12)
+            extra = np.asarray(arbol.query_ball_point(puntos[i], limite), dtype=np.int64)
+        extra = np.setdiff1d(extra, idx[i])
+        km_extra = cuerda_a_km(np.linalg.norm(centros_xyz[extra] - puntos[i], axis=1))
+        if M is None:
+            costo_extra = km_extra
+        else:
+            costo_extra = np.asarray(M[np.full(len(extra), nodos_tienda[i]), centros[extra]],
+                                     dtype=float)
+        orden = np.argsort(costo_extra, kind="stable")
+        return zip(extra[orden].tolist(), km_extra[orden].tolist())
+
+    idx_l, dist_l, demanda_l = idx.tolist(), dist.tolist(), demanda.tolist()
+    restante_l = restante.tolist()
+    for i in prioridad.tolist():
+        d = demanda_l[i]
+        candidatos = zip(idx_l[i], dist_l[i])
+        if completos[i] and not any(d <= restante_l[c] for c in idx_l[i]):
+            candidatos = otros_centros(i)
+        for c, distancia in candidatos:
+            if c < 0:
+                break
+            if d <= restante_l[c]:
+                restante_l[c] -= d
+                asignado[i] = c
+                km[i] = distancia
+                break
+    return asignado, km
+
+
+def agrupar_por_centro(asignado, nodos_tienda, n_centros):
+    """{centro: [nodos]} a partir del centro asignado a cada tienda."""
+    orden = np.argsort(asignado, kind="stable")
+    limites = np.searchsorted(asignado[orden], np.arange(n_centros + 1))
+    nodos = nodos_tienda[orden]
+    return {c: nodos[limites[c]:limites[c + 1]].tolist() for c in range(n_centros)}
+
+
+def rangos_por_centro(asignado, km, n_centros, cuantiles=ANILLOS_CUANTILES):
+    """
+    Anillos de cada centro (km, redondeados hacia arriba a 0.1) a partir de
+    los cuantiles de la distancia a sus tiendas.
+    """
+    rangos = {c: [] for c in range(n_centros)}
+    cubiertas = asignado >= 0
+    if not cubiertas.any():
+        return rangos
+    tabla = (pd.DataFrame({"centro": asignado[cubiertas], "km": km[cubiertas]})
+             .groupby("centro")["km"].quantile(list(cuantiles)).unstack())
+    valores = np.ceil(tabla.values * 10.0 - 1e-9) / 10.0
+    for centro, fila in zip(tabla.index.tolist(), valores):
+        rangos[centro] = sorted(set(fila.tolist()))
+    return rangos
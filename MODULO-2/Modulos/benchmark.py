@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Banco de pruebas del optimizador de rutas.
+
+- `generar_instancia` crea tiendas, D y C sintéticos con la misma forma que
+  los datos reales: centros primero, columnas Tipo/Nombre/Latitud/Longitud,
+  D en km (haversine) y C = costo por km * D. Las tiendas se reparten de
+  forma uniforme en un disco o agrupadas en zonas densas.
+- `ejecutar_caso` resuelve una instancia con `calcular_solucion` (semilla y
+  presupuesto de tiempo fijos) y mide tiempo, memoria pico, distancia,
+  combustible, objetivo y la curva de convergencia de cada ruta.
+- `ejecutar_benchmark` corre cada caso en un proceso nuevo (para que la
+  memoria pico sea solo la del caso) y agrega los resultados a un CSV, más
+  las curvas en <salida>_curvas.csv.
+- `comparar` confronta una corrida con otra anterior para detectar
+  regresiones de calidad o de tiempo.
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Modulos.asignacion import COL_LATITUD, COL_LONGITUD, R_TIERRA_KM
+from Modulos.distancias import COSTO_KM, LIMITE_DENSO, proveedores_haversine
+from Modulos.solucion import calcular_solucion
+
+CENTRO_REGION = (24.80, -107.40)  # Culiacán, como los datos de ejemplo
+RADIO_REGION_KM = 15.0
+TIENDAS_POR_GRUPO = 150           # tamaño medio de cada zona en la distribución agrupada
+DISPERSION_GRUPO_KM = 0.8         # desviación estándar de cada zona
+DISTRIBUCIONES = ("uniforme", "agrupada")
+TOLERANCIA_OBJETIVO = 0.01        # empeorar más de 1 % el objetivo es una regresión
+TOLERANCIA_TIEMPO = 0.25          # tardar más de 25 % es una regresión
+
+
+def _desplazar(lat0, lon0, este_km, norte_km):
+    """Coordenadas a partir de desplazamientos en km (aproximación local)."""
+    km_por_grado = np.radians(R_TIERRA_KM)
+    lat = lat0 + norte_km / km_por_grado
+    lon = lon0 + este_km / (km_por_grado * np.cos(np.radians(lat0)))
+    return lat, lon
+
+
+def _puntos(rng, n, distribucion, centro, radio_km):
+    if distribucion == "uniforme":
+        r = radio_km * np.sqrt(rng.random(n))
+        angulo = rng.random(n) * 2.0 * np.pi
+        return _desplazar(*centro, r * np.cos(angulo), r * np.sin(angulo))
+    if distribucion == "agrupada":
+        grupos = max(1, n // TIENDAS_POR_GRUPO)
+        r = 0.8 * radio_km * np.sqrt(rng.random(grupos))
+        angulo = rng.random(grupos) * 2.0 * np.pi
+        zona = rng.integers(0, grupos, n)
+        este = r[zona] * np.cos(angulo[zona]) + rng.normal(0.0, DISPERSION_GRUPO_KM, n)
+        norte = r[zona] * np.sin(angulo[zona]) + rng.normal(0.0, DISPERSION_GRUPO_KM, n)
+        return _desplazar(*centro, este, norte)
+    raise ValueError(f"Distribución '{distribucion}' no válida; usa una de {DISTRIBUCIONES}")
+
+
+def generar_instancia(n_centros, n_tiendas, distribucion="agrupada", semilla=0,
+                      densa=None, costo_km=COSTO_KM, centro=CENTRO_REGION,
+                      radio_km=RADIO_REGION_KM):
+    """
+    (tiendas, D, C) sintéticos y reproducibles para la semilla dada.
+
+    Los centros salen de la misma distribución que las tiendas (quedan cerca
+    de la demanda). Con densa=None, D y C son matrices NumPy hasta
+    LIMITE_DENSO nodos y proveedores bajo demanda por encima.
+    """
+    rng = np.random.default_rng(semilla)
+    lat, lon = _puntos(rng, n_centros + n_tiendas, distribucion, centro, radio_km)
+    tiendas = pd.DataFrame({
+        "Tipo": ["Centro de Distribución"] * n_centros + ["Tienda"] * n_tiendas,
+        "Nombre": [f"Centro de Distribución {i + 1}" for i in range(n_centros)]
+                  + [f"Tienda {i + 1}" for i in range(n_tiendas)],
+        COL_LATITUD: lat,
+        COL_LONGITUD: lon,
+    })
+    D, C = proveedores_haversine(tiendas, costo_km=costo_km)
+    if densa is None:
+        densa = len(tiendas) <= LIMITE_DENSO
+    if densa:
+        D, C = np.asarray(D), np.asarray(C)
+    return tiendas, D, C
+
+
+def _memoria_pico_mb():
+    """Memoria residente máxima del proceso (nan si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la reporta en KB y macOS en bytes.
+    return pico / (1024.0 ** 2 if sys.platform == "darwin" else 1024.0)
+
+
+def nombre_caso(caso):
+    tiempo = "sin_limite" if caso["tiempo_max"] is None else f"{caso['tiempo_max']:g}s"
+    procesos = caso.get("procesos", 1)
+    return (f"{caso['centros']}x{caso['tiendas']}-{caso['distribucion']}"
+            f"-s{caso['semilla']}-{tiempo}" + (f"-p{procesos}" if procesos != 1 else ""))
+
+
+def ejecutar_caso(caso):
+    """
+    Genera y resuelve un caso. `caso` es un dict con centros, tiendas,
+    distribucion, semilla, tiempo_max, iteraciones, reinicios y, si se da,
+    procesos (1 por defecto).
+
+    Devuelve (fila de resultados, curvas) donde curvas es una lista de
+    (centro, iteración, segundos, mejor costo).
+    """
+    inicio = time.perf_counter()
+    tiendas, D, C = generar_instancia(caso["centros"], caso["tiendas"],
+                                      caso["distribucion"], caso["semilla"])
+    tiempo_instancia = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assignments, solutions, _ = calcular_solucion(
+            tiendas, D, C, iteraciones=caso["iteraciones"], semilla=caso["semilla"],
+            reinicios=caso["reinicios"], procesos=caso.get("procesos", 1), tiempo_max=caso["tiempo_max"],
+            convergencia=True)
+    tiempo = time.perf_counter() - inicio
+
+    atendidas = sum(len(v) for v in assignments.values())
+    fila = {
+        "Caso": nombre_caso(caso),
+        **caso,
+        "Tiempo_instancia_s": tiempo_instancia,
+        "Tiempo_s": tiempo,
+        "Memoria_pico_MB": _memoria_pico_mb(),
+        "Distancia_total_km": sum(s["distancia"] for s in solutions.values()),
+        "Costo_combustible": sum(s["costo_combustible"] for s in solutions.values()),
+        "Valor_objetivo": sum(s["objetivo"] for s in solutions.values()),
+        "Tiendas_sin_centro": caso["tiendas"] - atendidas,
+    }
+    curvas = [(c, it, seg, costo) for c, s in solutions.items()
+              for it, seg, costo in s["convergencia"]]
+    return fila, curvas
+
+
+def version_codigo():
+    """Commit actual de git (vacío si no se puede obtener)."""
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return salida.stdout.strip()
+    except OSError:
+        return ""
+
+
+def _agregar_csv(tabla, ruta):
+    tabla.to_csv(ruta, mode="a", index=False, header=not os.path.exists(ruta))
+
+
+def ruta_curvas(salida):
+    base, extension = os.path.splitext(salida)
+    return f"{base}_curvas{extension or '.csv'}"
+
+
+def ejecutar_benchmark(casos, salida, aislar=True):
+    """
+    Corre los casos uno por uno y agrega los resultados a `salida` (CSV) y
+    las curvas a <salida>_curvas.csv. Con `aislar` cada caso corre en un
+    proceso nuevo, así la memoria pico no arrastra la de casos anteriores.
+    Devuelve la tabla de esta corrida.
+    """
+    corrida = time.strftime("%Y%m%d-%H%M%S")
+    version = version_codigo()
+    filas, curvas = [], []
+    for caso in casos:
+        if aislar:
+            with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+                fila, curva = pool.submit(ejecutar_caso, caso).result()
+        else:
+            fila, curva = ejecutar_caso(caso)
+        fila = {"Corrida": corrida, "Version": version, **fila}
+        filas.append(fila)
+        curvas.extend((corrida, fila["Caso"], *punto) for punto in curva)
+        print(f"  ✔ {fila['Caso']}: objetivo {fila['Valor_objetivo']:.2f}, "
+              f"{fila['Tiempo_s']:.1f} s, {fila['Memoria_pico_MB']:.0f} MB", flush=True)
+
+    tabla = pd.DataFrame(filas)
+    _agregar_csv(tabla, salida)
+    _agregar_csv(pd.DataFrame(curvas, columns=["Corrida", "Caso", "Centro", "Iteracion",
+                                               "Segundos", "Mejor_costo"]),
+                 ruta_curvas(salida))
+    return tabla
+
+
+def comparar(actual, referencia, corrida=None, tol_objetivo=TOLERANCIA_OBJETIVO,
+             tol_tiempo=TOLERANCIA_TIEMPO):
+    """
+    Compara la corrida `actual` con `referencia` (tabla o CSV de resultados;
+    se usa la `corrida` indicada o la última) caso por caso.
+
+    Devuelve la tabla con las razones actual / referencia y si hay regresión.
+    """
+    if isinstance(referencia, str):
+        referencia = pd.read_csv(referencia)
+    if corrida is None:
+        corrida = referencia["Corrida"].astype(str).max()
+    referencia = referencia[referencia["Corrida"].astype(str) == str(corrida)]
+
+    columnas = ["Caso", "Valor_objetivo", "Tiempo_s", "Memoria_pico_MB"]
+    tabla = actual[columnas].merge(referencia[columnas], on="Caso", suffixes=("", "_ref"))
+    for columna in columnas[1:]:
+        tabla[f"Razon_{columna}"] = tabla[columna] / tabla[f"{columna}_ref"]
+    tabla["Regresion_calidad"] = tabla["Razon_Valor_objetivo"] > 1.0 + tol_objetivo
+    tabla["Regresion_tiempo"] = tabla["Razon_Tiempo_s"] > 1.0 + tol_tiempo
+    return tabla
@@ -1,27 +1,159 @@
 # -*- coding: utf-8 -*-
-"""Carga de datos de entrada para el modelo de distribución."""
+"""
+Carga de datos de entrada para el modelo de distribución.
 
+Leer los Excel con openpyxl es lento y crece con el tamaño de las matrices,
+así que la primera carga los convierte a archivos binarios en una carpeta de
+caché junto a los datos:
+
+- D y C como .npy, que se abren con memoria mapeada (solo se leen del disco
+  las filas que se usan, sin importar el tamaño de la matriz).
+- tiendas como Parquet (o pickle si no está instalado pyarrow).
+
+Cada archivo de caché guarda la fecha de modificación, el tamaño y el hash
+SHA-256 del Excel de origen; si el Excel cambia, se vuelve a convertir.
+"""
+
+import hashlib
+import json
 import os
+
+import numpy as np
 import pandas as pd
 
+ARCHIVO_TIENDAS = "datos_distribucion_tiendas.xlsx"
+ARCHIVO_DISTANCIAS = "matriz_distancias.xlsx"
+ARCHIVO_COSTOS = "matriz_costos_combustible.xlsx"
+CARPETA_CACHE = ".cache"
+
+
+def _hash_archivo(ruta, bloque=1 << 20):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return {"mtime_ns": info.st_mtime_ns, "tamano": info.st_size}
 
-def cargar_datos(data_path: str):
+
+def _cache_vigente(origen, meta_path, extra):
+    """
+    True si la caché corresponde al archivo de origen. Primero compara fecha
+    y tamaño; si solo cambió la fecha (archivo copiado o tocado) compara el
+    hash y, si coincide, actualiza la fecha guardada.
+    """
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if any(meta.get(k) != v for k, v in extra.items()):
+        return False
+    firma = _firma(origen)
+    if meta.get("mtime_ns") == firma["mtime_ns"] and meta.get("tamano") == firma["tamano"]:
+        return True
+    if meta.get("tamano") != firma["tamano"] or meta.get("sha256") != _hash_archivo(origen):
+        return False
+    meta.update(firma)
+    _escribir_meta(meta_path, meta)
+    return True
+
+
+def _escribir_meta(meta_path, meta):
+    temporal = meta_path + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temporal, meta_path)
+
+
+def _guardar_meta(origen, meta_path, extra):
+    meta = dict(_firma(origen), sha256=_hash_archivo(origen), **extra)
+    _escribir_meta(meta_path, meta)
+
+
+def _formato_tabla():
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "pickle"
+
+
+def cargar_matriz(origen, cache_dir, dtype=np.float64, mmap=True):
+    """Matriz de un Excel, convertida una sola vez a .npy y abierta con mmap."""
+    dtype = np.dtype(dtype)
+    base = os.path.join(cache_dir, os.path.splitext(os.path.basename(origen))[0])
+    destino, meta_path = f"{base}.{dtype.name}.npy", f"{base}.{dtype.name}.json"
+    extra = {"dtype": dtype.name}
+
+    if not _cache_vigente(origen, meta_path, extra):
+        print(f"🔄 Convirtiendo {os.path.basename(origen)} a caché binaria...")
+        matriz = pd.read_excel(origen).values.astype(dtype)
+        temporal = destino + ".tmp.npy"
+        np.save(temporal, matriz)
+        os.replace(temporal, destino)
+        _guardar_meta(origen, meta_path, extra)
+
+    return np.load(destino, mmap_mode="r" if mmap else None)
+
+
+def cargar_tabla(origen, cache_dir):
+    """DataFrame de un Excel, convertido una sola vez a Parquet (o pickle)."""
+    formato = _formato_tabla()
+    base = os.path.join(cache_dir, os.path.splitext(os.path.basename(origen))[0])
+    destino, meta_path = f"{base}.{formato}", f"{base}.{formato}.json"
+    extra = {"formato": formato}
+
+    if _cache_vigente(origen, meta_path, extra):
+        return pd.read_parquet(destino) if formato == "parquet" else pd.read_pickle(destino)
+
+    print(f"🔄 Convirtiendo {os.path.basename(origen)} a caché binaria...")
+    tabla = pd.read_excel(origen)
+    temporal = destino + ".tmp"
+    if formato == "parquet":
+        tabla.to_parquet(temporal, index=False)
+    else:
+        tabla.to_pickle(temporal)
+    os.replace(temporal, destino)
+    _guardar_meta(origen, meta_path, extra)
+    return tabla
+
+
+def cargar_datos(data_path: str, usar_cache=True, dtype=np.float64, mmap=True):
     """
     Carga los tres archivos principales:
     - datos_distribucion_tiendas.xlsx
     - matriz_distancias.xlsx
     - matriz_costos_combustible.xlsx
 
+    Con usar_cache=True se leen de la caché binaria (se crea o actualiza si
+    hace falta). `dtype` puede ser np.float32 para usar la mitad de memoria y
+    con mmap=True las matrices se abren como memoria mapeada de solo lectura.
+
     Devuelve:
     tiendas (DataFrame), D (numpy.ndarray), C (numpy.ndarray)
     """
     try:
-        tiendas = pd.read_excel(os.path.join(
-            data_path, "datos_distribucion_tiendas.xlsx"))
-        D = pd.read_excel(os.path.join(
-            data_path, "matriz_distancias.xlsx")).values.astype(float)
-        C = pd.read_excel(os.path.join(
-            data_path, "matriz_costos_combustible.xlsx")).values.astype(float)
+        origenes = [os.path.join(data_path, nombre) for nombre in
+                    (ARCHIVO_TIENDAS, ARCHIVO_DISTANCIAS, ARCHIVO_COSTOS)]
+        for origen in origenes:
+            if not os.path.exists(origen):
+                raise FileNotFoundError(f"Archivo no encontrado: {origen}")
+
+        if usar_cache:
+            cache_dir = os.path.join(data_path, CARPETA_CACHE)
+            os.makedirs(cache_dir, exist_ok=True)
+            tiendas = cargar_tabla(origenes[0], cache_dir)
+            D = cargar_matriz(origenes[1], cache_dir, dtype=dtype, mmap=mmap)
+            C = cargar_matriz(origenes[2], cache_dir, dtype=dtype, mmap=mmap)
+        else:
+            tiendas = pd.read_excel(origenes[0])
+            D = pd.read_excel(origenes[1]).values.astype(dtype)
+            C = pd.read_excel(origenes[2]).values.astype(dtype)
 
         print("✅ Datos cargados correctamente.")
         return tiendas, D, C
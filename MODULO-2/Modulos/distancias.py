@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Matrices de distancia y costo calculadas bajo demanda (haversine).
+
+Para redes grandes no hace falta tener D y C completas: con 50 000 nodos
+cada matriz densa ocupa 20 GB y el recocido solo consulta una fracción
+mínima de sus entradas. `DistanciasHaversine` se comporta como una matriz
+(n x n) de solo lectura: calcula las distancias a partir de las coordenadas
+de `tiendas`, por bloques vectorizados, y guarda en caché las filas más
+usadas. También precalcula las listas de k vecinos más cercanos de cada nodo.
+
+Indexación soportada (igual que con un arreglo NumPy):
+- M[i, j]                        -> float
+- M[i]                           -> fila completa (con caché)
+- M[filas, columnas]             -> arreglos que se difunden entre sí, p. ej.
+                                    M[np.ix_(nodos, nodos)] o M[ruta[:-1], ruta[1:]]
+
+C se modela como la distancia por un costo por km, así que D, C y la
+combinación alpha * D + (1 - alpha) * C comparten las mismas coordenadas.
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from Modulos.asignacion import COL_LATITUD, COL_LONGITUD, R_TIERRA_KM, a_cartesianas
+
+COSTO_KM = 0.15          # costo de combustible por km (el de los datos de ejemplo)
+FACTOR_CIRCUITO = 1.0    # km por carretera / km en línea recta
+FILAS_CACHE = 4096       # filas calculadas que se conservan
+ELEMENTOS_BLOQUE = 1 << 22  # elementos por bloque al calcular (~32 MB en float64)
+LIMITE_DENSO = 3000      # hasta este tamaño conviene materializar la submatriz
+
+
+def es_perezosa(matriz):
+    """True si `matriz` es un proveedor bajo demanda y no un arreglo NumPy."""
+    return not isinstance(matriz, np.ndarray) and hasattr(matriz, "sub")
+
+
+class _Coordenadas:
+    """Coordenadas en radianes compartidas por D, C y sus combinaciones."""
+
+    def __init__(self, lat, lon):
+        self.lat_grados = np.asarray(lat, dtype=float)
+        self.lon_grados = np.asarray(lon, dtype=float)
+        self.lat = np.radians(self.lat_grados)
+        self.lon = np.radians(self.lon_grados)
+        self.cos_lat = np.cos(self.lat)
+        self.lat_l = self.lat.tolist()
+        self.lon_l = self.lon.tolist()
+        self.cos_l = self.cos_lat.tolist()
+        self.vecinos = {}
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __getstate__(self):
+        # Al enviarse a otro proceso solo viajan las coordenadas.
+        return {"lat": self.lat_grados, "lon": self.lon_grados}
+
+    def __setstate__(self, estado):
+        self.__init__(estado["lat"], estado["lon"])
+
+    def sub(self, nodos):
+        return _Coordenadas(self.lat_grados[nodos], self.lon_grados[nodos])
+
+    def knn(self, k):
+        k = min(int(k), len(self) - 1)
+        if k <= 0:
+            return None
+        if k not in self.vecinos:
+            xyz = a_cartesianas(self.lat_grados, self.lon_grados)
+            _, idx = cKDTree(xyz).query(xyz, k=k + 1)
+            # La primera columna es el propio nodo (salvo puntos repetidos).
+            propio = idx[:, :1] == np.arange(len(self))[:, None]
+            self.vecinos[k] = np.where(propio, idx[:, 1:], idx[:, :-1]).astype(np.int64)
+        return self.vecinos[k]
+
+
+class DistanciasHaversine:
+    """Matriz (n x n) de distancias haversine * escala, calculada bajo demanda."""
+
+    ndim = 2
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, coordenadas, escala=1.0, filas_cache=FILAS_CACHE):
+        self.coordenadas = coordenadas
+        self.escala = float(escala)
+        self.filas_cache = filas_cache
+        n = len(coordenadas)
+        self.shape = (n, n)
+        self._filas = OrderedDict()
+
+    @classmethod
+    def desde_coordenadas(cls, lat, lon, escala=1.0, **kw):
+        return cls(_Coordenadas(lat, lon), escala, **kw)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getstate__(self):
+        return {"coordenadas": self.coordenadas, "escala": self.escala,
+                "filas_cache": self.filas_cache}
+
+    def __setstate__(self, estado):
+        self.__init__(**estado)
+
+    def escalada(self, escala):
+        """Misma geometría con otra escala (comparte coordenadas y vecinos)."""
+        return DistanciasHaversine(self.coordenadas, escala, self.filas_cache)
+
+    def sub(self, nodos):
+        """Proveedor de la submatriz de `nodos` (índices locales 0..len-1)."""
+        return DistanciasHaversine(self.coordenadas.sub(np.asarray(nodos)),
+                                   self.escala, self.filas_cache)
+
+    def vecinos(self, k):
+        """Los k nodos más cercanos de cada nodo, (n, k)."""
+        return self.coordenadas.knn(k)
+
+    # --- Cálculo ---
+    def _calcular(self, i, j):
+        co = self.coordenadas
+        dlat = co.lat[j] - co.lat[i]
+        dlon = co.lon[j] - co.lon[i]
+        a = np.sin(dlat / 2.0) ** 2 + co.cos_lat[i] * co.cos_lat[j] * np.sin(dlon / 2.0) ** 2
+        return (2.0 * R_TIERRA_KM * self.escala) * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _escalar(self, i, j):
+        co = self.coordenadas
+        a = (math.sin((co.lat_l[j] - co.lat_l[i]) / 2.0) ** 2
+             + co.cos_l[i] * co.cos_l[j] * math.sin((co.lon_l[j] - co.lon_l[i]) / 2.0) ** 2)
+        return 2.0 * R_TIERRA_KM * self.escala * math.asin(math.sqrt(min(a, 1.0)))
+
+    def fila(self, i):
+        i = int(i)
+        fila = self._filas.get(i)
+        if fila is not None:
+            self._filas.move_to_end(i)
+            return fila
+        fila = self._calcular(i, slice(None))
+        fila.setflags(write=False)
+        self._filas[i] = fila
+        if len(self._filas) > self.filas_cache:
+            self._filas.popitem(last=False)
+        return fila
+
+    def bloque(self, filas=None, columnas=None):
+        """Submatriz densa filas x columnas (todo si no se indican), por bloques."""
+        filas = np.arange(self.shape[0]) if filas is None else np.asarray(filas)
+        columnas = np.arange(self.shape[1]) if columnas is None else np.asarray(columnas)
+        return self._difundir(filas[:, None], columnas[None, :])
+
+    def _difundir(self, i, j):
+        i, j = np.broadcast_arrays(np.asarray(i), np.asarray(j))
+        if i.ndim < 2 or i.size <= ELEMENTOS_BLOQUE:
+            return self._calcular(i, j)
+        salida = np.empty(i.shape)
+        paso = max(1, ELEMENTOS_BLOQUE // max(1, int(np.prod(i.shape[1:]))))
+        for inicio in range(0, i.shape[0], paso):
+            salida[inicio:inicio + paso] = self._calcular(i[inicio:inicio + paso], j[inicio:inicio + paso])
+        return salida
+
+    def __getitem__(self, clave):
+        if isinstance(clave, tuple) and len(clave) == 2:
+            i, j = clave
+            if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+                return self._escalar(int(i), int(j))
+            if isinstance(i, (int, np.integer)) and isinstance(j, slice):
+                return self.fila(i)[j]
+            return self._difundir(i, j)
+        if isinstance(clave, (int, np.integer)):
+            return self.fila(clave)
+        raise TypeError(f"Indexación no soportada: {clave!r}")
+
+    def __array__(self, dtype=None, copy=None):
+        matriz = self.bloque()
+        return matriz if dtype is None else matriz.astype(dtype)
+
+
+class MatrizCombinada:
+    """alpha * D + (1 - alpha) * C cuando D y C no comparten geometría."""
+
+    ndim = 2
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, D, C, alpha):
+        self.D, self.C, self.alpha = D, C, float(alpha)
+        self.shape = tuple(D.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, clave):
+        return self.alpha * self.D[clave] + (1.0 - self.alpha) * self.C[clave]
+
+    def sub(self, nodos):
+        nodos = np.asarray(nodos)
+
+        def recortar(m):
+            return m.sub(nodos) if es_perezosa(m) else np.asarray(m)[np.ix_(nodos, nodos)]
+        return MatrizCombinada(recortar(self.D), recortar(self.C), self.alpha)
+
+    def vecinos(self, k):
+        if es_perezosa(self.D) or es_perezosa(self.C):
+            base = self.D if es_perezosa(self.D) else self.C
+            return base.vecinos(k)
+        # D y C densas: argpartition por bloques de filas de la combinación.
+        n = self.shape[0]
+        k = min(int(k), n - 1)
+        if k <= 0:
+            return None
+        paso = max(1, ELEMENTOS_BLOQUE // max(n, 1))
+        vecinos = np.empty((n, k), dtype=np.int64)
+        for inicio in range(0, n, paso):
+            filas = np.arange(inicio, min(inicio + paso, n))
+            bloque = self.bloque(filas)
+            bloque[np.arange(len(filas)), filas] = np.inf
+            vecinos[filas] = np.argpartition(bloque, k - 1, axis=1)[:, :k]
+        return vecinos
+
+    def bloque(self, filas=None, columnas=None):
+        filas = np.arange(self.shape[0]) if filas is None else np.asarray(filas)
+        columnas = np.arange(self.shape[1]) if columnas is None else np.asarray(columnas)
+        return self[filas[:, None], columnas[None, :]]
+
+    def __array__(self, dtype=None, copy=None):
+        matriz = self.bloque()
+        return matriz if dtype is None else matriz.astype(dtype)
+
+
+def combinar(D, C, alpha):
+    """Costo combinado de dos matrices donde al menos una es perezosa."""
+    if (isinstance(D, DistanciasHaversine) and isinstance(C, DistanciasHaversine)
+            and D.coordenadas is C.coordenadas):
+        return D.escalada(alpha * D.escala + (1.0 - alpha) * C.escala)
+    return MatrizCombinada(D, C, alpha)
+
+
+def proveedores_haversine(tiendas, costo_km=COSTO_KM, factor_circuito=FACTOR_CIRCUITO,
+                          filas_cache=FILAS_CACHE):
+    """
+    D (km) y C (costo de combustible) bajo demanda a partir de las
+    coordenadas de `tiendas`; se usan en lugar de las matrices densas:
+
+        D, C = proveedores_haversine(tiendas)
+        calcular_solucion(tiendas, D, C)
+    """
+    coordenadas = _Coordenadas(tiendas[COL_LATITUD].values, tiendas[COL_LONGITUD].values)
+    D = DistanciasHaversine(coordenadas, factor_circuito, filas_cache)
+    C = DistanciasHaversine(coordenadas, factor_circuito * costo_km, filas_cache)
+    return D, C
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecución por lotes de escenarios "¿qué pasa si...?" sin menú interactivo.
+
+Un archivo de escenarios (JSON o CSV) lista conjuntos de parámetros; cada uno
+se resuelve con `calcular_solucion` y se obtiene una tabla comparativa con la
+distancia, el costo de combustible, el objetivo y el tiempo de cada uno.
+
+Claves de un escenario:
+- nombre
+- parámetros de calcular_solucion: alpha, iteraciones, t0, factor,
+  enfriamiento, semilla, vecinos, reinicios, radio_km, capacidad, demanda,
+  tiempo_max
+- centros_cerrados: números de centro (desde 1) que no se usan
+- factor_combustible: multiplica C (p. ej. 1.2 = combustible 20 % más caro)
+
+JSON: una lista de escenarios o {"base": {...}, "escenarios": [...]}, donde
+"base" son los valores comunes. CSV: una fila por escenario; las celdas
+vacías toman el valor por defecto y centros_cerrados se separa con ";".
+
+Los escenarios corren en paralelo: D y C se comparten una sola vez en
+memoria compartida y tiendas se envía una vez a cada proceso.
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Modulos.distancias import DistanciasHaversine, es_perezosa
+from Modulos.paralelo import adjuntar_matrices, compartir_matrices
+from Modulos.solucion import calcular_solucion
+
+PARAMETROS = ("alpha", "iteraciones", "t0", "factor", "enfriamiento", "semilla",
+              "vecinos", "reinicios", "radio_km", "capacidad", "demanda", "tiempo_max")
+ENTEROS = ("iteraciones", "semilla", "vecinos", "reinicios")
+CLAVES = ("nombre", "centros_cerrados", "factor_combustible") + PARAMETROS
+
+# Estado de cada proceso trabajador (lo llena _iniciar_trabajador).
+_datos = {}
+
+
+def _normalizar(escenario, posicion):
+    desconocidas = set(escenario) - set(CLAVES)
+    if desconocidas:
+        raise ValueError(f"Escenario {posicion}: claves desconocidas {sorted(desconocidas)}")
+    escenario = dict(escenario)
+    escenario.setdefault("nombre", f"escenario_{posicion}")
+    for clave in ENTEROS:
+        if escenario.get(clave) is not None:
+            escenario[clave] = int(escenario[clave])
+    cerrados = escenario.get("centros_cerrados") or []
+    if isinstance(cerrados, str):
+        cerrados = [c for c in cerrados.replace(",", ";").split(";") if c.strip()]
+    elif not isinstance(cerrados, (list, tuple)):
+        cerrados = [cerrados]
+    escenario["centros_cerrados"] = sorted({int(float(c)) for c in cerrados})
+    return escenario
+
+
+def leer_escenarios(ruta):
+    """Lista de escenarios (dicts) desde un archivo .json o .csv."""
+    if ruta.lower().endswith(".csv"):
+        tabla = pd.read_csv(ruta, dtype={"centros_cerrados": str})
+        crudos = [{k: v for k, v in fila.items() if not pd.isna(v)}
+                  for fila in tabla.to_dict("records")]
+    else:
+        with open(ruta, encoding="utf-8") as f:
+            contenido = json.load(f)
+        if isinstance(contenido, dict):
+            base = contenido.get("base", {})
+            crudos = [{**base, **e} for e in contenido.get("escenarios", [])]
+        else:
+            crudos = contenido
+    escenarios = [_normalizar(e, i + 1) for i, e in enumerate(crudos)]
+    nombres = [e["nombre"] for e in escenarios]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("Los nombres de escenario deben ser únicos")
+    return escenarios
+
+
+def _aplicar(tiendas, C, escenario):
+    """tiendas y C del escenario (centros cerrados y costo de combustible)."""
+    cerrados = escenario["centros_cerrados"]
+    if cerrados:
+        filas = np.flatnonzero(tiendas['Tipo'].astype(str).str.contains("Centro", case=False).values)
+        fuera = [c for c in cerrados if not 1 <= c <= len(filas)]
+        if fuera:
+            raise ValueError(f"Centros inexistentes: {fuera}")
+        tiendas = tiendas.copy()
+        tiendas.loc[tiendas.index[filas[np.array(cerrados) - 1]], 'Tipo'] = "Cerrado"
+
+    factor = escenario.get("factor_combustible")
+    if factor is not None and float(factor) != 1.0:
+        if isinstance(C, DistanciasHaversine):
+            C = C.escalada(C.escala * float(factor))
+        elif es_perezosa(C):
+            raise ValueError("factor_combustible requiere C densa o haversine")
+        else:
+            C = np.asarray(C) * float(factor)
+    return tiendas, C
+
+
+def ejecutar_escenario(tiendas, D, C, escenario):
+    """Resuelve un escenario y devuelve su fila de la tabla comparativa."""
+    inicio = time.perf_counter()
+    fila = {"Escenario": escenario["nombre"]}
+    try:
+        tiendas_e, C_e = _aplicar(tiendas, C, escenario)
+        parametros = {k: escenario[k] for k in PARAMETROS if k in escenario}
+        # Dentro de un lote cada escenario es un solo proceso (sin pools anidados).
+        with contextlib.redirect_stdout(io.StringIO()):
+            assignments, solutions, _ = calcular_solucion(
+                tiendas_e, D, C_e, procesos=1, **parametros)
+        atendidas = sum(len(v) for v in assignments.values())
+        tipo = tiendas_e['Tipo'].astype(str)
+        fila.update({
+            "Centros_activos": sum(1 for v in assignments.values() if v),
+            "Tiendas_atendidas": atendidas,
+            "Tiendas_sin_centro": int(tipo.str.contains("Tienda", case=False).sum()) - atendidas,
+            "Distancia_total_km": sum(s["distancia"] for s in solutions.values()),
+            "Costo_combustible": sum(s["costo_combustible"] for s in solutions.values()),
+            "Valor_objetivo": sum(s["objetivo"] for s in solutions.values()),
+            "Error": "",
+        })
+    except Exception as e:
+        fila["Error"] = f"{type(e).__name__}: {e}"
+    fila["Tiempo_s"] = time.perf_counter() - inicio
+    return fila
+
+
+def _iniciar_trabajador(tiendas, descriptores):
+    _datos.update(adjuntar_matrices(descriptores))
+    _datos["tiendas"] = tiendas
+
+
+def _ejecutar_en_trabajador(escenario):
+    return ejecutar_escenario(_datos["tiendas"], _datos["D"], _datos["C"], escenario)
+
+
+def ejecutar_escenarios(tiendas, D, C, escenarios, procesos=None):
+    """
+    Corre todos los escenarios (en paralelo si procesos != 1) y devuelve la
+    tabla comparativa en el orden del archivo.
+    """
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = max(1, min(int(procesos), len(escenarios) or 1))
+
+    if procesos == 1:
+        filas = []
+        for escenario in escenarios:
+            filas.append(ejecutar_escenario(tiendas, D, C, escenario))
+            print(f"  ✔ {escenario['nombre']} ({filas[-1]['Tiempo_s']:.1f} s)", flush=True)
+    else:
+        compartidas, descriptores = compartir_matrices({"D": D, "C": C})
+        try:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                     initargs=(tiendas, descriptores)) as pool:
+                filas = []
+                for fila in pool.map(_ejecutar_en_trabajador, escenarios):
+                    filas.append(fila)
+                    print(f"  ✔ {fila['Escenario']} ({fila['Tiempo_s']:.1f} s)", flush=True)
+        finally:
+            for matriz in compartidas.values():
+                matriz.liberar()
+
+    columnas = ["Escenario", "Centros_activos", "Tiendas_atendidas", "Tiendas_sin_centro",
+                "Distancia_total_km", "Costo_combustible", "Valor_objetivo", "Tiempo_s", "Error"]
+    tabla = pd.DataFrame(filas).reindex(columns=columnas)
+    enteros = ["Centros_activos", "Tiendas_atendidas", "Tiendas_sin_centro"]
+    tabla[enteros] = tabla[enteros].astype("Int64")
+    return tabla
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación de la solución (Asignaciones, Rutas, Rangos) a varios formatos.
+Junto con ella se guarda la tabla Tiendas (fila, nombre, tipo y
+coordenadas) con la que se calculó, para poder replanificar después contra
+un Excel de tiendas nuevo (ver Modulos.incremental).
+
+Las tablas se arman con NumPy a partir de las listas de cada centro (sin
+recorrer `tiendas` fila por fila) y se entregan por bloques de
+`FILAS_BLOQUE` filas a uno o varios escritores:
+
+- "parquet": resultado_solucion/<Tabla>.parquet, un row group por bloque.
+- "csv":     resultado_solucion/<Tabla>.csv, agregando bloque a bloque.
+- "npz":     resultado_solucion.npz comprimido, un arreglo estructurado por
+             tabla (el texto como Unicode de ancho fijo), escrito bloque a
+             bloque.
+- "excel":   resultado_solucion.xlsx (openpyxl); necesita todas las filas en
+             memoria y es lento, así que solo se usa por defecto en
+             corridas pequeñas.
+
+Se agrega un formato nuevo registrando su clase en ESCRITORES.
+"""
+
+import os
+import zipfile
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from Modulos.asignacion import COL_LATITUD, COL_LONGITUD
+
+NOMBRE_RESULTADO = "resultado_solucion"
+FORMATOS_SALIDA = None           # None = automático (ver formatos_automaticos)
+FILAS_BLOQUE = 100_000           # filas por bloque al escribir
+LIMITE_FILAS_EXCEL_AUTO = 50_000  # hasta aquí el modo automático incluye Excel
+LIMITE_FILAS_EXCEL = 1_048_575    # máximo de una hoja de Excel (sin encabezado)
+TABLAS_SOLUCION = ("Asignaciones", "Rutas", "Rangos")
+TABLA_TIENDAS = "Tiendas"         # opcional: los resultados anteriores no la tienen
+
+
+def _concatenar(listas, dtype=np.int64):
+    """Largos y valores concatenados de una secuencia de listas."""
+    largos = np.fromiter((len(v) for v in listas), dtype=np.int64, count=len(listas))
+    valores = np.fromiter(chain.from_iterable(listas), dtype=dtype, count=int(largos.sum()))
+    return largos, valores
+
+
+def tablas_solucion(tiendas, assignments, solutions, rings_upper):
+    """
+    {tabla: {columna: arreglo}} con las tablas de la solución y la tabla de
+    tiendas usada. Los ID son 1-based como en el Excel original.
+    """
+    centros = sorted(assignments)
+    largos, tiendas_ids = _concatenar([assignments[c] for c in centros])
+    if "Nombre" in tiendas.columns:
+        nombres = tiendas["Nombre"].to_numpy()[tiendas_ids]
+    else:
+        nombres = ("Tienda_" + pd.Series(tiendas_ids + 1).astype(str)).to_numpy()
+    asignaciones = {
+        "Centro_ID": np.repeat(np.array(centros, dtype=np.int64) + 1, largos),
+        "Tienda_ID": tiendas_ids + 1,
+        "Nombre_Tienda": nombres,
+    }
+
+    centros = sorted(solutions)
+    largos, nodos = _concatenar([solutions[c]["route"] for c in centros])
+    inicio = np.repeat(np.cumsum(largos) - largos, largos)
+    rutas = {
+        "Centro_ID": np.repeat(np.array(centros, dtype=np.int64) + 1, largos),
+        "Orden": np.arange(len(nodos), dtype=np.int64) - inicio + 1,
+        "Nodo_ID": nodos + 1,
+    }
+
+    centros = sorted(rings_upper)
+    largos, rangos = _concatenar([rings_upper[c] for c in centros], dtype=float)
+    rangos = {
+        "Centro_ID": np.repeat(np.array(centros, dtype=np.int64) + 1, largos),
+        "Rango_km": rangos,
+    }
+    filas = {
+        "Fila": np.arange(1, len(tiendas) + 1, dtype=np.int64),
+        **{k: tiendas[k].to_numpy() for k in ("Nombre", "Tipo") if k in tiendas.columns},
+        COL_LATITUD: tiendas[COL_LATITUD].to_numpy(float),
+        COL_LONGITUD: tiendas[COL_LONGITUD].to_numpy(float),
+    }
+    return {"Asignaciones": asignaciones, "Rutas": rutas, "Rangos": rangos,
+            TABLA_TIENDAS: filas}
+
+
+def bloques(columnas, filas=FILAS_BLOQUE):
+    """DataFrames de hasta `filas` filas (al menos uno, aunque esté vacío)."""
+    total = len(next(iter(columnas.values())))
+    for inicio in range(0, max(total, 1), filas):
+        yield pd.DataFrame({k: v[inicio:inicio + filas] for k, v in columnas.items()})
+
+
+# --- Escritores: preparar(tabla, columnas), escribir(tabla, bloques, filas) y cerrar() ---
+class _Escritor:
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.rutas = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+
+    def _carpeta_tablas(self):
+        carpeta = os.path.join(self.carpeta, NOMBRE_RESULTADO)
+        os.makedirs(carpeta, exist_ok=True)
+        return carpeta
+
+    def preparar(self, tabla, columnas):
+        """Se llama con las columnas completas antes de escribir la tabla."""
+
+    def cerrar(self):
+        pass
+
+    def descartar(self):
+        """Si algo falla a medias no se deja un archivo incompleto."""
+        for ruta in self.rutas:
+            if os.path.isfile(ruta):
+                os.remove(ruta)
+
+
+class EscritorParquet(_Escritor):
+    def __init__(self, carpeta):
+        super().__init__(carpeta)
+        self.esquema = None
+
+    def preparar(self, tabla, columnas):
+        # El esquema sale de las columnas completas: inferido por bloque, una
+        # columna de texto sin valores en un bloque quedaría como null y
+        # write_table rechazaría ese bloque.
+        import pyarrow as pa
+
+        campos = []
+        for k, v in columnas.items():
+            v = np.asarray(v)
+            if v.dtype.kind == "O":
+                tipo = pa.array(v, from_pandas=True).type
+                if pa.types.is_null(tipo):
+                    tipo = pa.string()
+            elif v.dtype.kind in "US":
+                tipo = pa.string()
+            else:
+                tipo = pa.from_numpy_dtype(v.dtype)
+            campos.append(pa.field(k, tipo))
+        self.esquema = pa.schema(campos)
+
+    def escribir(self, tabla, bloques, filas):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        ruta = os.path.join(self._carpeta_tablas(), f"{tabla}.parquet")
+        escritor = None
+        try:
+            for bloque in bloques:
+                datos = pa.Table.from_pandas(bloque, schema=self.esquema, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, datos.schema)
+                escritor.write_table(datos)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        self.rutas.append(ruta)
+
+
+class EscritorCSV(_Escritor):
+    def escribir(self, tabla, bloques, filas):
+        ruta = os.path.join(self._carpeta_tablas(), f"{tabla}.csv")
+        with open(ruta, "w", encoding="utf-8", newline="") as f:
+            for i, bloque in enumerate(bloques):
+                bloque.to_csv(f, index=False, header=i == 0)
+        self.rutas.append(ruta)
+
+
+class EscritorNPZ(_Escritor):
+    """Un .npy estructurado por tabla dentro de un zip comprimido."""
+
+    def __init__(self, carpeta):
+        super().__init__(carpeta)
+        self.ruta = os.path.join(carpeta, f"{NOMBRE_RESULTADO}.npz")
+        self.zip = zipfile.ZipFile(self.ruta, "w", compression=zipfile.ZIP_DEFLATED)
+        self.anchos = {}
+
+    def preparar(self, tabla, columnas):
+        # El encabezado va antes del primer bloque, así que el ancho de cada
+        # columna de texto se mide aquí sobre la columna completa.
+        self.anchos = {}
+        for k, v in columnas.items():
+            v = np.asarray(v)
+            if v.dtype.kind in "OUS":
+                largos = np.char.str_len(v.astype(str))
+                self.anchos[k] = max(1, int(largos.max(initial=0)))
+
+    def escribir(self, tabla, bloques, filas):
+        with self.zip.open(f"{tabla}.npy", "w", force_zip64=True) as f:
+            tipo = None
+            for bloque in bloques:
+                if tipo is None:
+                    # Se conocen las filas totales, así que el encabezado va primero.
+                    tipo = np.dtype([(k, f"<U{self.anchos[k]}" if k in self.anchos
+                                      else bloque[k].dtype) for k in bloque.columns])
+                    np.lib.format.write_array_header_1_0(f, {
+                        "descr": np.lib.format.dtype_to_descr(tipo),
+                        "fortran_order": False,
+                        "shape": (filas,),
+                    })
+                registros = np.empty(len(bloque), dtype=tipo)
+                for k in tipo.names:
+                    registros[k] = bloque[k].to_numpy(tipo[k])
+                f.write(registros.tobytes())
+
+    def cerrar(self):
+        self.zip.close()
+        self.rutas.append(self.ruta)
+
+    def descartar(self):
+        self.zip.close()
+        os.remove(self.ruta)
+
+
+class EscritorExcel(_Escritor):
+    def __init__(self, carpeta):
+        super().__init__(carpeta)
+        self.tablas = {}
+
+    def escribir(self, tabla, bloques, filas):
+        if filas > LIMITE_FILAS_EXCEL:
+            raise ValueError(f"La tabla {tabla} tiene {filas} filas y no cabe en una hoja "
+                             "de Excel; usa parquet, csv o npz")
+        self.tablas[tabla] = pd.concat(list(bloques), ignore_index=True)
+
+    def cerrar(self):
+        ruta = os.path.join(self.carpeta, f"{NOMBRE_RESULTADO}.xlsx")
+        with pd.ExcelWriter(ruta, engine="openpyxl") as writer:
+            for tabla, datos in self.tablas.items():
+                datos.to_excel(writer, index=False, sheet_name=tabla)
+        self.rutas.append(ruta)
+
+
+ESCRITORES = {
+    "parquet": EscritorParquet,
+    "csv": EscritorCSV,
+    "npz": EscritorNPZ,
+    "excel": EscritorExcel,
+}
+
+
+def formatos_automaticos(filas):
+    """Excel para corridas pequeñas; Parquet (o CSV sin pyarrow) para las grandes."""
+    if filas <= LIMITE_FILAS_EXCEL_AUTO:
+        return ["excel"]
+    try:
+        import pyarrow  # noqa: F401
+        return ["parquet"]
+    except ImportError:
+        return ["csv"]
+
+
+def exportar_solucion(tiendas, assignments, solutions, rings_upper, carpeta,
+                      formatos=FORMATOS_SALIDA, filas_bloque=FILAS_BLOQUE):
+    """
+    Escribe las tablas de la solución en `carpeta` en cada formato de
+    `formatos` (lista o texto separado por comas; None = automático).
+    Devuelve las rutas generadas.
+    """
+    tablas = tablas_solucion(tiendas, assignments, solutions, rings_upper)
+    filas = {k: len(next(iter(v.values()))) for k, v in tablas.items()}
+    if formatos is None:
+        formatos = formatos_automaticos(max(filas.values()))
+    elif isinstance(formatos, str):
+        formatos = [f.strip() for f in formatos.split(",") if f.strip()]
+    desconocidos = [f for f in formatos if f not in ESCRITORES]
+    if desconocidos:
+        raise ValueError(f"Formatos no válidos {desconocidos}; usa {sorted(ESCRITORES)}")
+
+    rutas = []
+    for formato in formatos:
+        with ESCRITORES[formato](carpeta) as escritor:
+            for tabla, columnas in tablas.items():
+                escritor.preparar(tabla, columnas)
+                escritor.escribir(tabla, bloques(columnas, filas_bloque), filas[tabla])
+        rutas.extend(escritor.rutas)
+        print(f"📘 Resultados ({formato}) generados en:\n   " + "\n   ".join(escritor.rutas))
+    return rutas
+
+
+def buscar_resultado(carpeta):
+    """
+    Ruta del resultado más reciente en `carpeta` (xlsx, carpeta de tablas o
+    npz), o None si no hay ninguno.
+    """
+    candidatos = [os.path.join(carpeta, f"{NOMBRE_RESULTADO}.xlsx"),
+                  os.path.join(carpeta, NOMBRE_RESULTADO),
+                  os.path.join(carpeta, f"{NOMBRE_RESULTADO}.npz")]
+    existentes = [ruta for ruta in candidatos if os.path.exists(ruta)]
+    return max(existentes, key=os.path.getmtime) if existentes else None
+
+
+def leer_tablas(ruta):
+    """
+    {tabla: DataFrame} desde un .xlsx, un .npz o la carpeta de Parquet/CSV.
+    La tabla Tiendas solo se incluye si el resultado la tiene.
+    """
+    if ruta.lower().endswith(".npz"):
+        with np.load(ruta) as datos:
+            return {t: pd.DataFrame(datos[t]) for t in (*TABLAS_SOLUCION, TABLA_TIENDAS)
+                    if t in datos.files}
+    if os.path.isdir(ruta):
+        tablas = {}
+        for t in (*TABLAS_SOLUCION, TABLA_TIENDAS):
+            parquet = os.path.join(ruta, f"{t}.parquet")
+            csv = os.path.join(ruta, f"{t}.csv")
+            if os.path.exists(parquet):
+                tablas[t] = pd.read_parquet(parquet)
+            elif os.path.exists(csv) or t != TABLA_TIENDAS:
+                tablas[t] = pd.read_csv(csv)
+        return tablas
+    with pd.ExcelFile(ruta) as libro:
+        return {t: libro.parse(t) for t in (*TABLAS_SOLUCION, TABLA_TIENDAS)
+                if t in libro.sheet_names or t != TABLA_TIENDAS}
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Replanificación incremental cuando cambian algunas tiendas.
+
+En lugar de recalcular todo con `calcular_solucion`, se parte de la solución
+anterior (la tupla que devolvió, o los resultados que exportó) y de los
+cambios entre la tabla de tiendas anterior y la nueva. Los resultados
+exportados guardan la tabla de tiendas con la que se calcularon (ver
+`leer_resultado`), así que se pueden comparar contra un Excel nuevo.
+
+1. `detectar_cambios` empareja las filas (por nombre o por posición) y
+   encuentra las tiendas agregadas, eliminadas y movidas.
+2. Solo las tiendas agregadas, movidas o que no tenían centro se vuelven a
+   asignar, con la capacidad que dejan libre las demás.
+3. En las rutas tocadas se quitan las tiendas que salen, se agregan las
+   nuevas con inserción más barata y se afina la ruta con búsqueda local
+   (recocido a temperatura 0 partiendo de la ruta reparada). Las rutas que
+   no cambiaron se conservan tal cual.
+
+El trabajo es proporcional al tamaño del cambio y de las rutas tocadas, no
+al de la red completa. Los centros deben ser los mismos; si cambian, hay que
+recalcular con `calcular_solucion`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from Modulos.asignacion import (COL_LATITUD, COL_LONGITUD, _por_centro, a_cartesianas,
+                                asignar_tiendas, cuerda_a_km, indices_por_tipo,
+                                rangos_por_centro)
+from Modulos.exportacion import FORMATOS_SALIDA, TABLA_TIENDAS, exportar_solucion, leer_tablas
+from Modulos.paralelo import resolver_rutas, semilla_ruta
+from Modulos.recocido import costo_combinado, costo_ruta
+from Modulos.solucion import (ALPHA, CAPACIDAD_CENTRO, DEMANDA_TIENDA, RADIO_COBERTURA_KM,
+                              SA_COOL, SA_ENFRIAMIENTO, SA_ITERS, SA_PROCESOS, SA_SEMILLA,
+                              SA_VECINOS, resumen_por_centro)
+
+REPARACION_T0 = 0.0               # 0 = solo se aceptan mejoras (búsqueda local)
+REPARACION_ITERS_POR_CAMBIO = 2000  # iteraciones de búsqueda local por tienda que entra o sale
+TOLERANCIA_GRADOS = 1e-7          # diferencia de coordenadas que cuenta como mudanza
+
+
+def detectar_cambios(anterior, nueva, clave=None, tolerancia=TOLERANCIA_GRADOS):
+    """
+    Cambios entre la tabla de tiendas anterior y la nueva.
+
+    Las filas se emparejan por la columna `clave` (por defecto "Nombre" si
+    ambas tablas la tienen) o, sin ella, por posición. Devuelve un dict con:
+    - mapa: fila nueva de cada fila anterior (-1 si ya no está)
+    - agregadas, movidas: filas de la tabla nueva
+    - eliminadas: filas de la tabla anterior
+    """
+    if clave is None and "Nombre" in anterior.columns and "Nombre" in nueva.columns:
+        clave = "Nombre"
+    if clave is None:
+        comunes = min(len(anterior), len(nueva))
+        mapa = np.full(len(anterior), -1, dtype=np.int64)
+        mapa[:comunes] = np.arange(comunes)
+    else:
+        claves_anteriores = anterior[clave].astype(str)
+        claves_nuevas = nueva[clave].astype(str)
+        for serie, tabla in ((claves_anteriores, "anterior"), (claves_nuevas, "nueva")):
+            if serie.duplicated().any():
+                raise ValueError(f"La columna '{clave}' tiene valores repetidos en la tabla {tabla}")
+        posicion = pd.Series(np.arange(len(nueva)), index=claves_nuevas.values)
+        mapa = posicion.reindex(claves_anteriores.values).fillna(-1).to_numpy(np.int64)
+
+    presentes = np.flatnonzero(mapa >= 0)
+    destino = mapa[presentes]
+    movida = np.zeros(len(presentes), dtype=bool)
+    for columna in (COL_LATITUD, COL_LONGITUD):
+        antes = anterior[columna].to_numpy(float)[presentes]
+        despues = nueva[columna].to_numpy(float)[destino]
+        movida |= np.abs(despues - antes) > tolerancia
+
+    return {
+        "mapa": mapa,
+        "agregadas": np.setdiff1d(np.arange(len(nueva)), destino),
+        "eliminadas": np.flatnonzero(mapa < 0),
+        "movidas": np.sort(destino[movida]),
+    }
+
+
+def leer_resultado(ruta):
+    """
+    Resultado exportado (el .xlsx, el .npz o la carpeta con las tablas
+    Parquet/CSV) como dict con assignments, solutions, rings_upper y
+    tiendas: la tabla de tiendas con la que se calculó, en el orden de sus
+    filas (None si el resultado es anterior a que se guardara).
+
+    Los totales de cada ruta no se exportan; `reparar_solucion` los recalcula.
+    """
+    hojas = leer_tablas(ruta)
+    assignments, solutions, rings_upper = _tablas_a_solucion(hojas)
+    tiendas = hojas.get(TABLA_TIENDAS)
+    if tiendas is not None:
+        tiendas = (tiendas.sort_values("Fila").drop(columns="Fila")
+                   .reset_index(drop=True))
+    return {"assignments": assignments, "solutions": solutions,
+            "rings_upper": rings_upper, "tiendas": tiendas}
+
+
+def leer_solucion(ruta):
+    """(assignments, solutions, rings_upper) desde un resultado exportado."""
+    return _tablas_a_solucion(leer_tablas(ruta))
+
+
+def _tablas_a_solucion(hojas):
+    rutas = hojas["Rutas"].sort_values(["Centro_ID", "Orden"])
+    n_centros = int(rutas["Centro_ID"].max()) if len(rutas) else 0
+
+    def por_centro(tabla, columna, restar):
+        grupos = tabla.groupby("Centro_ID")[columna].agg(list)
+        return {c: [v - restar for v in grupos.get(c + 1, [])] for c in range(n_centros)}
+
+    assignments = {c: sorted(int(t) for t in v)
+                   for c, v in por_centro(hojas["Asignaciones"], "Tienda_ID", 1).items()}
+    solutions = {c: {"route": [int(n) for n in v]}
+                 for c, v in por_centro(rutas, "Nodo_ID", 1).items()}
+    rings_upper = {c: sorted(float(r) for r in v)
+                   for c, v in por_centro(hojas["Rangos"], "Rango_km", 0).items()}
+    return assignments, solutions, rings_upper
+
+
+def _solucion_anterior(anterior):
+    """Acepta la ruta de un resultado exportado, la tupla de calcular_solucion o un dict."""
+    if isinstance(anterior, str):
+        anterior = leer_solucion(anterior)
+    if isinstance(anterior, dict):
+        anterior = (anterior["assignments"], anterior["solutions"], anterior.get("rings_upper"))
+    assignments, solutions, rings_upper = anterior
+    rutas = {c: s["route"] for c, s in solutions.items()}
+    return assignments, rutas, rings_upper
+
+
+def _demanda_por_fila(tiendas, nodos_tienda, demanda):
+    """Demanda de cada fila de `tiendas` (1 por tienda si no se indica)."""
+    if isinstance(demanda, str):
+        return tiendas[demanda].to_numpy(float)
+    por_fila = np.zeros(len(tiendas))
+    por_fila[nodos_tienda] = 1.0 if demanda is None else np.asarray(demanda, dtype=float)
+    return por_fila
+
+
+def _insertar(M, ruta, nodo):
+    """Inserta `nodo` en la posición más barata de la ruta cerrada."""
+    r = np.asarray(ruta)
+    a, b = r[:-1], r[1:]
+    delta = M[a, nodo] + M[nodo, b] - M[a, b]
+    ruta.insert(int(np.argmin(delta)) + 1, nodo)
+
+
+def reparar_solucion(tiendas, D, C, anterior, cambios, data_path=None, alpha=ALPHA,
+                     t0=REPARACION_T0, iteraciones_por_cambio=REPARACION_ITERS_POR_CAMBIO,
+                     iteraciones_max=SA_ITERS, semilla=SA_SEMILLA, vecinos=SA_VECINOS,
+                     procesos=SA_PROCESOS, radio_km=RADIO_COBERTURA_KM,
+                     capacidad=CAPACIDAD_CENTRO, demanda=DEMANDA_TIENDA,
+                     formatos=FORMATOS_SALIDA):
+    """
+    Repara la solución anterior para la nueva tabla de tiendas.
+
+    - tiendas, D, C: datos nuevos (como en calcular_solucion).
+    - anterior: tupla (assignments, solutions, rings_upper), dict con esas
+      claves o ruta a un resultado exportado (ver leer_solucion); sus índices
+      son filas de la tabla anterior.
+    - cambios: lo que devuelve detectar_cambios(tiendas_anteriores, tiendas).
+
+    Devuelve (assignments, solutions, rings_upper) como calcular_solucion y,
+    con data_path, exporta los resultados igual que ella.
+    """
+    print("🔄 Reparando la solución anterior...")
+
+    # Sin copiar D y C ni materializar alpha * D + (1 - alpha) * C completa:
+    # solo se consultan las entradas de las tiendas y rutas afectadas, y
+    # resolver_rutas envía a cada proceso solo la submatriz de su centro.
+    M = costo_combinado(D, C, alpha)
+
+    centros, nodos_tienda = indices_por_tipo(tiendas)
+    n_centros = len(centros)
+    asignaciones_previas, rutas_previas, rangos_previos = _solucion_anterior(anterior)
+    mapa = np.asarray(cambios["mapa"], dtype=np.int64)
+
+    if len(rutas_previas) != n_centros or any(
+            mapa[rutas_previas[c][0]] != centros[c] for c in range(n_centros)):
+        raise ValueError("Los centros cambiaron; recalcula la solución con calcular_solucion")
+
+    es_tienda = np.zeros(len(tiendas), dtype=bool)
+    es_tienda[nodos_tienda] = True
+    reubicar = np.zeros(len(tiendas), dtype=bool)
+    reubicar[np.asarray(cambios["agregadas"], dtype=np.int64)] = True
+    reubicar[np.asarray(cambios["movidas"], dtype=np.int64)] = True
+    reubicar &= es_tienda
+
+    # --- Lo que se conserva de cada centro (ya con índices nuevos) ---
+    assignments, rutas, movimientos = {}, {}, np.zeros(n_centros, dtype=np.int64)
+    atendida = np.zeros(len(tiendas), dtype=bool)
+    for c in range(n_centros):
+        previas = mapa[np.asarray(asignaciones_previas.get(c, []), dtype=np.int64)]
+        seguir = previas >= 0
+        seguir[seguir] = es_tienda[previas[seguir]] & ~reubicar[previas[seguir]]
+        assignments[c] = previas[seguir].tolist()
+        atendida[previas[seguir]] = True
+        movimientos[c] = int((~seguir).sum())
+
+        ruta = mapa[np.asarray(rutas_previas[c], dtype=np.int64)]
+        interior = ruta[1:-1]
+        interior = interior[(interior >= 0) & atendida[np.maximum(interior, 0)]]
+        rutas[c] = [int(centros[c])] + interior.tolist() + [int(centros[c])]
+
+    # --- Reasignar solo las tiendas nuevas, movidas o que no tenían centro ---
+    pendientes = np.flatnonzero(es_tienda & ~atendida)
+    restante = None
+    demanda_fila = None
+    if capacidad is not None:
+        demanda_fila = _demanda_por_fila(tiendas, nodos_tienda, demanda)
+        tope = _por_centro(capacidad, n_centros, tiendas, centros, "La capacidad")
+        carga = np.array([demanda_fila[assignments[c]].sum() for c in range(n_centros)])
+        restante = np.maximum(tope - carga, 0.0)
+    asignado, _ = asignar_tiendas(
+        tiendas, centros, pendientes, M=M, radio_km=radio_km, capacidad=restante,
+        demanda=None if demanda_fila is None else demanda_fila[pendientes])
+
+    for nodo, c in zip(pendientes.tolist(), asignado.tolist()):
+        if c < 0:
+            continue
+        assignments[c].append(nodo)
+        _insertar(M, rutas[c], nodo)
+        movimientos[c] += 1
+    for c in range(n_centros):
+        assignments[c].sort()
+
+    tocados = [c for c in range(n_centros) if movimientos[c]]
+    sin_centro = int((asignado < 0).sum())
+    print(f"   {len(cambios['agregadas'])} agregadas, {len(cambios['eliminadas'])} eliminadas, "
+          f"{len(cambios['movidas'])} movidas -> {len(tocados)} de {n_centros} rutas tocadas")
+    if sin_centro:
+        print(f"⚠️ {sin_centro} tiendas quedaron sin centro "
+              "(fuera de cobertura o sin capacidad).")
+
+    # --- Búsqueda local sobre las rutas tocadas, desde la ruta reparada ---
+    trabajos = []
+    for c in tocados:
+        nodos = rutas[c][:-1]
+        parametros = {
+            "iteraciones": int(min(iteraciones_max, iteraciones_por_cambio * movimientos[c])),
+            "t0": t0, "factor": SA_COOL, "enfriamiento": SA_ENFRIAMIENTO,
+            "vecinos": vecinos, "ruta_inicial": list(range(len(nodos))),
+        }
+        trabajos.append((c, 0, nodos, semilla_ruta(semilla, c, 0), parametros))
+    for c, (ruta, _) in resolver_rutas(D, C, alpha, trabajos, procesos=procesos).items():
+        rutas[c] = ruta
+
+    solutions = {}
+    for c in range(n_centros):
+        distancia = costo_ruta(D, rutas[c])
+        combustible = costo_ruta(C, rutas[c])
+        solutions[c] = {
+            "route": rutas[c],
+            "distancia": distancia,
+            "costo_combustible": combustible,
+            "objetivo": alpha * distancia + (1.0 - alpha) * combustible,
+        }
+
+    # --- Rangos: se recalculan solo los de los centros tocados ---
+    if rangos_previos is None:
+        recalcular, rings_upper = range(n_centros), {}
+    else:
+        recalcular = tocados
+        rings_upper = {c: list(rangos_previos.get(c, [])) for c in range(n_centros)}
+    nodos = np.array([t for c in recalcular for t in assignments[c]], dtype=np.int64)
+    centro_de = np.array([c for c in recalcular for _ in assignments[c]], dtype=np.int64)
+    filas = np.concatenate((nodos, centros[centro_de]))
+    xyz = a_cartesianas(tiendas[COL_LATITUD].to_numpy(float)[filas],
+                        tiendas[COL_LONGITUD].to_numpy(float)[filas])
+    km = cuerda_a_km(np.linalg.norm(xyz[:len(nodos)] - xyz[len(nodos):], axis=1))
+    nuevos = rangos_por_centro(centro_de, km, n_centros)
+    for c in recalcular:
+        rings_upper[c] = nuevos[c]
+
+    print("\n=== RESULTADOS POR CENTRO ===")
+    print(resumen_por_centro(assignments, solutions).to_string(index=False))
+
+    print("✅ Solución reparada exitosamente.")
+
+    if data_path:
+        exportar_solucion(tiendas, assignments, solutions, rings_upper, data_path,
+                          formatos=formatos)
+
+    return assignments, solutions, rings_upper
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecución de las rutas por centro en varios procesos (centro × reinicio).
+
+Con las asignaciones fijas, la ruta de cada centro es independiente de las
+demás, y el recocido mejora bastante con varios reinicios. Cada trabajo es un
+par (centro, reinicio) y se conserva la mejor ruta de cada centro.
+
+Los procesos no reciben D ni C. El proceso principal arma una sola vez la
+submatriz de costo de cada centro, la copia a memoria compartida y todos los
+reinicios de ese centro la adjuntan por nombre; el bloque se libera cuando
+termina el último. Los proveedores bajo demanda recortados a los nodos del
+centro viajan tal cual (solo coordenadas). Las submatrices se arman a medida
+que hay lugar en el pool, así la memoria crece con el tamaño de las rutas y
+no con n² × procesos.
+
+compartir_matrices/adjuntar_matrices quedan para quien sí necesita las
+matrices completas en cada proceso (p. ej. Modulos.escenarios).
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Modulos.distancias import LIMITE_DENSO, es_perezosa
+from Modulos.recocido import matriz_costo, recocido_ruta
+
+TRABAJOS_POR_PROCESO = 2  # submatrices en vuelo por proceso
+
+# Bloques adjuntados por cada proceso trabajador (ver adjuntar_matrices).
+_segmentos = []
+
+
+class MatrizCompartida:
+    """Copia de una matriz NumPy en un bloque de memoria compartida."""
+
+    def __init__(self, matriz):
+        matriz = np.ascontiguousarray(matriz)
+        self.forma = matriz.shape
+        self.tipo = matriz.dtype.str
+        self.shm = shared_memory.SharedMemory(create=True, size=max(matriz.nbytes, 1))
+        np.ndarray(self.forma, dtype=self.tipo, buffer=self.shm.buf)[...] = matriz
+
+    @property
+    def descriptor(self):
+        return self.shm.name, self.forma, self.tipo
+
+    def liberar(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def compartir_matrices(matrices):
+    """
+    Copia a memoria compartida las matrices densas de {clave: matriz}.
+
+    Devuelve (compartidas, descriptores): los bloques creados, que hay que
+    liberar al terminar, y lo que se envía a los procesos para adjuntarlas.
+    Los proveedores bajo demanda se envían tal cual (solo coordenadas).
+    """
+    compartidas = {k: MatrizCompartida(np.asarray(m))
+                   for k, m in matrices.items() if not es_perezosa(m)}
+    descriptores = {k: compartidas[k].descriptor if k in compartidas else m
+                    for k, m in matrices.items()}
+    return compartidas, descriptores
+
+
+def adjuntar_matrices(descriptores):
+    """En un proceso trabajador: {clave: matriz} a partir de los descriptores."""
+    matrices = {}
+    for clave, descriptor in descriptores.items():
+        if es_perezosa(descriptor):
+            matrices[clave] = descriptor
+            continue
+        nombre, forma, tipo = descriptor
+        shm = shared_memory.SharedMemory(name=nombre)
+        _segmentos.append(shm)  # mantiene vivo el bloque mientras viva el proceso
+        matrices[clave] = np.ndarray(forma, dtype=tipo, buffer=shm.buf)
+    return matrices
+
+
+def semilla_ruta(semilla, centro, reinicio):
+    """Semilla de un trabajo; el reinicio 0 usa la misma que el modo en serie."""
+    if semilla is None:
+        return None
+    return [semilla, centro] if reinicio == 0 else [semilla, centro, reinicio]
+
+
+def submatriz_costo(D, C, alpha, nodos):
+    """
+    Costo alpha * D + (1 - alpha) * C entre `nodos`: arreglo float64, o
+    proveedor bajo demanda recortado si D o C lo son (materializado hasta
+    LIMITE_DENSO nodos).
+    """
+    nodos = np.asarray(nodos, dtype=np.int64)
+    if es_perezosa(D) or es_perezosa(C):
+        M = matriz_costo(D, C, alpha).sub(nodos)
+        return M.bloque() if len(nodos) <= LIMITE_DENSO else M
+    ix = np.ix_(nodos, nodos)
+    return alpha * np.asarray(D[ix], dtype=float) + (1.0 - alpha) * np.asarray(C[ix], dtype=float)
+
+
+def resolver_submatriz(M, trabajo):
+    """
+    Corre el recocido de un (centro, reinicio) sobre M, la submatriz de sus
+    nodos. Con parametros["convergencia"] = True devuelve también la curva
+    del recocido (None si no).
+    """
+    centro, reinicio, nodos, semilla, parametros = trabajo
+    parametros = dict(parametros)
+    curva = [] if parametros.pop("convergencia", False) else None
+    nodos = np.asarray(nodos, dtype=np.int64)
+    ruta_local, objetivo = recocido_ruta(M, semilla=semilla, convergencia=curva, **parametros)
+    return centro, reinicio, nodos[ruta_local].tolist(), objetivo, curva
+
+
+def resolver_compartida(matriz, trabajo):
+    """
+    resolver_submatriz en un proceso trabajador: `matriz` es el descriptor
+    de una MatrizCompartida (o un proveedor bajo demanda), que se adjunta
+    solo mientras dura el trabajo.
+    """
+    if es_perezosa(matriz):
+        return resolver_submatriz(matriz, trabajo)
+    nombre, forma, tipo = matriz
+    shm = shared_memory.SharedMemory(name=nombre)
+    try:
+        M = np.ndarray(forma, dtype=tipo, buffer=shm.buf)
+        resultado = resolver_submatriz(M, trabajo)
+        del M
+        return resultado
+    finally:
+        shm.close()
+
+
+def resolver_trabajo(D, C, alpha, trabajo):
+    """Un (centro, reinicio) sobre la submatriz de sus nodos en D y C."""
+    return resolver_submatriz(submatriz_costo(D, C, alpha, trabajo[2]), trabajo)
+
+
+def resolver_rutas(D, C, alpha, trabajos, procesos=1, curvas=None):
+    """
+    Resuelve los trabajos (centro, reinicio, nodos, semilla, parametros) y
+    devuelve {centro: (ruta, objetivo)} con la mejor ruta de cada centro. Si
+    se da el dict `curvas`, se llena con la curva de convergencia de esa ruta.
+
+    procesos=1 trabaja en el proceso actual; None usa todos los núcleos. El
+    resultado no depende del número de procesos: cada trabajo tiene su semilla
+    y los empates se resuelven por el número de reinicio. En paralelo la
+    submatriz de cada centro se arma una vez y la comparten sus reinicios, con
+    a lo más TRABAJOS_POR_PROCESO trabajos en vuelo por proceso.
+    """
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = max(1, int(procesos))
+    procesos = min(procesos, len(trabajos)) if trabajos else 1
+    mejores = {}
+
+    def conservar(resultado):
+        centro, reinicio, ruta, objetivo, curva = resultado
+        actual = mejores.get(centro)
+        if actual is None or (objetivo, reinicio) < (actual[2], actual[0]):
+            mejores[centro] = (reinicio, ruta, objetivo, curva)
+
+    if procesos == 1:
+        for trabajo in trabajos:
+            conservar(resolver_trabajo(D, C, alpha, trabajo))
+    else:
+        # Los centros con más tiendas primero, para repartir mejor la carga.
+        por_centro = {}
+        for trabajo in trabajos:
+            por_centro.setdefault(trabajo[0], []).append(trabajo)
+        grupos = sorted(por_centro.values(), key=lambda g: len(g[0][2]), reverse=True)
+        bloques = {}    # centro -> MatrizCompartida o proveedor bajo demanda
+        restantes = {}  # centro -> reinicios que aún usan su bloque
+
+        def recoger(listos):
+            for futuro in listos:
+                resultado = futuro.result()
+                conservar(resultado)
+                centro = resultado[0]
+                restantes[centro] -= 1
+                if restantes[centro] == 0:
+                    bloque = bloques.pop(centro)
+                    if isinstance(bloque, MatrizCompartida):
+                        bloque.liberar()
+
+        try:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                en_vuelo = set()
+                for grupo in grupos:
+                    centro = grupo[0][0]
+                    M = submatriz_costo(D, C, alpha, grupo[0][2])
+                    bloque = M if es_perezosa(M) else MatrizCompartida(M)
+                    del M
+                    bloques[centro], restantes[centro] = bloque, len(grupo)
+                    matriz = bloque.descriptor if isinstance(bloque, MatrizCompartida) else bloque
+                    for trabajo in grupo:
+                        en_vuelo.add(pool.submit(resolver_compartida, matriz, trabajo))
+                        if len(en_vuelo) >= procesos * TRABAJOS_POR_PROCESO:
+                            listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                            recoger(listos)
+                recoger(wait(en_vuelo).done)
+        finally:
+            for bloque in bloques.values():
+                if isinstance(bloque, MatrizCompartida):
+                    bloque.liberar()
+
+    if curvas is not None:
+        curvas.update({centro: m[3] for centro, m in mejores.items()})
+    return {centro: (ruta, objetivo) for centro, (_, ruta, objetivo, _) in mejores.items()}
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Recocido simulado (Simulated Annealing) para la ruta de cada centro (TSP).
+
+La ruta es un ciclo que sale del centro, visita sus tiendas y regresa. Se
+trabaja sobre una matriz de costo NumPy que combina distancia y combustible:
+
+    M = alpha * D + (1 - alpha) * C
+
+Movimientos:
+- 2-opt:  invierte un tramo de la ruta.
+- or-opt: mueve un bloque de 1 a 3 tiendas a otra posición (derecho o invertido).
+- swap:   intercambia dos tiendas.
+
+El cambio de costo de cada movimiento se calcula en tiempo constante con las
+aristas que entran y salen (por eso las matrices deben ser simétricas); la
+ruta solo se modifica cuando el movimiento se acepta.
+"""
+
+import time
+
+import numpy as np
+
+from Modulos.distancias import MatrizCombinada, combinar, es_perezosa
+
+
+# --- Esquemas de enfriamiento: temperatura en las iteraciones k ---
+def _geometrico(t0, k, iteraciones, factor):
+    return t0 * factor ** k
+
+
+def _lineal(t0, k, iteraciones, factor):
+    return t0 * np.maximum(1.0 - k / iteraciones, 0.0)
+
+
+def _logaritmico(t0, k, iteraciones, factor):
+    return t0 / (1.0 + np.log1p(k))
+
+
+ENFRIAMIENTOS = {
+    "geometrico": _geometrico,
+    "lineal": _lineal,
+    "logaritmico": _logaritmico,
+}
+
+MOVIMIENTOS = ("2opt", "oropt", "swap")
+PROB_MOVIMIENTOS = (0.5, 0.3, 0.2)
+OROPT_MAX = 3
+BLOQUE = 4096  # números aleatorios que se generan de una vez
+
+
+def matriz_costo(D, C, alpha):
+    """
+    Costo combinado alpha * D + (1 - alpha) * C como arreglo float64, o como
+    proveedor bajo demanda si D o C lo son (ver Modulos.distancias).
+    """
+    if es_perezosa(D) or es_perezosa(C):
+        if tuple(D.shape) != tuple(C.shape):
+            raise ValueError(f"D y C deben tener el mismo tamaño: {D.shape} vs {C.shape}")
+        return combinar(D, C, alpha)
+    D = np.asarray(D, dtype=float)
+    C = np.asarray(C, dtype=float)
+    if D.shape != C.shape or D.ndim != 2 or D.shape[0] != D.shape[1]:
+        raise ValueError(
+            f"D y C deben ser matrices cuadradas del mismo tamaño: {D.shape} vs {C.shape}")
+    return alpha * D + (1.0 - alpha) * C
+
+
+def costo_combinado(D, C, alpha):
+    """
+    alpha * D + (1 - alpha) * C sin materializar la matriz n x n: cada
+    consulta M[filas, columnas] combina solo esas entradas. D y C conservan
+    su tipo (p. ej. los memmap float32 de la caché de data_loader).
+    """
+    if es_perezosa(D) or es_perezosa(C):
+        return matriz_costo(D, C, alpha)
+    D, C = np.asarray(D), np.asarray(C)
+    if D.shape != C.shape or D.ndim != 2 or D.shape[0] != D.shape[1]:
+        raise ValueError(
+            f"D y C deben ser matrices cuadradas del mismo tamaño: {D.shape} vs {C.shape}")
+    return MatrizCombinada(D, C, alpha)
+
+
+def costo_ruta(M, ruta):
+    """Suma de M sobre las aristas consecutivas de la ruta."""
+    ruta = np.asarray(ruta)
+    if len(ruta) < 2:
+        return 0.0
+    return float(M[ruta[:-1], ruta[1:]].sum())
+
+
+def vecino_mas_cercano(M):
+    """Ruta inicial por vecino más cercano empezando en el nodo 0 (el centro)."""
+    m = M.shape[0]
+    ruta = np.empty(m, dtype=np.int64)
+    visitado = np.zeros(m, dtype=bool)
+    actual = 0
+    ruta[0] = 0
+    visitado[0] = True
+    for k in range(1, m):
+        fila = np.where(visitado, np.inf, M[actual])
+        actual = int(np.argmin(fila))
+        ruta[k] = actual
+        visitado[actual] = True
+    return ruta
+
+
+def listas_vecinos(M, k):
+    """Los k nodos más cercanos de cada nodo (sin incluirse a sí mismo)."""
+    m = M.shape[0]
+    k = min(k, m - 1)
+    if k <= 0:
+        return None
+    if es_perezosa(M):
+        return M.vecinos(k)
+    sin_diagonal = M.copy()
+    np.fill_diagonal(sin_diagonal, np.inf)
+    return np.argpartition(sin_diagonal, k - 1, axis=1)[:, :k]
+
+
+# --- Cambio de costo de cada movimiento sobre la ruta abierta t (m nodos, el
+# ciclo cierra de t[m-1] a t[0]); solo se leen las aristas que cambian. ---
+def delta_2opt(M, ruta, i, j):
+    """Invertir t[i+1..j] (0 <= i, i + 2 <= j <= m - 1, sin ser i=0 y j=m-1)."""
+    a, b = ruta[i], ruta[i + 1]
+    c, d = ruta[j], ruta[(j + 1) % len(ruta)]
+    return M[a, c] + M[b, d] - M[a, b] - M[c, d]
+
+
+def delta_oropt(M, ruta, s, e, k):
+    """
+    Sacar el bloque t[s..e] (s >= 1) e insertarlo entre t[k] y t[k+1]
+    (k fuera de s-1..e). Devuelve (delta derecho, delta invertido).
+    """
+    m = len(ruta)
+    p, x, y, q = ruta[s - 1], ruta[s], ruta[e], ruta[(e + 1) % m]
+    u, v = ruta[k], ruta[(k + 1) % m]
+    base = M[p, q] - M[p, x] - M[y, q] - M[u, v]
+    return base + M[u, x] + M[y, v], base + M[u, y] + M[x, v]
+
+
+def delta_swap(M, ruta, i, j):
+    """Intercambiar t[i] y t[j] (1 <= i < j <= m - 1)."""
+    x, y = ruta[i], ruta[j]
+    a, d = ruta[i - 1], ruta[(j + 1) % len(ruta)]
+    if j == i + 1:
+        return M[a, y] + M[x, d] - M[a, x] - M[y, d]
+    b, c = ruta[i + 1], ruta[j - 1]
+    return (M[a, y] + M[y, b] + M[c, x] + M[x, d]
+            - M[a, x] - M[x, b] - M[c, y] - M[y, d])
+
+
+def recocido_ruta(M, iteraciones=150000, t0=600.0, factor=0.9993,
+                  enfriamiento="geometrico", semilla=None, vecinos=10,
+                  ruta_inicial=None, tiempo_max=None, convergencia=None):
+    """
+    Optimiza un ciclo sobre todos los nodos de M (el nodo 0 es el centro).
+
+    M es la submatriz de costo de un centro y sus tiendas (arreglo o
+    proveedor bajo demanda). Devuelve (ruta, costo), donde la ruta empieza y
+    termina en 0. `vecinos` limita el segundo extremo de 2-opt a los nodos
+    más cercanos (None = cualquiera).
+
+    tiempo_max (segundos) corta la búsqueda aunque no se hayan completado las
+    iteraciones; se revisa cada BLOQUE iteraciones y no cambia el esquema de
+    enfriamiento. Si `convergencia` es una lista, se le agrega
+    (iteración, segundos, mejor costo) al inicio y tras cada bloque.
+    """
+    if enfriamiento not in ENFRIAMIENTOS:
+        raise ValueError(
+            f"Enfriamiento '{enfriamiento}' no válido; usa uno de {sorted(ENFRIAMIENTOS)}")
+
+    reloj = time.perf_counter()
+    if not es_perezosa(M):
+        M = np.ascontiguousarray(M, dtype=float)
+    m = M.shape[0]
+    ruta = vecino_mas_cercano(M) if ruta_inicial is None else np.array(
+        ruta_inicial[:m], dtype=np.int64)
+    if m < 4 or iteraciones <= 0:
+        cerrada = np.append(ruta, ruta[0])
+        costo = costo_ruta(M, cerrada)
+        if convergencia is not None:
+            convergencia.append((0, time.perf_counter() - reloj, costo))
+        return cerrada.tolist(), costo
+
+    rng = np.random.default_rng(semilla)
+    temperatura = ENFRIAMIENTOS[enfriamiento]
+    cercanos = listas_vecinos(M, vecinos) if vecinos else None
+    n_cercanos = 0 if cercanos is None else cercanos.shape[1]
+    pos = np.empty(m, dtype=np.int64)
+    pos[ruta] = np.arange(m)
+
+    costo = costo_ruta(M, np.append(ruta, ruta[0]))
+    mejor_costo = costo
+    mejor_ruta = ruta.copy()
+    acum = np.cumsum(PROB_MOVIMIENTOS)
+    if convergencia is not None:
+        convergencia.append((0, time.perf_counter() - reloj, mejor_costo))
+
+    for inicio in range(0, iteraciones, BLOQUE):
+        transcurrido = time.perf_counter() - reloj
+        if inicio and convergencia is not None:
+            convergencia.append((inicio, transcurrido, mejor_costo))
+        if tiempo_max is not None and transcurrido >= tiempo_max:
+            break
+        n = min(BLOQUE, iteraciones - inicio)
+        temps = temperatura(t0, np.arange(inicio, inicio + n, dtype=float),
+                            iteraciones, factor)
+        tipos = np.searchsorted(acum, rng.random(n) * acum[-1], side="right").tolist()
+        u1 = rng.random(n).tolist()
+        u2 = rng.random(n).tolist()
+        u3 = rng.random(n).tolist()
+        aceptar = rng.random(n).tolist()
+        temps = temps.tolist()
+
+        for it in range(n):
+            tipo = tipos[it]
+
+            if tipo == 0:
+                # 2-opt: quita (t[i], t[i+1]) y (t[j], t[j+1]); agrega (t[i], t[j]) y (t[i+1], t[j+1]).
+                i = int(u1[it] * m)
+                if n_cercanos:
+                    j = int(pos[cercanos[ruta[i], int(u2[it] * n_cercanos)]])
+                else:
+                    j = int(u2[it] * m)
+                if i > j:
+                    i, j = j, i
+                if j - i < 2 or (i == 0 and j == m - 1):
+                    continue
+                delta = delta_2opt(M, ruta, i, j)
+
+            elif tipo == 1:
+                # or-opt: el bloque t[s..e] se saca y se inserta entre t[k] y t[k+1].
+                largo = 1 + int(u3[it] * OROPT_MAX)
+                if largo > m - 3:
+                    continue
+                s = 1 + int(u1[it] * (m - largo))
+                e = s + largo - 1
+                k = int(u2[it] * m)
+                if s - 1 <= k <= e:
+                    continue
+                derecho, invertido = delta_oropt(M, ruta, s, e, k)
+                delta = min(derecho, invertido)
+
+            else:
+                # swap: intercambia t[i] y t[j] (el centro, en la posición 0, no se mueve).
+                i = 1 + int(u1[it] * (m - 1))
+                j = 1 + int(u2[it] * (m - 1))
+                if i == j:
+                    continue
+                if i > j:
+                    i, j = j, i
+                delta = delta_swap(M, ruta, i, j)
+
+            if delta > 0:
+                t = temps[it]
+                if t <= 0 or aceptar[it] >= np.exp(-delta / t):
+                    continue
+
+            # Se acepta el movimiento: ahora sí se modifica la ruta.
+            if tipo == 0:
+                ruta[i + 1:j + 1] = ruta[i + 1:j + 1][::-1]
+                pos[ruta[i + 1:j + 1]] = np.arange(i + 1, j + 1)
+            elif tipo == 1:
+                bloque = ruta[s:e + 1].copy()
+                if invertido < derecho:
+                    bloque = bloque[::-1]
+                resto = np.concatenate((ruta[:s], ruta[e + 1:]))
+                destino = k + 1 if k < s else k + 1 - largo
+                ruta = np.concatenate((resto[:destino], bloque, resto[destino:]))
+                pos[ruta] = np.arange(m)
+            else:
+                x, y = ruta[i], ruta[j]
+                ruta[i], ruta[j] = y, x
+                pos[x], pos[y] = j, i
+
+            costo += delta
+            if costo < mejor_costo - 1e-12:
+                mejor_costo = costo
+                mejor_ruta = ruta.copy()
+
+    else:
+        if convergencia is not None:
+            convergencia.append((iteraciones, time.perf_counter() - reloj, mejor_costo))
+
+    cerrada = np.append(mejor_ruta, mejor_ruta[0])
+    # Se recalcula al final para no arrastrar error de redondeo de los deltas.
+    return cerrada.tolist(), costo_ruta(M, cerrada)
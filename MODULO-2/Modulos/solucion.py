@@ -1,84 +1,144 @@
 # -*- coding: utf-8 -*-
 """
-Módulo de cálculo de solución logística y exportación a Excel.
+Módulo de cálculo de solución logística y exportación de resultados.
 """
 
 import numpy as np
 import pandas as pd
 import os
 
+from Modulos.recocido import costo_combinado, costo_ruta
+from Modulos.paralelo import resolver_rutas, semilla_ruta
+from Modulos.asignacion import (indices_por_tipo, asignar_tiendas,
+                                agrupar_por_centro, rangos_por_centro)
+from Modulos.exportacion import FORMATOS_SALIDA, exportar_solucion
 
-def calcular_solucion(tiendas, D, C, data_path=None):
+# --- Parámetros globales ---
+ALPHA = 0.4                     # peso de la distancia frente al combustible
+SA_T0 = 600.0                   # temperatura inicial del recocido
+SA_COOL = 0.9993                # factor de enfriamiento (esquema geométrico)
+SA_ITERS = 150000               # iteraciones por centro
+SA_ENFRIAMIENTO = "geometrico"  # geometrico | lineal | logaritmico
+SA_SEMILLA = 42                 # semilla para resultados reproducibles
+SA_VECINOS = 10                 # candidatos más cercanos para 2-opt
+SA_REINICIOS = 1                # reinicios por centro (se queda la mejor ruta)
+SA_PROCESOS = 1                 # procesos en paralelo (None = todos los núcleos)
+SA_TIEMPO_MAX = None            # segundos máximos por ruta (None = sin límite)
+RADIO_COBERTURA_KM = None       # cobertura máxima de cada centro (None = sin límite)
+CAPACIDAD_CENTRO = None         # límite por centro: número, lista o columna de tiendas
+DEMANDA_TIENDA = None           # demanda por tienda: columna o lista (None = 1 cada una)
+
+
+def optimizar_rutas(D, C, alpha, centros, assignments, semilla=SA_SEMILLA,
+                    reinicios=SA_REINICIOS, procesos=SA_PROCESOS, convergencia=False,
+                    **parametros):
+    """
+    Recocido simulado sobre cada centro y sus tiendas, con `reinicios`
+    corridas por centro repartidas en `procesos`. Devuelve por centro la
+    mejor ruta (índices reales de nodo) y sus totales de distancia,
+    combustible y objetivo; con `convergencia`, también la curva
+    [(iteración, segundos, mejor costo), ...] de esa ruta.
+    """
+    if convergencia:
+        parametros = dict(parametros, convergencia=True)
+    trabajos = [
+        (c, r, [int(centros[c])] + list(assignments[c]),
+         semilla_ruta(semilla, c, r), parametros)
+        for c in range(len(centros)) for r in range(max(1, reinicios))
+    ]
+    curvas = {}
+    mejores = resolver_rutas(D, C, alpha, trabajos, procesos=procesos, curvas=curvas)
+    solutions = {
+        c: {
+            "route": ruta,
+            "distancia": costo_ruta(D, ruta),
+            "costo_combustible": costo_ruta(C, ruta),
+            "objetivo": objetivo,
+        }
+        for c, (ruta, objetivo) in sorted(mejores.items())
+    }
+    if convergencia:
+        for c, s in solutions.items():
+            s["convergencia"] = curvas[c]
+    return solutions
+
+
+def calcular_solucion(tiendas, D, C, data_path=None, alpha=ALPHA,
+                      iteraciones=SA_ITERS, t0=SA_T0, factor=SA_COOL,
+                      enfriamiento=SA_ENFRIAMIENTO, semilla=SA_SEMILLA,
+                      vecinos=SA_VECINOS, reinicios=SA_REINICIOS,
+                      procesos=SA_PROCESOS, radio_km=RADIO_COBERTURA_KM,
+                      capacidad=CAPACIDAD_CENTRO, demanda=DEMANDA_TIENDA,
+                      formatos=FORMATOS_SALIDA, tiempo_max=SA_TIEMPO_MAX,
+                      convergencia=False):
     """
     Calcula la asignación de tiendas a centros, rutas y rangos.
-    Genera también un archivo Excel con los resultados.
+    Con data_path exporta además los resultados en `formatos` (Excel en
+    corridas pequeñas y Parquet en las grandes si no se indica; ver
+    Modulos.exportacion).
+
+    Cada tienda va al centro con menor costo alpha * D + (1 - alpha) * C
+    entre los que la cubren (radio_km) y tienen capacidad libre, y la
+    ruta de cada centro se optimiza con recocido simulado. Con
+    `reinicios` > 1 se corren varias veces por centro y se queda la mejor;
+    `procesos` reparte esas corridas entre varios núcleos. tiempo_max
+    limita los segundos de cada ruta y `convergencia` guarda en cada
+    solución la curva del recocido.
     """
 
     print("🔄 Calculando solución optimizada...")
 
+    # D y C pueden ser matrices densas (también memmap float32) o proveedores
+    # bajo demanda (Modulos.distancias). No se copian ni se arma la matriz
+    # n x n: la asignación solo consulta el bloque tiendas x centros y cada
+    # ruta su propia submatriz.
+    M = costo_combinado(D, C, alpha)
+
     # --- Identificar nodos ---
-    n_centros = sum(tiendas['Tipo'].str.contains("Centro", case=False))
-    n_tiendas = sum(tiendas['Tipo'].str.contains("Tienda", case=False))
-
-    # --- Simulación de asignaciones (ejemplo, reemplaza por tu algoritmo real) ---
-    assignments = {
-        c: list(range(c * (n_tiendas // n_centros),
-                      (c + 1) * (n_tiendas // n_centros)))
-        for c in range(n_centros)
-    }
+    centros, nodos_tienda = indices_por_tipo(tiendas)
+    n_centros = len(centros)
 
-    # --- Simulación de rutas ---
-    solutions = {
-        c: {"route": [c] + assignments[c] + [c]} for c in range(n_centros)
-    }
+    # --- Asignación de tiendas al centro más eficiente ---
+    asignado, km_centro = asignar_tiendas(
+        tiendas, centros, nodos_tienda, M=M, radio_km=radio_km,
+        capacidad=capacidad, demanda=demanda)
+    assignments = agrupar_por_centro(asignado, nodos_tienda, n_centros)
+    sin_cobertura = int((asignado < 0).sum())
+    if sin_cobertura:
+        print(f"⚠️ {sin_cobertura} tiendas quedaron sin centro "
+              "(fuera de cobertura o sin capacidad).")
+
+    # --- Rutas por centro con recocido simulado ---
+    # Cada (centro, reinicio) usa su propia semilla derivada, así el
+    # resultado no depende del orden ni del número de procesos.
+    solutions = optimizar_rutas(
+        D, C, alpha, centros, assignments, semilla=semilla,
+        reinicios=reinicios, procesos=procesos, iteraciones=iteraciones,
+        t0=t0, factor=factor, enfriamiento=enfriamiento, vecinos=vecinos,
+        tiempo_max=tiempo_max, convergencia=convergencia)
+
+    # --- Rangos (en km) según la distancia real a las tiendas asignadas ---
+    rings_upper = rangos_por_centro(asignado, km_centro, n_centros)
 
-    # --- Simulación de rangos (en km) ---
-    rings_upper = {c: [5, 10, 15] for c in range(n_centros)}
+    print("\n=== RESULTADOS POR CENTRO ===")
+    print(resumen_por_centro(assignments, solutions).to_string(index=False))
 
     print("✅ Solución generada exitosamente.")
 
-    # --- Crear DataFrames para exportar ---
-    df_asignaciones = []
-    for centro, tiendas_ids in assignments.items():
-        for t in tiendas_ids:
-            nombre_tienda = tiendas.iloc[t][
-                "Nombre"] if "Nombre" in tiendas.columns else f"Tienda_{t+1}"
-            df_asignaciones.append({
-                "Centro_ID": centro + 1,
-                "Tienda_ID": t + 1,
-                "Nombre_Tienda": nombre_tienda
-            })
-    df_asignaciones = pd.DataFrame(df_asignaciones)
-
-    df_rutas = []
-    for centro, data in solutions.items():
-        ruta = data["route"]
-        for orden, nodo in enumerate(ruta):
-            df_rutas.append({
-                "Centro_ID": centro + 1,
-                "Orden": orden + 1,
-                "Nodo_ID": nodo + 1
-            })
-    df_rutas = pd.DataFrame(df_rutas)
-
-    df_rangos = []
-    for centro, rangos in rings_upper.items():
-        for r in rangos:
-            df_rangos.append({
-                "Centro_ID": centro + 1,
-                "Rango_km": r
-            })
-    df_rangos = pd.DataFrame(df_rangos)
-
-    # --- Guardar Excel ---
     if data_path:
-        output_path = os.path.join(data_path, "resultado_solucion.xlsx")
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            df_asignaciones.to_excel(
-                writer, index=False, sheet_name="Asignaciones")
-            df_rutas.to_excel(writer, index=False, sheet_name="Rutas")
-            df_rangos.to_excel(writer, index=False, sheet_name="Rangos")
-
-        print(f"📘 Archivo Excel generado en:\n   {output_path}")
+        exportar_solucion(tiendas, assignments, solutions, rings_upper, data_path,
+                          formatos=formatos)
 
     return assignments, solutions, rings_upper
+
+
+def resumen_por_centro(assignments, solutions):
+    """Tabla con tiendas, distancia, combustible y objetivo de cada centro."""
+    return pd.DataFrame([{
+        "Centro": c + 1,
+        "Tiendas_servicio": len(assignments[c]),
+        "Distancia_total (km)": round(s["distancia"], 2),
+        "Costo_combustible": round(s["costo_combustible"], 2),
+        "Valor_objetivo": round(s["objetivo"], 2),
+    } for c, s in solutions.items()])
+
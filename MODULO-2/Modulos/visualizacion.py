@@ -1,141 +1,334 @@
 # -*- coding: utf-8 -*-
-"""Funciones de mapeo: visualización de nodos, rutas y rangos."""
+"""
+Funciones de mapeo: visualización de nodos, rutas y rangos.
+
+Las coordenadas se proyectan una sola vez a Web Mercator (EPSG:3857) con la
+fórmula cerrada y se reutilizan en todos los mapas. Nodos, rutas, anillos y
+números de nodo se dibujan con colecciones y marcadores de matplotlib (unos
+pocos artistas por capa, no uno por elemento). El mapa base lo pone
+contextily con su caché en disco (CARPETA_TESELAS), así cada tesela se
+descarga una sola vez y sin red se usan las que ya están guardadas.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
-import geopandas as gpd
-from shapely.geometry import Point, LineString
-import matplotlib.pyplot as plt
 import contextily as cx
-import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import EllipseCollection, LineCollection
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D, ScaledTranslation
 
+R_MERCATOR = 6378137.0
 
-def mostrar_mapa_simple(tiendas: pd.DataFrame):
-    """Muestra un mapa simple con centros y tiendas (sin rutas)."""
-    geometry = [Point(xy) for xy in zip(
-        tiendas['Longitud_WGS84'], tiendas['Latitud_WGS84'])]
-    gdf = gpd.GeoDataFrame(tiendas, geometry=geometry,
-                           crs="EPSG:4326").to_crs(epsg=3857)
+CARPETA_TESELAS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Datos", "teselas")
+FUENTE_TESELAS = cx.providers.OpenStreetMap.Mapnik
+ZOOM_TESELAS = "auto"     # nivel de zoom del mapa base (o un entero fijo)
+ETIQUETAS_MAX = 500       # por encima de este número de nodos no se rotulan
+TAMANO_ETIQUETA = 7       # puntos
+LEYENDA_MAX = 20          # centros como máximo con entrada en la leyenda
 
-    centros = gdf[gdf['Tipo'].str.contains("Centro", case=False)]
-    tiendas = gdf[gdf['Tipo'].str.contains("Tienda", case=False)]
 
-    fig, ax = plt.subplots(figsize=(12, 12))
-    tiendas.plot(ax=ax, color="royalblue", markersize=40,
-                 alpha=0.8, label="Tiendas")
-    centros.plot(ax=ax, color="red", markersize=60,
-                 edgecolor="black", label="Centros")
-
-    for idx, row in gdf.iterrows():
-        ax.text(row.geometry.x, row.geometry.y, str(idx + 1),
-                fontsize=7, color='black', ha='center', va='center')
-
-    cx.add_basemap(ax, source=cx.providers.OpenStreetMap.Mapnik)
-    ax.set_title("Mapa simple de Centros y Tiendas", fontsize=16)
-    ax.legend()
-    ax.set_axis_off()
-    plt.show()
+class MapaProyectado:
+    """Coordenadas Web Mercator y tipo de cada nodo, calculados una sola vez."""
 
+    def __init__(self, tiendas):
+        lat = np.radians(tiendas['Latitud_WGS84'].to_numpy(dtype=float))
+        lon = np.radians(tiendas['Longitud_WGS84'].to_numpy(dtype=float))
+        self.x = R_MERCATOR * lon
+        self.y = R_MERCATOR * np.log(np.tan(np.pi / 4 + lat / 2))
+        # Escala de Mercator: 1 km en el terreno mide 1/cos(lat) km en el mapa.
+        self.escala = 1.0 / np.cos(lat)
+        tipo = tiendas['Tipo'].astype(str)
+        self.es_centro = tipo.str.contains("Centro", case=False).to_numpy()
+        self.es_tienda = tipo.str.contains("Tienda", case=False).to_numpy()
+        self.centros = np.flatnonzero(self.es_centro)
 
-def plot_rangos_rutas_nodos(tiendas_df, assignments, solutions, rings_upper, save_path=None):
-    """Mapa general con todos los centros, sus rangos, rutas y nodos."""
-    geometry = [Point(xy) for xy in zip(
-        tiendas_df['Longitud_WGS84'], tiendas_df['Latitud_WGS84'])]
-    gdf = gpd.GeoDataFrame(tiendas_df, geometry=geometry,
-                           crs="EPSG:4326").to_crs(epsg=3857)
+    def __len__(self):
+        return len(self.x)
 
-    centros = gdf[gdf['Tipo'].str.contains("Centro", case=False)]
-    tiendas = gdf[gdf['Tipo'].str.contains("Tienda", case=False)]
 
-    fig, ax = plt.subplots(figsize=(14, 14))
-    centros.plot(ax=ax, color="red", markersize=80,
-                 label="Centros", edgecolor="black")
-
-    colores = plt.cm.get_cmap("tab20", len(assignments))
-
-    for d, centro in centros.iterrows():
-        x, y = centro.geometry.x, centro.geometry.y
-        for r in rings_upper.get(int(d), []):
-            circ = plt.Circle((x, y), r * 1000, fill=False,
-                              linestyle="--", alpha=0.4, color="gray")
-            ax.add_patch(circ)
-
-    for idx_c, (d, nodes) in enumerate(assignments.items()):
-        color = colores(idx_c)
-        if nodes:
-            gdf.loc[nodes].plot(ax=ax, color=color, markersize=40, alpha=0.8,
-                                    label=f"Tiendas CD {d + 1}")
-
-        if d in solutions:
-            ruta = solutions[d]["route"]
-            coords = [(gdf.loc[i].geometry.x, gdf.loc[i].geometry.y)
-                      for i in ruta]
-            line = LineString(coords)
-            gpd.GeoSeries([line], crs="EPSG:3857").plot(
-                ax=ax, color=color, linewidth=2, alpha=0.7)
-
-    for idx, row in gdf.iterrows():
-        ax.text(row.geometry.x, row.geometry.y, str(idx + 1),
-                fontsize=7, color='black', ha='center', va='center')
-
-    cx.add_basemap(ax, source=cx.providers.OpenStreetMap.Mapnik)
-    ax.set_title("Centros con Rangos, Rutas y Nodos", fontsize=16)
-    ax.legend()
-    ax.set_axis_off()
+_ultimo = (None, None)
+
+
+def preparar_mapa(tiendas):
+    """
+    Proyección de `tiendas` (o el mismo MapaProyectado si ya lo es). Se
+    reutiliza mientras se pase el mismo DataFrame.
+    """
+    global _ultimo
+    if isinstance(tiendas, MapaProyectado):
+        return tiendas
+    df, mapa = _ultimo
+    if df is tiendas and len(mapa) == len(tiendas):
+        return mapa
+    mapa = MapaProyectado(tiendas)
+    _ultimo = (tiendas, mapa)
+    return mapa
+
+
+# === MAPA BASE CON CACHÉ DE TESELAS ===
+def descargar_teselas(xlim, ylim):
+    """Baja a la caché las teselas de una zona (para usarlas después sin red)."""
+    cx.set_cache_dir(CARPETA_TESELAS)
+    cx.bounds2img(xlim[0], ylim[0], xlim[1], ylim[1], zoom=ZOOM_TESELAS,
+                  source=FUENTE_TESELAS)
+
+
+def agregar_fondo(ax):
+    """Mapa base de OpenStreetMap bajo el área visible del eje."""
+    cx.set_cache_dir(CARPETA_TESELAS)
+    try:
+        cx.add_basemap(ax, source=FUENTE_TESELAS, zoom=ZOOM_TESELAS, attribution_size=6)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Sin teselas para esta zona ({type(e).__name__}); el mapa va sin fondo.")
 
+
+# === CAPAS ===
+def _encuadrar(ax, x, y, radios=None, margen=0.05):
+    """Límites del eje con margen, incluyendo los anillos si se dan."""
+    x0, x1, y0, y1 = x.min(), x.max(), y.min(), y.max()
+    if radios is not None and len(radios[0]):
+        cx_, cy_, r = radios
+        x0, x1 = min(x0, (cx_ - r).min()), max(x1, (cx_ + r).max())
+        y0, y1 = min(y0, (cy_ - r).min()), max(y1, (cy_ + r).max())
+    pad = max(x1 - x0, y1 - y0, 1000.0) * margen
+    ax.set_xlim(x0 - pad, x1 + pad)
+    ax.set_ylim(y0 - pad, y1 + pad)
+    ax.set_aspect("equal")
+
+
+@lru_cache(maxsize=None)
+def _digitos(tamano):
+    """
+    Marcadores de los dígitos 0-9 a `tamano` puntos, centrados en su celda,
+    con el avance entre dígitos y el tamaño de marcador que los deja a escala.
+    """
+    avance = (TextPath((0, 0), "88", size=tamano).get_extents().width
+              - TextPath((0, 0), "8", size=tamano).get_extents().width)
+    alto = TextPath((0, 0), "0", size=tamano).get_extents().height
+    radio = max(avance, alto)
+    marcas = {}
+    for d in "0123456789":
+        glifo = TextPath((0, 0), d, size=tamano).transformed(
+            Affine2D().translate(-avance / 2, -alto / 2))
+        # matplotlib escala cada marcador a su vértice más lejano; dos MOVETO
+        # en las esquinas del mismo cuadro dejan todos los dígitos a la misma escala.
+        marcas[d] = Path(np.concatenate((glifo.vertices, [[-radio, -radio], [radio, radio]])),
+                         np.concatenate((glifo.codes, [Path.MOVETO, Path.MOVETO])))
+    return marcas, avance, 2 * radio
+
+
+def _etiquetas(ax, mapa, nodos, tamano=TAMANO_ETIQUETA, color="black"):
+    """
+    Número (1-based) de cada nodo, centrado en su posición. Cada dígito se
+    dibuja como marcador: un artista por (dígito, posición en el número), así
+    miles de etiquetas cuestan unos pocos artistas en lugar de un Text cada una.
+    """
+    if len(nodos) > ETIQUETAS_MAX or not len(nodos):
+        return
+    marcas, avance, tamano_marca = _digitos(tamano)
+    textos = (np.asarray(nodos) + 1).astype(str)
+    largos = np.char.str_len(textos)
+    por_caracter = textos.view("U1").reshape(len(textos), -1)
+    x, y = mapa.x[nodos], mapa.y[nodos]
+    escala = ax.get_figure().dpi_scale_trans
+    for largo in np.unique(largos).tolist():
+        filas = largos == largo
+        for k in range(largo):
+            desplazado = ax.transData + ScaledTranslation(
+                (k - (largo - 1) / 2) * avance / 72, 0, escala)
+            caracteres = por_caracter[filas, k]
+            for d in np.unique(caracteres).tolist():
+                cuales = caracteres == d
+                ax.plot(x[filas][cuales], y[filas][cuales], linestyle="none",
+                        marker=marcas[d], markersize=tamano_marca, markeredgewidth=0,
+                        color=color, transform=desplazado, zorder=4)
+
+
+def _rutas(ax, mapa, solutions, centros, colores, **kw):
+    segmentos, lista_colores = [], []
+    for d in centros:
+        if d in solutions and len(solutions[d]["route"]) > 1:
+            ruta = np.asarray(solutions[d]["route"])
+            segmentos.append(np.column_stack((mapa.x[ruta], mapa.y[ruta])))
+            lista_colores.append(colores[d])
+    if segmentos:
+        ax.add_collection(LineCollection(segmentos, colors=lista_colores, **kw))
+
+
+def _anillos(rings_upper, mapa, centros):
+    """Centro (x, y) y radio en metros de Mercator de cada anillo."""
+    cx_, cy_, r = [], [], []
+    for d in centros:
+        if d >= len(mapa.centros):
+            continue
+        nodo = mapa.centros[d]
+        for radio in rings_upper.get(d, []):
+            cx_.append(mapa.x[nodo])
+            cy_.append(mapa.y[nodo])
+            r.append(radio * 1000 * mapa.escala[nodo])
+    return np.array(cx_), np.array(cy_), np.array(r)
+
+
+def _dibujar_anillos(ax, anillos, color):
+    cx_, cy_, r = anillos
+    if len(r):
+        ax.add_collection(EllipseCollection(
+            2 * r, 2 * r, np.zeros(len(r)), units="xy",
+            offsets=np.column_stack((cx_, cy_)), offset_transform=ax.transData,
+            facecolors="none", edgecolors=color, linestyles="--", alpha=0.4))
+
+
+def _terminar(fig, ax, titulo, save_path, dpi, fondo):
+    if fondo:
+        agregar_fondo(ax)
+    ax.set_title(titulo, fontsize=16)
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend()
+    ax.set_axis_off()
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+        plt.close(fig)
         print(f"🗺️ Mapa guardado en {save_path}")
     else:
         plt.show()
 
 
-def plot_single_center(tiendas_df, centro_id, assignments, solutions, rings_upper, save_path=None):
-    """Mapa individual de un centro con su rango, tiendas asignadas y ruta."""
-    geometry = [Point(xy) for xy in zip(
-        tiendas_df['Longitud_WGS84'], tiendas_df['Latitud_WGS84'])]
-    gdf = gpd.GeoDataFrame(tiendas_df, geometry=geometry,
-                           crs="EPSG:4326").to_crs(epsg=3857)
-
-    centros = gdf[gdf['Tipo'].str.contains("Centro", case=False)]
-    tiendas = gdf[gdf['Tipo'].str.contains("Tienda", case=False)]
+# === MAPAS ===
+def mostrar_mapa_simple(tiendas, save_path=None, dpi=300, fondo=True):
+    """Muestra un mapa simple con centros y tiendas (sin rutas)."""
+    mapa = preparar_mapa(tiendas)
 
     fig, ax = plt.subplots(figsize=(12, 12))
+    ax.scatter(mapa.x[mapa.es_tienda], mapa.y[mapa.es_tienda], s=40, color="royalblue",
+               alpha=0.8, label="Tiendas", zorder=2)
+    ax.scatter(mapa.x[mapa.es_centro], mapa.y[mapa.es_centro], s=60, color="red",
+               edgecolors="black", label="Centros", zorder=3)
+    _etiquetas(ax, mapa, np.arange(len(mapa)))
+    _encuadrar(ax, mapa.x, mapa.y)
+    _terminar(fig, ax, "Mapa simple de Centros y Tiendas", save_path, dpi, fondo)
+
+
+def plot_rangos_rutas_nodos(tiendas_df, assignments, solutions, rings_upper, save_path=None,
+                            dpi=300, fondo=True):
+    """Mapa general con todos los centros, sus rangos, rutas y nodos."""
+    mapa = preparar_mapa(tiendas_df)
+    centros = list(assignments)
+    cmap = plt.get_cmap("tab20", max(len(centros), 1))
+    colores = {d: cmap(k) for k, d in enumerate(centros)}
+
+    fig, ax = plt.subplots(figsize=(14, 14))
+    ax.scatter(mapa.x[mapa.centros], mapa.y[mapa.centros], s=80, color="red",
+               edgecolors="black", label="Centros", zorder=3)
+
+    anillos = _anillos(rings_upper, mapa, range(len(mapa.centros)))
+    _dibujar_anillos(ax, anillos, "gray")
+
+    # Todas las tiendas asignadas en una sola capa, coloreadas por centro.
+    nodos = [np.asarray(assignments[d], dtype=int) for d in centros]
+    todos = np.concatenate(nodos) if nodos else np.empty(0, dtype=int)
+    if len(todos):
+        color_nodo = np.concatenate([np.tile(colores[d], (len(n), 1)) for d, n in zip(centros, nodos)])
+        ax.scatter(mapa.x[todos], mapa.y[todos], s=40, c=color_nodo, alpha=0.8, zorder=2)
+    if len(centros) <= LEYENDA_MAX:
+        for d, n in zip(centros, nodos):
+            if len(n):
+                ax.scatter([], [], s=40, color=colores[d], label=f"Tiendas CD {d + 1}")
+
+    _rutas(ax, mapa, solutions, centros, colores, linewidths=2, alpha=0.7, zorder=1)
+    _etiquetas(ax, mapa, np.arange(len(mapa)))
+    _encuadrar(ax, mapa.x, mapa.y)
+    _terminar(fig, ax, "Centros con Rangos, Rutas y Nodos", save_path, dpi, fondo)
+
+
+def plot_single_center(tiendas_df, centro_id, assignments, solutions, rings_upper, save_path=None,
+                       dpi=300, fondo=True):
+    """Mapa individual de un centro con su rango, tiendas asignadas y ruta."""
+    mapa = preparar_mapa(tiendas_df)
     color = "orange"
 
-    if centro_id >= len(centros):
+    if centro_id >= len(mapa.centros):
         print(f"❌ Centro {centro_id + 1} no existe.")
         return
 
-    centro = centros.iloc[centro_id]
-    centros.iloc[[centro_id]].plot(
-        ax=ax, color="red", markersize=100, edgecolor="black", label="Centro seleccionado")
+    nodo = mapa.centros[centro_id]
+    fig, ax = plt.subplots(figsize=(12, 12))
+    ax.scatter([mapa.x[nodo]], [mapa.y[nodo]], s=100, color="red", edgecolors="black",
+               label="Centro seleccionado", zorder=3)
 
-    if centro_id in rings_upper:
-        x, y = centro.geometry.x, centro.geometry.y
-        for r in rings_upper[centro_id]:
-            circ = plt.Circle((x, y), r * 1000, fill=False,
-                              linestyle="--", alpha=0.4, color=color)
-            ax.add_patch(circ)
-            ax.text(x + r * 1000, y, f"{int(r)} km", fontsize=8, color=color)
+    anillos = _anillos(rings_upper, mapa, [centro_id])
+    _dibujar_anillos(ax, anillos, color)
+    for cx_, r, radio in zip(anillos[0], anillos[2], rings_upper.get(centro_id, [])):
+        ax.text(cx_ + r, mapa.y[nodo], f"{radio:g} km", fontsize=8, color=color)
 
-    if centro_id in assignments:
-        gdf.loc[assignments[centro_id]].plot(
-            ax=ax, color=color, markersize=40, alpha=0.8, label="Tiendas asignadas")
+    asignadas = np.asarray(assignments.get(centro_id, []), dtype=int)
+    if len(asignadas):
+        ax.scatter(mapa.x[asignadas], mapa.y[asignadas], s=40, color=color, alpha=0.8,
+                   label="Tiendas asignadas", zorder=2)
 
     if centro_id in solutions:
-        ruta = solutions[centro_id]["route"]
-        coords = [(gdf.loc[i].geometry.x, gdf.loc[i].geometry.y) for i in ruta]
-        line = LineString(coords)
-        gpd.GeoSeries([line], crs="EPSG:3857").plot(
-            ax=ax, color=color, linewidth=2, alpha=0.7, label="Ruta optimizada")
-
-    cx.add_basemap(ax, source=cx.providers.OpenStreetMap.Mapnik)
-    ax.set_title(
-        f"Centro {centro_id + 1} - Rango, Tiendas y Ruta", fontsize=16)
-    ax.legend()
-    ax.set_axis_off()
+        _rutas(ax, mapa, solutions, [centro_id], {centro_id: color},
+               linewidths=2, alpha=0.7, zorder=1)
+        ax.plot([], [], color=color, linewidth=2, label="Ruta optimizada")
 
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-        print(f"🗺️ Mapa guardado en {save_path}")
-    else:
-        plt.show()
+    visibles = np.append(asignadas, nodo)
+    _encuadrar(ax, mapa.x[visibles], mapa.y[visibles], anillos)
+    _terminar(fig, ax, f"Centro {centro_id + 1} - Rango, Tiendas y Ruta", save_path, dpi, fondo)
+
+
+# === LOTE EN PARALELO ===
+_lote = {}
+
+
+def _iniciar_lote(mapa, assignments, solutions, rings_upper):
+    matplotlib.use("Agg")
+    _lote.update(mapa=mapa, assignments=assignments, solutions=solutions,
+                 rings_upper=rings_upper)
+
+
+def _renderizar_centro(trabajo):
+    centro_id, ruta, dpi, fondo = trabajo
+    plot_single_center(_lote["mapa"], centro_id, _lote["assignments"], _lote["solutions"],
+                       _lote["rings_upper"], save_path=ruta, dpi=dpi, fondo=fondo)
+    return ruta
+
+
+def renderizar_centros(tiendas_df, assignments, solutions, rings_upper, carpeta,
+                       procesos=None, dpi=150, fondo=True):
+    """
+    Genera mapa_centro_<n>.png para todos los centros en paralelo.
+
+    La proyección se calcula una vez y se envía a cada proceso al iniciar, y
+    las teselas se bajan a la caché en este proceso antes de repartir el
+    trabajo (así los procesos no piden las mismas teselas a la vez).
+    """
+    mapa = preparar_mapa(tiendas_df)
+    os.makedirs(carpeta, exist_ok=True)
+    centros = [d for d in range(len(mapa.centros)) if d in assignments]
+
+    if fondo:
+        # Mismo encuadre que plot_single_center, para pedir exactamente las
+        # teselas que usará cada proceso.
+        for d in centros:
+            fig, ax = plt.subplots(figsize=(12, 12))
+            nodos = np.append(np.asarray(assignments[d], dtype=int), mapa.centros[d])
+            _encuadrar(ax, mapa.x[nodos], mapa.y[nodos], _anillos(rings_upper, mapa, [d]))
+            try:
+                descargar_teselas(ax.get_xlim(), ax.get_ylim())
+            except (OSError, ValueError):
+                pass  # sin red: cada mapa usa lo que haya en la caché
+            plt.close(fig)
+
+    trabajos = [(d, os.path.join(carpeta, f"mapa_centro_{d + 1}.png"), dpi, fondo)
+                for d in centros]
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_lote,
+                             initargs=(mapa, assignments, solutions, rings_upper)) as pool:
+        rutas = list(pool.map(_renderizar_centro, trabajos))
+    print(f"🗺️ {len(rutas)} mapas guardados en {carpeta}")
+    return rutas
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark y seguimiento de calidad del optimizador de rutas.
+
+Genera instancias sintéticas (ver Modulos/benchmark.py), las resuelve con
+semillas y presupuestos de tiempo fijos y agrega a un CSV el tiempo, la
+memoria pico, la distancia, el combustible y el objetivo de cada caso; las
+curvas de convergencia van a <salida>_curvas.csv. Con --referencia compara
+contra una corrida anterior y sale con código 1 si hay regresiones.
+
+Uso:
+    python benchmark.py --tamanos 10x100,20x2000 --semillas 1,2,3
+    python benchmark.py --tiempos 0.5,2 --referencia resultados_benchmark.csv
+    python benchmark.py --tamanos 20x4000 --reinicios 4 --procesos 1,2,4
+"""
+
+import argparse
+import sys
+
+from Modulos.benchmark import (DISTRIBUCIONES, TOLERANCIA_OBJETIVO, TOLERANCIA_TIEMPO,
+                               comparar, ejecutar_benchmark)
+from Modulos.solucion import SA_ITERS, SA_REINICIOS
+
+
+def _lista(texto, tipo=str):
+    return [tipo(v.strip()) for v in texto.split(",") if v.strip()]
+
+
+def _tiempo(texto):
+    return None if texto.lower() in ("none", "sin_limite", "") else float(texto)
+
+
+def _tamano(texto):
+    centros, tiendas = texto.lower().split("x")
+    return int(centros), int(tiendas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del optimizador de rutas")
+    parser.add_argument("--tamanos", default="10x90,10x1000",
+                        help="Centros x tiendas, separados por comas (p. ej. 10x90,20x2000)")
+    parser.add_argument("--distribuciones", default=",".join(DISTRIBUCIONES),
+                        help="uniforme, agrupada o ambas")
+    parser.add_argument("--semillas", default="1,2",
+                        help="Semillas de instancia y de recocido")
+    parser.add_argument("--tiempos", default="none",
+                        help="Segundos máximos por ruta ('none' = sin límite)")
+    parser.add_argument("--iteraciones", type=int, default=SA_ITERS,
+                        help="Iteraciones del recocido por ruta")
+    parser.add_argument("--reinicios", type=int, default=SA_REINICIOS)
+    parser.add_argument("--procesos", default="1",
+                        help="Procesos para las rutas, separados por comas (p. ej. 1,2,4)")
+    parser.add_argument("--salida", default="resultados_benchmark.csv",
+                        help="CSV donde se agregan los resultados")
+    parser.add_argument("--referencia", default=None,
+                        help="CSV de resultados anterior para detectar regresiones")
+    parser.add_argument("--corrida-referencia", default=None,
+                        help="Corrida de la referencia (por defecto, la última)")
+    parser.add_argument("--tol-objetivo", type=float, default=TOLERANCIA_OBJETIVO)
+    parser.add_argument("--tol-tiempo", type=float, default=TOLERANCIA_TIEMPO)
+    parser.add_argument("--sin-aislar", action="store_true",
+                        help="Corre todo en este proceso (la memoria pico se acumula)")
+    args = parser.parse_args()
+
+    # La referencia se lee antes de correr, por si es el mismo archivo de salida.
+    referencia = None
+    if args.referencia:
+        import pandas as pd
+        referencia = pd.read_csv(args.referencia)
+
+    casos = [
+        {"centros": centros, "tiendas": tiendas, "distribucion": distribucion,
+         "semilla": semilla, "tiempo_max": tiempo_max, "iteraciones": args.iteraciones,
+         "reinicios": args.reinicios, "procesos": procesos}
+        for centros, tiendas in _lista(args.tamanos, _tamano)
+        for distribucion in _lista(args.distribuciones)
+        for semilla in _lista(args.semillas, int)
+        for tiempo_max in _lista(args.tiempos, _tiempo)
+        for procesos in _lista(args.procesos, int)
+    ]
+    print(f"🔄 Ejecutando {len(casos)} casos...")
+    tabla = ejecutar_benchmark(casos, args.salida, aislar=not args.sin_aislar)
+    columnas = ["Caso", "Tiempo_s", "Memoria_pico_MB", "Distancia_total_km",
+                "Costo_combustible", "Valor_objetivo"]
+    print()
+    print(tabla[columnas].round(2).to_string(index=False))
+    print(f"\n📘 Resultados agregados a {args.salida}")
+
+    if referencia is None:
+        return 0
+    diferencias = comparar(tabla, referencia, corrida=args.corrida_referencia,
+                           tol_objetivo=args.tol_objetivo, tol_tiempo=args.tol_tiempo)
+    print("\n=== COMPARACIÓN CON LA REFERENCIA ===")
+    print(diferencias[["Caso", "Razon_Valor_objetivo", "Razon_Tiempo_s",
+                       "Razon_Memoria_pico_MB", "Regresion_calidad", "Regresion_tiempo"]]
+          .round(3).to_string(index=False))
+    regresiones = diferencias["Regresion_calidad"] | diferencias["Regresion_tiempo"]
+    if regresiones.any():
+        print(f"\n❌ {int(regresiones.sum())} casos con regresión")
+        return 1
+    print("\n✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecución por lotes de escenarios, sin menú interactivo (para pipelines).
+
+Lee un archivo de escenarios (JSON o CSV, ver Modulos/escenarios.py), corre
+calcular_solucion para cada uno en paralelo sobre los mismos datos y escribe
+una tabla comparativa con distancia total, costo de combustible, objetivo y
+tiempo por escenario. Sale con código 1 si algún escenario falló.
+
+Uso:
+    python ejecutar_escenarios.py escenarios.json --datos Datos --salida comparacion.csv
+    python ejecutar_escenarios.py escenarios.csv --procesos 8 --haversine
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from Modulos.data_loader import cargar_datos
+from Modulos.distancias import proveedores_haversine
+from Modulos.escenarios import ejecutar_escenarios, leer_escenarios
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecución por lotes de escenarios logísticos")
+    parser.add_argument("escenarios", help="Archivo .json o .csv con los escenarios")
+    parser.add_argument("--datos", default=os.path.join(AQUI, "Datos"),
+                        help="Carpeta con los Excel de entrada")
+    parser.add_argument("--salida", default="comparacion_escenarios.csv",
+                        help="Tabla comparativa (.csv o .xlsx)")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Escenarios en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument("--haversine", action="store_true",
+                        help="Distancias bajo demanda desde las coordenadas en lugar de D y C")
+    args = parser.parse_args()
+
+    escenarios = leer_escenarios(args.escenarios)
+    tiendas, D, C = cargar_datos(args.datos)
+    if args.haversine:
+        D, C = proveedores_haversine(tiendas)
+
+    print(f"🔄 Ejecutando {len(escenarios)} escenarios...")
+    inicio = time.perf_counter()
+    tabla = ejecutar_escenarios(tiendas, D, C, escenarios, procesos=args.procesos)
+    print(f"✅ Lote terminado en {time.perf_counter() - inicio:.1f} s\n")
+    print(tabla.round(2).to_string(index=False))
+
+    if args.salida.lower().endswith(".xlsx"):
+        tabla.to_excel(args.salida, index=False, sheet_name="Escenarios")
+    else:
+        tabla.to_csv(args.salida, index=False)
+    print(f"\n📘 Comparación guardada en {args.salida}")
+
+    return 1 if (tabla["Error"].fillna("") != "").any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,50 +3,23 @@
 MAIN interactivo para distribución logística.
 Opciones:
 1) Mapa sin rutas
-2) Calcular solución y generar Excel
+2) Calcular solución y exportar resultados
 3) Mapa con rangos y rutas optimizadas
 4) Mapa de un centro específico
+5) Mapas de todos los centros (en paralelo)
+6) Replanificar tras cambios en las tiendas (incremental)
 0) Salir
 """
 
 import os
-import pandas as pd
-from shapely.geometry import Point
-import geopandas as gpd
-import matplotlib.pyplot as plt
-import contextily as cx
 
 # Importar módulos del proyecto
+from Modulos.data_loader import cargar_datos
+from Modulos.exportacion import buscar_resultado
+from Modulos.incremental import detectar_cambios, leer_resultado, reparar_solucion
 from Modulos.solucion import calcular_solucion
-from Modulos.visualizacion import plot_rangos_rutas_nodos, plot_single_center
-
-
-# === FUNCIÓN DE MAPA SIMPLE ===
-def mostrar_mapa_simple(tiendas):
-    """Mapa simple de centros y tiendas con nodos (sin rutas)."""
-    geometry = [Point(xy) for xy in zip(
-        tiendas['Longitud_WGS84'], tiendas['Latitud_WGS84'])]
-    gdf = gpd.GeoDataFrame(tiendas, geometry=geometry, crs="EPSG:4326")
-    gdf_wm = gdf.to_crs(epsg=3857)
-
-    centros_wm = gdf_wm[gdf_wm['Tipo'].str.contains("Centro", case=False)]
-    tiendas_wm = gdf_wm[gdf_wm['Tipo'].str.contains("Tienda", case=False)]
-
-    fig, ax = plt.subplots(figsize=(12, 12))
-    tiendas_wm.plot(ax=ax, color="royalblue", markersize=40,
-                    alpha=0.8, label="Tiendas")
-    centros_wm.plot(ax=ax, color="red", markersize=60,
-                    edgecolor="black", label="Centros")
-
-    for idx, row in gdf_wm.iterrows():
-        ax.text(row.geometry.x, row.geometry.y, str(idx + 1),
-                fontsize=7, color='black', ha='center', va='center')
-
-    cx.add_basemap(ax, source=cx.providers.OpenStreetMap.Mapnik)
-    ax.set_title("Mapa simple de Centros y Tiendas", fontsize=16)
-    ax.legend()
-    ax.set_axis_off()
-    plt.show()
+from Modulos.visualizacion import (mostrar_mapa_simple, plot_rangos_rutas_nodos,
+                                   plot_single_center, renderizar_centros)
 
 
 # === BLOQUE PRINCIPAL ===
@@ -55,13 +28,8 @@ if __name__ == "__main__":
     # 🔹 Ruta base de los datos
     DATA_PATH = "/Users/omarbermejoosuna/Desktop/PP2TIA/Datos"
 
-    # 🔹 Cargar archivos base
-    tiendas = pd.read_excel(os.path.join(
-        DATA_PATH, "datos_distribucion_tiendas.xlsx"))
-    D = pd.read_excel(os.path.join(
-        DATA_PATH, "matriz_distancias.xlsx")).values.astype(float)
-    C = pd.read_excel(os.path.join(
-        DATA_PATH, "matriz_costos_combustible.xlsx")).values.astype(float)
+    # 🔹 Cargar archivos base (desde la caché binaria si está al día)
+    tiendas, D, C = cargar_datos(DATA_PATH)
 
     assignments = solutions = rings_upper = None
 
@@ -69,9 +37,11 @@ if __name__ == "__main__":
     while True:
         print("\n=== MENÚ ===")
         print("1) Mapa simple (sin rutas)")
-        print("2) Calcular solución y generar Excel")
+        print("2) Calcular solución y exportar resultados")
         print("3) Mapa con rangos y rutas (todos los centros)")
         print("4) Mapa de un centro específico")
+        print("5) Mapas de todos los centros (en paralelo)")
+        print("6) Replanificar tras cambios en las tiendas")
         print("0) Salir")
 
         opcion = input("Elige una opción: ")
@@ -114,6 +84,37 @@ if __name__ == "__main__":
                 except ValueError:
                     print("❌ Ingresa un número válido.")
 
+        elif opcion == "5":
+            if assignments is None:
+                print("⚠️ Primero calcula la solución con opción 2.")
+            else:
+                renderizar_centros(
+                    tiendas, assignments, solutions, rings_upper,
+                    carpeta=os.path.join(DATA_PATH, "mapas_centros"))
+
+        elif opcion == "6":
+            # La solución de esta sesión corresponde a `tiendas`; una guardada,
+            # a la tabla de tiendas que se exportó con ella. En ambos casos se
+            # compara contra los Excel de datos recargados.
+            if assignments is not None:
+                anterior, tiendas_anteriores = (assignments, solutions, rings_upper), tiendas
+            else:
+                guardado = buscar_resultado(DATA_PATH)
+                anterior = None if guardado is None else leer_resultado(guardado)
+                tiendas_anteriores = None if anterior is None else anterior["tiendas"]
+            if anterior is None:
+                print("⚠️ Primero calcula la solución con opción 2.")
+            elif tiendas_anteriores is None:
+                print("⚠️ El resultado guardado no incluye la tabla de tiendas; "
+                      "recalcula la solución con opción 2.")
+            else:
+                tiendas_nuevas, D, C = cargar_datos(DATA_PATH)
+                cambios = detectar_cambios(tiendas_anteriores, tiendas_nuevas)
+                assignments, solutions, rings_upper = reparar_solucion(
+                    tiendas_nuevas, D, C, anterior, cambios, data_path=DATA_PATH
+                )
+                tiendas = tiendas_nuevas
+
         elif opcion == "0":
             print("👋 Saliendo del programa...")
             break
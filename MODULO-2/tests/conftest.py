@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Modulos.benchmark import generar_instancia  # noqa: E402
+
+
+@pytest.fixture
+def instancia():
+    """(tiendas, D, C) densos: 4 centros y 60 tiendas agrupadas."""
+    return generar_instancia(4, 60, "agrupada", semilla=7, densa=True)
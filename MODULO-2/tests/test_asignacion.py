@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from Modulos.asignacion import (COL_LATITUD, COL_LONGITUD, R_TIERRA_KM, agrupar_por_centro,
+                                asignar_tiendas, indices_por_tipo, rangos_por_centro)
+from Modulos.benchmark import generar_instancia
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * R_TIERRA_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def datos():
+    tiendas, D, C = generar_instancia(6, 300, "uniforme", semilla=12, densa=True)
+    centros, nodos = indices_por_tipo(tiendas)
+    return tiendas, 0.4 * D + 0.6 * C, centros, nodos
+
+
+def _km(tiendas, nodos, centros, asignado):
+    lat, lon = tiendas[COL_LATITUD].to_numpy(), tiendas[COL_LONGITUD].to_numpy()
+    c = centros[asignado]
+    return _haversine(lat[nodos], lon[nodos], lat[c], lon[c])
+
+
+def test_each_store_goes_to_its_cheapest_center(datos):
+    tiendas, M, centros, nodos = datos
+    asignado, km = asignar_tiendas(tiendas, centros, nodos, M=M)
+    np.testing.assert_array_equal(asignado, np.argmin(M[np.ix_(nodos, centros)], axis=1))
+    np.testing.assert_allclose(km, _km(tiendas, nodos, centros, asignado), rtol=1e-9)
+
+
+def test_without_cost_matrix_the_nearest_center_wins(datos):
+    tiendas, _, centros, nodos = datos
+    asignado, km = asignar_tiendas(tiendas, centros, nodos)
+    lat, lon = tiendas[COL_LATITUD].to_numpy(), tiendas[COL_LONGITUD].to_numpy()
+    todas = _haversine(lat[nodos, None], lon[nodos, None], lat[centros], lon[centros])
+    np.testing.assert_array_equal(asignado, np.argmin(todas, axis=1))
+    np.testing.assert_allclose(km, todas.min(axis=1), rtol=1e-9)
+
+
+def test_coverage_radius(datos):
+    tiendas, M, centros, nodos = datos
+    asignado, km = asignar_tiendas(tiendas, centros, nodos, M=M, radio_km=4.0)
+    cubiertas = asignado >= 0
+    assert 0 < cubiertas.sum() < len(nodos)
+    assert np.all(km[cubiertas] <= 4.0 + 1e-9)
+    assert np.all(np.isnan(km[~cubiertas]))
+    lat, lon = tiendas[COL_LATITUD].to_numpy(), tiendas[COL_LONGITUD].to_numpy()
+    lejanas = nodos[~cubiertas]
+    todas = _haversine(lat[lejanas, None], lon[lejanas, None], lat[centros], lon[centros])
+    assert np.all(todas > 4.0)
+
+
+@pytest.mark.parametrize("capacidad", [50, [80, 40, 60, 70, 30, 20]])
+def test_capacity_is_respected(datos, capacidad):
+    tiendas, M, centros, nodos = datos
+    demanda = np.random.default_rng(0).integers(1, 3, len(nodos)).astype(float)
+    asignado, _ = asignar_tiendas(tiendas, centros, nodos, M=M, capacidad=capacidad,
+                                  demanda=demanda)
+    carga = np.bincount(asignado[asignado >= 0], weights=demanda[asignado >= 0],
+                        minlength=len(centros))
+    assert np.all(carga <= np.broadcast_to(capacidad, len(centros)))
+
+
+def test_enough_capacity_serves_everyone(datos):
+    tiendas, M, centros, nodos = datos
+    asignado, _ = asignar_tiendas(tiendas, centros, nodos, M=M, capacidad=60,
+                                  vecinos=len(centros))
+    assert np.all(asignado >= 0)
+    assert np.bincount(asignado).max() <= 60
+
+
+def test_negative_capacity_is_rejected(datos):
+    tiendas, M, centros, nodos = datos
+    with pytest.raises(ValueError, match="capacidad"):
+        asignar_tiendas(tiendas, centros, nodos, M=M, capacidad=-1)
+
+
+def _tiendas_en_linea(n_centros, n_tiendas=1):
+    import pandas as pd
+    # Centros cada 0.1 km hacia el norte de las tiendas, en orden de distancia.
+    lat = np.concatenate([24.8 + 0.0009 * (1 + np.arange(n_centros)), np.full(n_tiendas, 24.8)])
+    return pd.DataFrame({"Tipo": ["Centro"] * n_centros + ["Tienda"] * n_tiendas,
+                         COL_LATITUD: lat, COL_LONGITUD: np.full(len(lat), -107.4)})
+
+
+def test_full_nearest_centers_fall_back_to_the_rest_of_the_radius():
+    tiendas = _tiendas_en_linea(24, n_tiendas=3)
+    centros, nodos = indices_por_tipo(tiendas)
+    capacidad = np.r_[np.zeros(16), [0, 1, 1, 1, 1, 1, 1, 1]]
+
+    asignado, km = asignar_tiendas(tiendas, centros, nodos, radio_km=5.0, capacidad=capacidad)
+    np.testing.assert_array_equal(np.sort(asignado), [17, 18, 19])
+    np.testing.assert_allclose(np.sort(km), _km(tiendas, nodos, centros, np.sort(asignado)),
+                               rtol=1e-9)
+
+    # Fuera del radio no se busca.
+    asignado, _ = asignar_tiendas(tiendas, centros, nodos, radio_km=1.75, capacidad=capacidad)
+    assert np.all(asignado == -1)
+
+    # Con costo: entre los centros restantes gana el más barato, no el más cercano.
+    n = len(tiendas)
+    M = np.ones((n, n))
+    M[nodos[:, None], centros[23]] = 0.5
+    asignado, _ = asignar_tiendas(tiendas, centros, nodos, M=M, capacidad=capacidad,
+                                  vecinos=4)
+    assert 23 in asignado.tolist()
+
+
+def test_all_centers_as_candidates():
+    tiendas = _tiendas_en_linea(20)
+    centros, nodos = indices_por_tipo(tiendas)
+    n = len(tiendas)
+    M = np.ones((n, n))
+    M[nodos[0], centros[19]] = 0.5
+    assert asignar_tiendas(tiendas, centros, nodos, M=M)[0][0] != 19
+    assert asignar_tiendas(tiendas, centros, nodos, M=M, vecinos=None)[0][0] == 19
+
+
+def test_groups_and_rings():
+    asignado = np.array([1, 0, 1, -1, 1])
+    nodos = np.array([10, 11, 12, 13, 14])
+    assert agrupar_por_centro(asignado, nodos, 3) == {0: [11], 1: [10, 12, 14], 2: []}
+
+    km = np.array([1.0, 2.04, 3.0, np.nan, 5.0])
+    rangos = rangos_por_centro(asignado, km, 3)
+    assert rangos == {0: [2.1], 1: [3.0, 4.2, 5.0], 2: []}
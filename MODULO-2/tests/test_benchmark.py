@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Modulos.benchmark import (comparar, ejecutar_benchmark, ejecutar_caso, generar_instancia,
+                               nombre_caso, ruta_curvas)
+from Modulos.distancias import LIMITE_DENSO, es_perezosa
+
+CASO = {"centros": 3, "tiendas": 40, "distribucion": "uniforme", "semilla": 1,
+        "tiempo_max": None, "iteraciones": 1500, "reinicios": 1}
+
+
+@pytest.mark.parametrize("distribucion", ["uniforme", "agrupada"])
+def test_instances_are_reproducible(distribucion):
+    a, D, C = generar_instancia(3, 50, distribucion, semilla=5)
+    b, _, _ = generar_instancia(3, 50, distribucion, semilla=5)
+    pd.testing.assert_frame_equal(a, b)
+    assert a["Tipo"].tolist()[:4] == ["Centro de Distribución"] * 3 + ["Tienda"]
+    assert D.shape == C.shape == (53, 53)
+    np.testing.assert_allclose(C, 0.15 * D)
+    with pytest.raises(ValueError, match="Distribución"):
+        generar_instancia(1, 5, "anillo")
+
+
+def test_large_instances_use_lazy_providers():
+    _, D, _ = generar_instancia(2, LIMITE_DENSO, semilla=0)
+    assert es_perezosa(D)
+
+
+def test_case_row_and_curves():
+    fila, curvas = ejecutar_caso(CASO)
+    assert fila["Caso"] == nombre_caso(CASO) == "3x40-uniforme-s1-sin_limite"
+    assert fila["Tiendas_sin_centro"] == 0
+    assert fila["Valor_objetivo"] == pytest.approx(
+        0.4 * fila["Distancia_total_km"] + 0.6 * fila["Costo_combustible"])
+    assert {c for c, *_ in curvas} == {0, 1, 2}
+    otra, _ = ejecutar_caso(CASO)
+    assert otra["Valor_objetivo"] == fila["Valor_objetivo"]
+
+
+def test_results_are_appended(tmp_path):
+    salida = str(tmp_path / "resultados.csv")
+    ejecutar_benchmark([CASO], salida, aislar=False)
+    ejecutar_benchmark([CASO, dict(CASO, semilla=2)], salida, aislar=False)
+    tabla = pd.read_csv(salida)
+    assert len(tabla) == 3
+    assert tabla["Caso"].tolist()[1:] == ["3x40-uniforme-s1-sin_limite",
+                                          "3x40-uniforme-s2-sin_limite"]
+    curvas = pd.read_csv(ruta_curvas(salida))
+    assert set(curvas["Caso"]) == set(tabla["Caso"])
+    assert ruta_curvas("salida") == "salida_curvas.csv"
+
+
+def test_regressions_are_flagged():
+    referencia = pd.DataFrame({
+        "Corrida": ["1", "1", "2", "2"], "Caso": ["a", "b", "a", "b"],
+        "Valor_objetivo": [50.0, 50.0, 100.0, 100.0], "Tiempo_s": [1.0, 1.0, 1.0, 1.0],
+        "Memoria_pico_MB": [10.0] * 4,
+    })
+    actual = pd.DataFrame({"Caso": ["a", "b"], "Valor_objetivo": [100.5, 102.0],
+                           "Tiempo_s": [1.5, 1.1], "Memoria_pico_MB": [10.0, 20.0]})
+    tabla = comparar(actual, referencia).set_index("Caso")
+    assert tabla["Regresion_calidad"].tolist() == [False, True]
+    assert tabla["Regresion_tiempo"].tolist() == [True, False]
+    assert tabla.loc["b", "Razon_Memoria_pico_MB"] == 2.0
+
+    contra_primera = comparar(actual, referencia, corrida="1")
+    assert contra_primera["Regresion_calidad"].all()
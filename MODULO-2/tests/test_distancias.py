@@ -0,0 +1,113 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from Modulos import distancias
+from Modulos.benchmark import generar_instancia
+from Modulos.distancias import (COSTO_KM, MatrizCombinada, combinar, es_perezosa,
+                                proveedores_haversine)
+from Modulos.recocido import (costo_combinado, costo_ruta, listas_vecinos, matriz_costo,
+                              recocido_ruta)
+
+
+@pytest.fixture
+def proveedores():
+    tiendas, D, C = generar_instancia(3, 200, "uniforme", semilla=21, densa=False)
+    return tiendas, D, C, np.asarray(D)
+
+
+def test_indexing_matches_the_dense_matrix(proveedores):
+    _, D, _, densa = proveedores
+    rng = np.random.default_rng(0)
+    i, j = rng.integers(0, len(D), 50), rng.integers(0, len(D), 50)
+
+    assert es_perezosa(D) and not es_perezosa(densa)
+    assert D[5, 17] == pytest.approx(densa[5, 17])
+    np.testing.assert_allclose(D[7], densa[7])
+    np.testing.assert_allclose(D[7, 3:9], densa[7, 3:9])
+    np.testing.assert_allclose(D[i, j], densa[i, j])
+    np.testing.assert_allclose(D[np.ix_(i, j)], densa[np.ix_(i, j)])
+    np.testing.assert_allclose(D.bloque(i[:5], j[:4]), densa[np.ix_(i[:5], j[:4])])
+    np.testing.assert_allclose(densa, densa.T)
+    assert np.all(np.diag(densa) == 0)
+
+
+def test_blocked_computation_and_row_cache(proveedores, monkeypatch):
+    _, D, _, densa = proveedores
+    monkeypatch.setattr(distancias, "ELEMENTOS_BLOQUE", 1000)
+    np.testing.assert_allclose(D.bloque(), densa)
+
+    D.filas_cache = 2
+    for i in (1, 2, 1, 3):
+        D.fila(i)
+    assert list(D._filas) == [1, 3]
+    assert D.fila(1) is D.fila(1)
+
+
+def test_cost_and_combination_share_the_geometry(proveedores):
+    _, D, C, densa = proveedores
+    np.testing.assert_allclose(np.asarray(C), COSTO_KM * densa)
+    M = combinar(D, C, 0.4)
+    assert M.coordenadas is D.coordenadas
+    np.testing.assert_allclose(np.asarray(M), (0.4 + 0.6 * COSTO_KM) * densa)
+
+    mezcla = combinar(D, np.asarray(C), 0.4)
+    assert isinstance(mezcla, MatrizCombinada)
+    np.testing.assert_allclose(np.asarray(mezcla), np.asarray(M))
+
+
+def test_submatrix_neighbours_and_pickle(proveedores):
+    _, D, _, densa = proveedores
+    nodos = np.array([0, 10, 20, 30, 40, 50])
+    sub = D.sub(nodos)
+    np.testing.assert_allclose(np.asarray(sub), densa[np.ix_(nodos, nodos)])
+
+    vecinos = D.vecinos(5)
+    sin_diagonal = densa + np.diag(np.full(len(densa), np.inf))
+    esperados = np.sort(np.argsort(sin_diagonal, axis=1)[:, :5], axis=1)
+    np.testing.assert_array_equal(np.sort(vecinos, axis=1), esperados)
+
+    copia = pickle.loads(pickle.dumps(sub))
+    assert copia._filas == {}
+    np.testing.assert_allclose(np.asarray(copia), np.asarray(sub))
+
+
+def test_annealing_on_lazy_and_dense_costs_agree(proveedores):
+    tiendas, D, C, _ = proveedores
+    nodos = np.arange(0, 120)
+    perezosa = matriz_costo(D, C, 0.4).sub(nodos)
+    densa = np.asarray(perezosa)
+    ruta_p, costo_p = recocido_ruta(perezosa, iteraciones=4000, semilla=3)
+    ruta_d, costo_d = recocido_ruta(densa, iteraciones=4000, semilla=3)
+    assert ruta_p == ruta_d
+    assert costo_p == pytest.approx(costo_d)
+    assert costo_p == pytest.approx(costo_ruta(densa, ruta_p))
+
+
+def test_dense_combination_neighbours_and_annealing(monkeypatch):
+    rng = np.random.default_rng(4)
+    D = rng.random((90, 90)).astype(np.float32)
+    C = rng.random((90, 90)).astype(np.float32)
+    M = costo_combinado(D, C, 0.3)
+    densa = 0.3 * D.astype(float) + 0.7 * C.astype(float)
+    assert isinstance(M, MatrizCombinada) and es_perezosa(M)
+
+    # Bloques de pocas filas para recorrer también el último bloque parcial.
+    monkeypatch.setattr(distancias, "ELEMENTOS_BLOQUE", 90 * 7)
+    sin_diagonal = densa + np.diag(np.full(len(densa), np.inf))
+    esperados = np.sort(np.argsort(sin_diagonal, axis=1)[:, :6], axis=1)
+    np.testing.assert_array_equal(np.sort(listas_vecinos(M, 6), axis=1), esperados)
+    np.testing.assert_array_equal(np.sort(listas_vecinos(densa, 6), axis=1), esperados)
+
+    ruta_m, costo_m = recocido_ruta(M, iteraciones=3000, semilla=5, vecinos=6)
+    ruta_d, costo_d = recocido_ruta(densa, iteraciones=3000, semilla=5, vecinos=6)
+    assert ruta_m == ruta_d
+    assert costo_m == pytest.approx(costo_d)
+
+
+def test_providers_from_a_store_table(proveedores):
+    tiendas, _, _, densa = proveedores
+    D, C = proveedores_haversine(tiendas, costo_km=2.0, factor_circuito=1.3)
+    np.testing.assert_allclose(np.asarray(D), 1.3 * densa)
+    np.testing.assert_allclose(np.asarray(C), 2.6 * densa)
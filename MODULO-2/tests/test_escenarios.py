@@ -0,0 +1,81 @@
+import json
+
+import pandas as pd
+import pytest
+
+from Modulos.escenarios import ejecutar_escenario, ejecutar_escenarios, leer_escenarios
+from Modulos.solucion import calcular_solucion
+
+ESCENARIOS = [
+    {"nombre": "base"},
+    {"nombre": "combustible", "factor_combustible": 1.5},
+    {"nombre": "cerrados", "centros_cerrados": [2, 3]},
+    {"nombre": "cobertura", "radio_km": 0.3},
+    {"nombre": "inexistente", "centros_cerrados": [9]},
+]
+
+
+def _lote(tmp_path):
+    ruta = tmp_path / "escenarios.json"
+    ruta.write_text(json.dumps({"base": {"iteraciones": 2000, "semilla": 4},
+                                "escenarios": ESCENARIOS}), encoding="utf-8")
+    return leer_escenarios(str(ruta))
+
+
+def test_json_base_values_are_merged(tmp_path):
+    escenarios = _lote(tmp_path)
+    assert [e["nombre"] for e in escenarios] == [e["nombre"] for e in ESCENARIOS]
+    assert all(e["iteraciones"] == 2000 and e["semilla"] == 4 for e in escenarios)
+    assert escenarios[2]["centros_cerrados"] == [2, 3]
+
+
+def test_csv_rows_with_empty_cells(tmp_path):
+    ruta = tmp_path / "escenarios.csv"
+    ruta.write_text("nombre,alpha,iteraciones,centros_cerrados\n"
+                    "a,,1000,\n"
+                    ",0.8,,4;1\n", encoding="utf-8")
+    a, b = leer_escenarios(str(ruta))
+    assert a == {"nombre": "a", "iteraciones": 1000, "centros_cerrados": []}
+    assert b == {"nombre": "escenario_2", "alpha": 0.8, "centros_cerrados": [1, 4]}
+
+
+@pytest.mark.parametrize("contenido, mensaje", [
+    ([{"nombre": "x"}, {"nombre": "x"}], "únicos"),
+    ([{"nombre": "x", "alfa": 1}], "claves desconocidas"),
+])
+def test_invalid_batches_are_rejected(tmp_path, contenido, mensaje):
+    ruta = tmp_path / "malo.json"
+    ruta.write_text(json.dumps(contenido), encoding="utf-8")
+    with pytest.raises(ValueError, match=mensaje):
+        leer_escenarios(str(ruta))
+
+
+def test_scenarios_change_what_they_should(instancia, tmp_path):
+    tiendas, D, C = instancia
+    tabla = ejecutar_escenarios(tiendas, D, C, _lote(tmp_path), procesos=1).set_index("Escenario")
+
+    base = tabla.loc["base"]
+    assert base["Centros_activos"] == 4 and base["Tiendas_sin_centro"] == 0
+    assert tabla.loc["combustible", "Valor_objetivo"] > base["Valor_objetivo"]
+    assert tabla.loc["cerrados", "Centros_activos"] == 2
+    assert tabla.loc["cerrados", "Tiendas_atendidas"] == 60
+    assert tabla.loc["cobertura", "Tiendas_sin_centro"] > 0
+    assert "Centros inexistentes" in tabla.loc["inexistente", "Error"]
+    assert (tabla.drop(index="inexistente")["Error"] == "").all()
+
+
+def test_parallel_batch_matches_serial(instancia, tmp_path):
+    tiendas, D, C = instancia
+    escenarios = _lote(tmp_path)
+    serie = ejecutar_escenarios(tiendas, D, C, escenarios, procesos=1)
+    paralelo = ejecutar_escenarios(tiendas, D, C, escenarios, procesos=3)
+    pd.testing.assert_frame_equal(serie.drop(columns="Tiempo_s"),
+                                  paralelo.drop(columns="Tiempo_s"))
+
+
+def test_base_scenario_equals_a_direct_run(instancia):
+    tiendas, D, C = instancia
+    fila = ejecutar_escenario(tiendas, D, C, {"nombre": "base", "iteraciones": 2000,
+                                              "semilla": 4, "centros_cerrados": []})
+    _, solutions, _ = calcular_solucion(tiendas, D, C, iteraciones=2000, semilla=4, procesos=1)
+    assert fila["Valor_objetivo"] == pytest.approx(sum(s["objetivo"] for s in solutions.values()))
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Modulos import exportacion
+from Modulos.exportacion import (LIMITE_FILAS_EXCEL_AUTO, buscar_resultado, exportar_solucion,
+                                 formatos_automaticos, leer_tablas, tablas_solucion)
+from Modulos.solucion import calcular_solucion
+
+FORMATOS = ["csv", "npz", "excel", "parquet"]
+
+
+@pytest.fixture
+def solucion(instancia):
+    tiendas, D, C = instancia
+    return (tiendas, *calcular_solucion(tiendas, D, C, iteraciones=2000, procesos=1))
+
+
+def _esperadas(tiendas, assignments, solutions, rings_upper):
+    """Las mismas tablas armadas fila por fila."""
+    asignaciones = [(c + 1, t + 1, tiendas["Nombre"].iloc[t])
+                    for c in sorted(assignments) for t in assignments[c]]
+    rutas = [(c + 1, k + 1, n + 1) for c in sorted(solutions)
+             for k, n in enumerate(solutions[c]["route"])]
+    rangos = [(c + 1, r) for c in sorted(rings_upper) for r in rings_upper[c]]
+    return {
+        "Asignaciones": pd.DataFrame(asignaciones,
+                                     columns=["Centro_ID", "Tienda_ID", "Nombre_Tienda"]),
+        "Rutas": pd.DataFrame(rutas, columns=["Centro_ID", "Orden", "Nodo_ID"]),
+        "Rangos": pd.DataFrame(rangos, columns=["Centro_ID", "Rango_km"]),
+        "Tiendas": tiendas.assign(Fila=np.arange(1, len(tiendas) + 1))[
+            ["Fila", "Nombre", "Tipo", "Latitud_WGS84", "Longitud_WGS84"]],
+    }
+
+
+def _comparar(obtenidas, esperadas):
+    assert set(obtenidas) == set(esperadas)
+    for nombre, esperada in esperadas.items():
+        obtenida = pd.DataFrame(obtenidas[nombre]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(obtenida, esperada.reset_index(drop=True),
+                                      check_dtype=False)
+
+
+def test_tables_match_row_by_row_construction(solucion):
+    _comparar(tablas_solucion(*solucion), _esperadas(*solucion))
+
+
+@pytest.mark.parametrize("formato", FORMATOS)
+@pytest.mark.parametrize("filas_bloque", [7, exportacion.FILAS_BLOQUE])
+def test_round_trip(solucion, tmp_path, formato, filas_bloque):
+    if formato == "parquet":
+        pytest.importorskip("pyarrow")
+    rutas = exportar_solucion(*solucion, str(tmp_path), formatos=formato,
+                              filas_bloque=filas_bloque)
+    assert all(os.path.exists(r) for r in rutas)
+    _comparar(leer_tablas(buscar_resultado(str(tmp_path))), _esperadas(*solucion))
+
+
+def test_parquet_schema_covers_blocks_without_text(solucion, tmp_path):
+    pytest.importorskip("pyarrow")
+    tiendas, assignments, solutions, rings_upper = solucion
+    # Los primeros bloques de 7 filas de la columna Nombre quedan sin valores.
+    tiendas = tiendas.assign(Nombre=[None] * 14 + tiendas["Nombre"].iloc[14:].tolist())
+    exportar_solucion(tiendas, assignments, solutions, rings_upper, str(tmp_path),
+                      formatos="parquet", filas_bloque=7)
+    leidas = leer_tablas(buscar_resultado(str(tmp_path)))["Tiendas"]
+    assert leidas["Nombre"].iloc[:14].isna().all()
+    assert leidas["Nombre"].iloc[14:].tolist() == tiendas["Nombre"].iloc[14:].tolist()
+
+
+def test_several_formats_at_once(solucion, tmp_path):
+    rutas = exportar_solucion(*solucion, str(tmp_path), formatos="csv, npz")
+    assert len(rutas) == 5
+    assert {os.path.basename(r) for r in rutas} >= {"Rutas.csv", "resultado_solucion.npz"}
+
+
+def test_unknown_format_is_rejected(solucion, tmp_path):
+    with pytest.raises(ValueError, match="Formatos no válidos"):
+        exportar_solucion(*solucion, str(tmp_path), formatos="excel,xml")
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_write_leaves_no_partial_file(solucion, tmp_path, monkeypatch):
+    monkeypatch.setattr(exportacion, "LIMITE_FILAS_EXCEL", 10)
+    with pytest.raises(ValueError, match="no cabe en una hoja"):
+        exportar_solucion(*solucion, str(tmp_path), formatos="excel")
+    assert buscar_resultado(str(tmp_path)) is None
+
+
+def test_automatic_formats():
+    assert formatos_automaticos(LIMITE_FILAS_EXCEL_AUTO) == ["excel"]
+    esperado = ["parquet"]
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        esperado = ["csv"]
+    assert formatos_automaticos(LIMITE_FILAS_EXCEL_AUTO + 1) == esperado
+
+
+def test_latest_result_is_found(solucion, tmp_path):
+    exportar_solucion(*solucion, str(tmp_path), formatos="csv")
+    npz = exportar_solucion(*solucion, str(tmp_path), formatos="npz")[0]
+    os.utime(npz, (os.path.getmtime(npz) + 10,) * 2)
+    assert buscar_resultado(str(tmp_path)) == npz
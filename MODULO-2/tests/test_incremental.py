@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Modulos.asignacion import COL_LATITUD, COL_LONGITUD
+from Modulos.distancias import proveedores_haversine
+from Modulos.exportacion import buscar_resultado
+from Modulos.incremental import (detectar_cambios, leer_resultado, leer_solucion,
+                                 reparar_solucion)
+from Modulos.solucion import calcular_solucion
+
+KW = {"semilla": 2, "procesos": 1}
+
+
+def _datos(tiendas):
+    D, C = proveedores_haversine(tiendas)
+    return tiendas, np.asarray(D), np.asarray(C)
+
+
+def _editar(tiendas):
+    """Inserta una tienda a media tabla, quita 'Tienda 5' y mueve 'Tienda 10'."""
+    nueva = tiendas[tiendas["Nombre"] != "Tienda 5"].reset_index(drop=True)
+    fila = nueva.iloc[[30]].assign(Nombre="Tienda nueva")
+    fila[COL_LATITUD] += 0.004
+    nueva = pd.concat([nueva.iloc[:30], fila, nueva.iloc[30:]], ignore_index=True)
+    nueva.loc[nueva["Nombre"] == "Tienda 10", COL_LATITUD] += 0.01
+    return nueva
+
+
+def _nombres(tiendas, filas):
+    return tiendas["Nombre"].to_numpy()[np.asarray(filas, dtype=np.int64)].tolist()
+
+
+@pytest.fixture
+def resuelta(instancia, tmp_path):
+    tiendas, D, C = instancia
+    solucion = calcular_solucion(tiendas, D, C, data_path=str(tmp_path), formatos="csv",
+                                 iteraciones=3000, **KW)
+    return tiendas, solucion, buscar_resultado(str(tmp_path))
+
+
+@pytest.mark.parametrize("formato", ["csv", "npz", "excel"])
+def test_saved_result_keeps_the_store_table(instancia, tmp_path, formato):
+    tiendas, D, C = instancia
+    solucion = calcular_solucion(tiendas, D, C, data_path=str(tmp_path), formatos=formato,
+                                 iteraciones=3000, **KW)
+    resultado = leer_resultado(buscar_resultado(str(tmp_path)))
+
+    guardadas = resultado["tiendas"]
+    assert guardadas["Nombre"].tolist() == tiendas["Nombre"].tolist()
+    assert guardadas["Tipo"].tolist() == tiendas["Tipo"].tolist()
+    np.testing.assert_allclose(guardadas[COL_LATITUD], tiendas[COL_LATITUD])
+    np.testing.assert_allclose(guardadas[COL_LONGITUD], tiendas[COL_LONGITUD])
+    assert resultado["assignments"] == solucion[0]
+    assert {c: s["route"] for c, s in resultado["solutions"].items()} == {
+        c: s["route"] for c, s in solucion[1].items()}
+
+
+def test_changes_are_matched_by_store_name_not_row(resuelta):
+    tiendas, _, guardado = resuelta
+    nueva = _editar(tiendas)
+    cambios = detectar_cambios(leer_resultado(guardado)["tiendas"], nueva)
+
+    assert _nombres(nueva, cambios["agregadas"]) == ["Tienda nueva"]
+    assert _nombres(tiendas, cambios["eliminadas"]) == ["Tienda 5"]
+    assert _nombres(nueva, cambios["movidas"]) == ["Tienda 10"]
+
+
+@pytest.mark.parametrize("desde_archivo", [True, False])
+def test_repair_serves_every_store_and_keeps_untouched_routes(resuelta, desde_archivo):
+    tiendas, solucion, guardado = resuelta
+    nueva, D, C = _datos(_editar(tiendas))
+    if desde_archivo:
+        resultado = leer_resultado(guardado)
+        anterior, tiendas_anteriores = resultado, resultado["tiendas"]
+    else:
+        anterior, tiendas_anteriores = solucion, tiendas
+    cambios = detectar_cambios(tiendas_anteriores, nueva)
+    assignments, solutions, rings_upper = reparar_solucion(nueva, D, C, anterior, cambios, **KW)
+
+    atendidas = sorted(t for v in assignments.values() for t in v)
+    assert atendidas == list(range(4, len(nueva)))
+    for c, s in solutions.items():
+        ruta = s["route"]
+        assert ruta[0] == ruta[-1] == c
+        assert sorted(ruta[1:-1]) == assignments[c]
+        assert s["objetivo"] == pytest.approx(0.4 * s["distancia"] + 0.6 * s["costo_combustible"])
+        assert rings_upper[c] and rings_upper[c] == sorted(rings_upper[c])
+
+    cambiadas = {"Tienda 5", "Tienda 10", "Tienda nueva"}
+    for c, s in solucion[1].items():
+        antes = _nombres(tiendas, s["route"])
+        if cambiadas.isdisjoint(antes) and cambiadas.isdisjoint(
+                _nombres(nueva, solutions[c]["route"])):
+            assert _nombres(nueva, solutions[c]["route"]) == antes
+
+
+def test_repair_without_changes_returns_the_same_routes(resuelta):
+    tiendas, solucion, guardado = resuelta
+    _, D, C = _datos(tiendas)
+    cambios = detectar_cambios(tiendas, tiendas)
+    assignments, solutions, _ = reparar_solucion(tiendas, D, C, guardado, cambios, **KW)
+    assert assignments == solucion[0]
+    assert {c: s["route"] for c, s in solutions.items()} == {
+        c: s["route"] for c, s in solucion[1].items()}
+
+
+def test_changed_centers_are_rejected(resuelta):
+    tiendas, solucion, _ = resuelta
+    nueva = tiendas.iloc[1:].reset_index(drop=True)
+    _, D, C = _datos(nueva)
+    with pytest.raises(ValueError, match="centros cambiaron"):
+        reparar_solucion(nueva, D, C, solucion, detectar_cambios(tiendas, nueva), **KW)
+
+
+def test_result_without_store_table_still_loads(resuelta):
+    _, solucion, guardado = resuelta
+    os.remove(os.path.join(guardado, "Tiendas.csv"))
+    assert leer_resultado(guardado)["tiendas"] is None
+    assert leer_solucion(guardado)[0] == solucion[0]
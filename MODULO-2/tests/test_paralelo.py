@@ -0,0 +1,96 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from Modulos import paralelo
+from Modulos.benchmark import generar_instancia
+from Modulos.paralelo import resolver_rutas, semilla_ruta, submatriz_costo
+from Modulos.solucion import calcular_solucion
+
+
+def _trabajos(n_centros, n_tiendas, reinicios, semilla=11):
+    rng = np.random.default_rng(semilla)
+    grupos = np.array_split(n_centros + rng.permutation(n_tiendas), n_centros)
+    parametros = {"iteraciones": 2000, "convergencia": True}
+    return [(c, r, [c] + grupos[c].tolist(), semilla_ruta(semilla, c, r), parametros)
+            for c in range(n_centros) for r in range(reinicios)]
+
+
+@pytest.mark.parametrize("densa", [True, False])
+def test_parallel_matches_serial(densa):
+    _, D, C = generar_instancia(5, 150, "uniforme", semilla=4, densa=densa)
+    trabajos = _trabajos(5, 150, reinicios=3)
+    curvas_serie, curvas_paralelo = {}, {}
+    serie = resolver_rutas(D, C, 0.4, trabajos, procesos=1, curvas=curvas_serie)
+    en_paralelo = resolver_rutas(D, C, 0.4, trabajos, procesos=3, curvas=curvas_paralelo)
+
+    assert serie.keys() == en_paralelo.keys() == set(range(5))
+    for c in serie:
+        assert en_paralelo[c][0] == serie[c][0]
+        assert en_paralelo[c][1] == pytest.approx(serie[c][1])
+        assert [p[2] for p in curvas_paralelo[c]] == pytest.approx(
+            [p[2] for p in curvas_serie[c]])
+
+
+def test_restarts_share_one_submatrix_per_center(monkeypatch):
+    _, D, C = generar_instancia(4, 120, "uniforme", semilla=6, densa=True)
+    trabajos = _trabajos(4, 120, reinicios=3)
+    recibidas, armadas = [], []
+    original = paralelo.submatriz_costo
+
+    def submatriz_costo(D, C, alpha, nodos):
+        armadas.append(len(nodos))
+        return original(D, C, alpha, nodos)
+
+    class Pool:
+        def __init__(self, max_workers):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, funcion, matriz, trabajo):
+            from concurrent.futures import Future
+            recibidas.append((trabajo[0], matriz))
+            futuro = Future()
+            futuro.set_result(funcion(matriz, trabajo))
+            return futuro
+
+    monkeypatch.setattr(paralelo, "submatriz_costo", submatriz_costo)
+    monkeypatch.setattr(paralelo, "ProcessPoolExecutor", Pool)
+    resolver_rutas(D, C, 0.4, trabajos, procesos=2)
+
+    tamanos = {t[0]: len(t[2]) for t in trabajos}
+    assert sorted(armadas) == sorted(tamanos.values())
+    descriptores = {}
+    for centro, (nombre, forma, _) in recibidas:
+        assert forma == (tamanos[centro], tamanos[centro])
+        descriptores.setdefault(centro, set()).add(nombre)
+    assert all(len(nombres) == 1 for nombres in descriptores.values())
+    # Los bloques se liberan al terminar.
+    for (nombre,) in descriptores.values():
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=nombre)
+
+
+def test_submatrix_of_dense_and_lazy_inputs_agree():
+    _, D, C = generar_instancia(2, 30, semilla=8, densa=False)
+    nodos = [0, 5, 9, 31]
+    esperado = 0.4 * np.asarray(D)[np.ix_(nodos, nodos)] + 0.6 * np.asarray(C)[np.ix_(nodos, nodos)]
+    np.testing.assert_allclose(submatriz_costo(D, C, 0.4, nodos), esperado)
+    np.testing.assert_allclose(
+        submatriz_costo(np.asarray(D, dtype=np.float32), np.asarray(C, dtype=np.float32),
+                        0.4, nodos), esperado, rtol=1e-6)
+
+
+def test_solution_does_not_depend_on_process_count(instancia):
+    tiendas, D, C = instancia
+    kw = {"iteraciones": 3000, "reinicios": 2, "semilla": 3}
+    a1, s1, r1 = calcular_solucion(tiendas, D, C, procesos=1, **kw)
+    a2, s2, r2 = calcular_solucion(tiendas, D, C, procesos=2, **kw)
+    assert a1 == a2 and r1 == r2
+    assert {c: s["route"] for c, s in s1.items()} == {c: s["route"] for c, s in s2.items()}
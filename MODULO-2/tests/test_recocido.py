@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from Modulos.recocido import (costo_ruta, delta_2opt, delta_oropt, delta_swap,
+                              recocido_ruta)
+
+
+def _matriz(m, semilla):
+    puntos = np.random.default_rng(semilla).random((m, 2)) * 100
+    return np.sqrt(((puntos[:, None] - puntos[None]) ** 2).sum(-1))
+
+
+def _costo(M, ruta):
+    return costo_ruta(M, np.append(ruta, ruta[0]))
+
+
+@pytest.mark.parametrize("semilla", range(5))
+@pytest.mark.parametrize("m", [5, 6, 12])
+def test_deltas_match_full_recomputation(m, semilla):
+    rng = np.random.default_rng(semilla)
+    M = _matriz(m, semilla)
+    ruta = np.concatenate(([0], 1 + rng.permutation(m - 1)))
+    antes = _costo(M, ruta)
+
+    for i in range(m):
+        for j in range(i + 2, m):
+            if i == 0 and j == m - 1:
+                continue
+            nueva = ruta.copy()
+            nueva[i + 1:j + 1] = nueva[i + 1:j + 1][::-1]
+            assert delta_2opt(M, ruta, i, j) == pytest.approx(_costo(M, nueva) - antes)
+
+    for i in range(1, m):
+        for j in range(i + 1, m):
+            nueva = ruta.copy()
+            nueva[i], nueva[j] = nueva[j], nueva[i]
+            assert delta_swap(M, ruta, i, j) == pytest.approx(_costo(M, nueva) - antes)
+
+    for largo in range(1, min(3, m - 3) + 1):
+        for s in range(1, m - largo + 1):
+            e = s + largo - 1
+            for k in range(m):
+                if s - 1 <= k <= e:
+                    continue
+                bloque = ruta[s:e + 1]
+                resto = np.concatenate((ruta[:s], ruta[e + 1:]))
+                destino = k + 1 if k < s else k + 1 - largo
+                derecho = np.concatenate((resto[:destino], bloque, resto[destino:]))
+                invertido = np.concatenate((resto[:destino], bloque[::-1], resto[destino:]))
+                esperado = (_costo(M, derecho) - antes, _costo(M, invertido) - antes)
+                assert delta_oropt(M, ruta, s, e, k) == pytest.approx(esperado)
+
+
+def test_annealing_improves_nearest_neighbour_and_keeps_a_valid_cycle():
+    M = _matriz(80, 3)
+    inicial, costo_inicial = recocido_ruta(M, iteraciones=0)
+    ruta, costo = recocido_ruta(M, iteraciones=40000, semilla=1)
+
+    assert ruta[0] == ruta[-1] == 0
+    assert sorted(ruta[:-1]) == list(range(80))
+    assert costo == pytest.approx(costo_ruta(M, ruta))
+    assert costo < costo_inicial
+
+
+def test_same_seed_same_route():
+    M = _matriz(40, 4)
+    assert recocido_ruta(M, iteraciones=5000, semilla=9) == recocido_ruta(
+        M, iteraciones=5000, semilla=9)
+
+
+def test_time_limit_and_convergence_curve():
+    M = _matriz(60, 5)
+    curva = []
+    recocido_ruta(M, iteraciones=10 ** 9, semilla=1, tiempo_max=0.2, convergencia=curva)
+    assert curva[0][0] == 0
+    assert curva[-1][1] < 5.0
+    mejores = [costo for _, _, costo in curva]
+    assert mejores == sorted(mejores, reverse=True)
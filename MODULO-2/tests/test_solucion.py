@@ -0,0 +1,58 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from Modulos.benchmark import generar_instancia
+from Modulos.recocido import costo_combinado, costo_ruta
+from Modulos.solucion import calcular_solucion
+
+
+def _resolver(tiendas, D, C, **kw):
+    kw = {"iteraciones": 3000, "semilla": 5, "procesos": 1, **kw}
+    return calcular_solucion(tiendas, D, C, **kw)
+
+
+def test_combined_cost_keeps_dtype_and_matches_dense_formula():
+    _, D, C = generar_instancia(2, 20, semilla=1, densa=True)
+    D32, C32 = D.astype(np.float32), C.astype(np.float32)
+    M = costo_combinado(D32, C32, 0.4)
+    assert M.D is D32 and M.C is C32
+    filas, columnas = np.array([0, 3, 5]), np.array([1, 2])
+    esperado = 0.4 * D32[np.ix_(filas, columnas)] + 0.6 * C32[np.ix_(filas, columnas)]
+    np.testing.assert_allclose(M[np.ix_(filas, columnas)], esperado)
+    with pytest.raises(ValueError):
+        costo_combinado(D, C[:5, :5], 0.4)
+
+
+def test_memmap_float32_inputs_are_not_copied_to_a_full_matrix(tmp_path):
+    tiendas, D, C = generar_instancia(10, 1500, "uniforme", semilla=2, densa=True)
+    n = len(tiendas)
+    mapas = []
+    for nombre, m in (("D", D), ("C", C)):
+        mapa = np.lib.format.open_memmap(tmp_path / f"{nombre}.npy", mode="w+",
+                                         dtype=np.float32, shape=m.shape)
+        mapa[...] = m
+        mapa.flush()
+        mapas.append(np.load(tmp_path / f"{nombre}.npy", mmap_mode="r"))
+
+    tracemalloc.start()
+    try:
+        assignments, solutions, _ = _resolver(tiendas, *mapas, iteraciones=500)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert pico < n * n * 4
+    assert sum(len(v) for v in assignments.values()) == 1500
+    for s in solutions.values():
+        assert s["distancia"] == pytest.approx(costo_ruta(mapas[0], s["route"]))
+
+
+def test_float32_and_float64_inputs_give_the_same_assignment():
+    tiendas, D, C = generar_instancia(3, 80, semilla=3, densa=True)
+    a64, s64, _ = _resolver(tiendas, D, C)
+    a32, s32, _ = _resolver(tiendas, D.astype(np.float32), C.astype(np.float32))
+    assert a64 == a32
+    for c in s64:
+        assert s32[c]["objetivo"] == pytest.approx(s64[c]["objetivo"], rel=1e-3)
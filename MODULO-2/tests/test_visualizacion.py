@@ -0,0 +1,77 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from Modulos import visualizacion  # noqa: E402
+from Modulos.solucion import calcular_solucion  # noqa: E402
+from Modulos.visualizacion import (_etiquetas, agregar_fondo, preparar_mapa,  # noqa: E402
+                                   renderizar_centros)
+
+
+@pytest.fixture
+def solucion(instancia):
+    tiendas, D, C = instancia
+    return (tiendas, *calcular_solucion(tiendas, D, C, iteraciones=1000, procesos=1))
+
+
+def test_projection_is_reused_for_the_same_table(instancia):
+    tiendas = instancia[0]
+    mapa = preparar_mapa(tiendas)
+    assert preparar_mapa(tiendas) is mapa
+    assert preparar_mapa(mapa) is mapa
+    assert preparar_mapa(tiendas.copy()) is not mapa
+    assert mapa.es_centro.sum() == 4 and mapa.es_tienda.sum() == 60
+
+
+def test_labels_are_drawn_per_digit_not_per_node(instancia):
+    mapa = preparar_mapa(instancia[0])
+    fig, ax = plt.subplots()
+    _etiquetas(ax, mapa, np.arange(len(mapa)))
+    assert not ax.texts
+    lineas = ax.get_lines()
+    # 64 nodos: 9 números de un dígito y 55 de dos -> 9 + 10 + 10 marcadores como máximo.
+    assert len(lineas) <= 29
+    assert sum(len(linea.get_xdata()) for linea in lineas) == 9 + 2 * 55
+    plt.close(fig)
+
+
+def test_too_many_labels_are_skipped(instancia, monkeypatch):
+    monkeypatch.setattr(visualizacion, "ETIQUETAS_MAX", 10)
+    fig, ax = plt.subplots()
+    _etiquetas(ax, preparar_mapa(instancia[0]), np.arange(64))
+    assert not ax.get_lines()
+    plt.close(fig)
+
+
+def test_basemap_uses_the_disk_cache_and_tolerates_no_network(monkeypatch, capsys):
+    llamadas = []
+
+    def sin_red(ax, **kw):
+        llamadas.append(kw)
+        raise OSError("sin red")
+
+    monkeypatch.setattr(visualizacion.cx, "set_cache_dir", llamadas.append)
+    monkeypatch.setattr(visualizacion.cx, "add_basemap", sin_red)
+    fig, ax = plt.subplots()
+    agregar_fondo(ax)
+    plt.close(fig)
+    assert llamadas[0] == visualizacion.CARPETA_TESELAS
+    assert llamadas[1]["source"] is visualizacion.FUENTE_TESELAS
+    assert "sin fondo" in capsys.readouterr().out
+
+
+def test_maps_are_written(solucion, tmp_path):
+    tiendas, assignments, solutions, rings_upper = solucion
+    ruta = tmp_path / "mapa.png"
+    visualizacion.plot_rangos_rutas_nodos(tiendas, assignments, solutions, rings_upper,
+                                          save_path=str(ruta), dpi=50, fondo=False)
+    assert ruta.stat().st_size > 0
+
+    rutas = renderizar_centros(tiendas, assignments, solutions, rings_upper,
+                               carpeta=str(tmp_path / "centros"), procesos=2, dpi=50,
+                               fondo=False)
+    assert [p.rsplit("_", 1)[1] for p in rutas] == ["1.png", "2.png", "3.png", "4.png"]
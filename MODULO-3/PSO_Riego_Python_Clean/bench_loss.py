@@ -0,0 +1,68 @@
+"""bench_loss.py — Benchmark de loss_sensor_layout (vectorizada) contra el ciclo original.
+Autor: Omar Bermejo Osuna & Diego Alberto Araujo
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.pso_placement import DEFAULT_MAX_MEMORY_MB, loss_sensor_layout, loss_sensor_layout_loop
+
+
+def _ints(text: str) -> list[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def _best_time(fn, repeats: int) -> float:
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de la función de pérdida")
+    parser.add_argument("--particles", default="40,200", help="Valores de P separados por comas")
+    parser.add_argument("--cells", default="1000,10000", help="Valores de G separados por comas")
+    parser.add_argument("--k", default="4,8", help="Valores de k separados por comas")
+    parser.add_argument("--mem-mb", type=float, default=DEFAULT_MAX_MEMORY_MB,
+                        help="Memoria máxima por bloque de celdas (MB)")
+    parser.add_argument("--offset", type=float, default=0.0,
+                        help="Suma este valor a las coordenadas (p. ej. 1e7 = metros proyectados)")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones (se toma el mínimo)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'P':>5} {'G':>7} {'k':>3} {'ciclo (s)':>10} {'f64 (s)':>9} {'f32 (s)':>9} "
+          f"{'x f64':>7} {'x f32':>7} {'err f64':>9} {'err f32':>9}")
+    for P in _ints(args.particles):
+        for G in _ints(args.cells):
+            for k in _ints(args.k):
+                grid_xy = rng.random((G, 2)) * 1000.0 + args.offset
+                weights = rng.random(G)
+                X = rng.random((P, 2 * k)) * 1000.0 + args.offset
+
+                ref = loss_sensor_layout_loop(X, k, grid_xy, weights)
+                f64 = loss_sensor_layout(X, k, grid_xy, weights, max_memory_mb=args.mem_mb)
+                f32 = loss_sensor_layout(X, k, grid_xy, weights, max_memory_mb=args.mem_mb,
+                                         dtype=np.float32)
+                t_loop = _best_time(lambda: loss_sensor_layout_loop(X, k, grid_xy, weights),
+                                    args.repeats)
+                t_f64 = _best_time(lambda: loss_sensor_layout(
+                    X, k, grid_xy, weights, max_memory_mb=args.mem_mb), args.repeats)
+                t_f32 = _best_time(lambda: loss_sensor_layout(
+                    X, k, grid_xy, weights, max_memory_mb=args.mem_mb, dtype=np.float32),
+                    args.repeats)
+                err64 = np.max(np.abs(f64 - ref) / np.abs(ref))
+                err32 = np.max(np.abs(f32 - ref) / np.abs(ref))
+                print(f"{P:>5} {G:>7} {k:>3} {t_loop:>10.4f} {t_f64:>9.4f} {t_f32:>9.4f} "
+                      f"{t_loop / t_f64:>7.1f} {t_loop / t_f32:>7.1f} {err64:>9.1e} {err32:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import geopandas as gpd
 from pyswarms.single import GlobalBestPSO
 
 from src.features import load_points, grid_from_bbox, weight_map
-from src.pso_placement import loss_sensor_layout, build_bounds
+from src.pso_placement import DEFAULT_MAX_MEMORY_MB, loss_sensor_layout, build_bounds
 
 
 def main() -> None:
@@ -23,6 +23,10 @@ def main() -> None:
     parser.add_argument("--lc", type=float, default=0.1, help="Peso de penalización por clustering")
     parser.add_argument("--cap", type=float, default=100.0, help="Radio máximo efectivo (m)")
     parser.add_argument("--out", default="sensors.geojson", help="Archivo GeoJSON de salida")
+    parser.add_argument("--mem-mb", type=float, default=DEFAULT_MAX_MEMORY_MB,
+                        help="Memoria máxima (MB) por bloque de celdas al evaluar el enjambre")
+    parser.add_argument("--float32", action="store_true",
+                        help="Evalúa las distancias en float32 (más rápido, menos preciso)")
     args = parser.parse_args()
 
     # Datos y capas
@@ -36,9 +40,12 @@ def main() -> None:
     minx, miny, maxx, maxy = grid.total_bounds
     lb, ub = build_bounds(args.k, minx, miny, maxx, maxy)
 
-    # Función objetivo para PSO
+    # Función objetivo para PSO (evalúa todo el enjambre a la vez)
+    dtype = np.float32 if args.float32 else np.float64
+
     def objective(X: np.ndarray) -> np.ndarray:
-        return loss_sensor_layout(X, args.k, grid_xy, w, lambda_cluster=args.lc, cap_radius=args.cap)
+        return loss_sensor_layout(X, args.k, grid_xy, w, lambda_cluster=args.lc, cap_radius=args.cap,
+                                  max_memory_mb=args.mem_mb, dtype=dtype)
 
     opt = GlobalBestPSO(
         n_particles=args.particles,
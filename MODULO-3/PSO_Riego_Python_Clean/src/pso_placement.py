@@ -7,6 +7,10 @@ import numpy as np
 from scipy.spatial.distance import cdist
 
 
+DEFAULT_MAX_MEMORY_MB = 1.0  # bloques chicos: los temporales caben en caché y es lo más rápido
+_TEMPORALES_COBERTURA = 3    # arreglos (P, g) vivos a la vez: mínimo, dx y dy
+
+
 def loss_sensor_layout(
     X: np.ndarray,
     k: int,
@@ -14,8 +18,22 @@ def loss_sensor_layout(
     weights: np.ndarray,
     lambda_cluster: float = 0.1,
     cap_radius: float = 100.0,
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    dtype: np.dtype = np.float64,
 ) -> np.ndarray:
-    """Calcula la pérdida para cada partícula.
+    """Calcula la pérdida para cada partícula, con todo el enjambre a la vez.
+
+    Las distancias celda-sensor de las P partículas se calculan por bloques
+    de g celdas, acumulando el mínimo (P, g) sensor por sensor; los
+    temporales de cada bloque no pasan de ``max_memory_mb`` (el valor por
+    defecto deja los bloques en caché; subirlo no acelera). Con
+    ``dtype=np.float64`` el resultado coincide con
+    :func:`loss_sensor_layout_loop` (mismas operaciones que ``cdist``; solo
+    cambia el orden de las sumas). ``np.float32`` usa la mitad de memoria y
+    es más rápido: las coordenadas se centran en la media de la grilla (en
+    float64) antes de convertirlas, así cada distancia tiene error relativo
+    de ~6e-8 (el épsilon de float32) y la pérdida, del orden de 1e-8, aunque
+    las coordenadas estén en metros proyectados (~1e6-1e7).
 
     Parámetros
     ----------
@@ -31,12 +49,86 @@ def loss_sensor_layout(
         Peso de penalización por agrupamiento.
     cap_radius : float
         Radio máximo efectivo para limitar distancias en cobertura.
+    max_memory_mb : float
+        Memoria máxima (MB) para los temporales de cada bloque de celdas.
+    dtype : np.float64 o np.float32
+        Precisión de las distancias (las sumas siempre van en float64).
 
     Retorna
     -------
     losses : (n_particles,)
         Pérdida por partícula.
     """
+    dtype = np.dtype(dtype)
+    X = np.asarray(X, dtype=float)
+    n_particles = X.shape[0]
+    grid_xy = np.asarray(grid_xy, dtype=float)
+    # Las distancias no cambian al trasladar; centrar en float64 evita perder
+    # los decimales al pasar coordenadas grandes (UTM, Web Mercator) a float32.
+    origin = grid_xy.mean(axis=0) if dtype != np.float64 and len(grid_xy) else 0.0
+    sensors = (X.reshape(n_particles, k, 2) - origin).astype(dtype, copy=False)
+    sx, sy = sensors[:, :, 0, None], sensors[:, :, 1, None]  # (P,k,1)
+
+    grid_xy = (grid_xy - origin).astype(dtype, copy=False)
+    weights = np.asarray(weights, dtype=float)
+    total_weight = weights.sum()
+    if total_weight == 0.0:
+        raise ZeroDivisionError("Weights sum to zero, can't be normalized")
+
+    # Cobertura: distancia a sensor más cercano por celda, acotada y ponderada.
+    # Por bloques de g celdas: mínimo acumulado (P, g) recorriendo los k
+    # sensores, con operaciones contiguas en lugar de reducir un eje corto.
+    bytes_per_cell = n_particles * dtype.itemsize * _TEMPORALES_COBERTURA
+    chunk = int(max_memory_mb * 2**20 // max(bytes_per_cell, 1))
+    chunk = max(1, chunk)
+    weighted = np.zeros(n_particles, dtype=float)
+    for start in range(0, grid_xy.shape[0], chunk):
+        gx = grid_xy[None, start:start + chunk, 0]  # (1,g)
+        gy = grid_xy[None, start:start + chunk, 1]
+        d2min = dx = dy = None
+        for j in range(k):
+            dx = np.subtract(gx, sx[:, j], out=dx)  # (P,g)
+            dy = np.subtract(gy, sy[:, j], out=dy)
+            np.multiply(dx, dx, out=dx)
+            np.multiply(dy, dy, out=dy)
+            np.add(dx, dy, out=dx)
+            if d2min is None:
+                d2min, dx = dx, None
+            else:
+                np.minimum(d2min, dx, out=d2min)
+        # sqrt es monótona: sqrt(min(d²)) == min(sqrt(d²)), como en cdist.
+        dmin = np.sqrt(d2min, out=d2min)
+        np.minimum(dmin, cap_radius, out=dmin)
+        weighted += dmin.astype(float, copy=False) @ weights[start:start + chunk]
+    loss_cov = weighted / total_weight
+
+    # Penalización por clustering (1/dist) promedio entre sensores
+    if k > 1:
+        iu, ju = np.triu_indices(k, 1)
+        pdx = sensors[:, iu, 0] - sensors[:, ju, 0]  # (P, k(k-1)/2)
+        pdy = sensors[:, iu, 1] - sensors[:, ju, 1]
+        D = np.sqrt(pdx * pdx + pdy * pdy).astype(float, copy=False)
+        D[D == 0.0] = np.inf
+        cluster_pen = (1.0 / D).mean(axis=1)
+    else:
+        cluster_pen = np.zeros(n_particles)
+
+    return loss_cov + lambda_cluster * cluster_pen
+
+
+def loss_sensor_layout_loop(
+    X: np.ndarray,
+    k: int,
+    grid_xy: np.ndarray,
+    weights: np.ndarray,
+    lambda_cluster: float = 0.1,
+    cap_radius: float = 100.0,
+) -> np.ndarray:
+    """Versión original, partícula por partícula con ``cdist``.
+
+    Se conserva como referencia para las pruebas y el benchmark de
+    :func:`loss_sensor_layout`; los parámetros son los mismos.
+    """
     n_particles = X.shape[0]
     losses = np.zeros(n_particles, dtype=float)
 
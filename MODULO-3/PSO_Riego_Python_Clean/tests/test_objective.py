@@ -1,5 +1,8 @@
+import tracemalloc
+
 import numpy as np
-from src.pso_placement import loss_sensor_layout
+import pytest
+from src.pso_placement import loss_sensor_layout, loss_sensor_layout_loop
 
 
 def test_loss_shapes():
@@ -11,3 +14,57 @@ def test_loss_shapes():
     L = loss_sensor_layout(X, k, grid_xy, weights)
     assert L.shape == (3,)
     assert np.all(np.isfinite(L))
+
+
+@pytest.mark.parametrize("k", [1, 2, 6])
+def test_loss_matches_loop(k):
+    rng = np.random.default_rng(k)
+    G = 503
+    grid_xy = rng.random((G, 2)) * 1000.0
+    weights = rng.random(G)
+    X = rng.random((17, 2 * k)) * 1000.0
+    if k > 1:
+        X[0, 2:4] = X[0, 0:2]  # dos sensores en el mismo punto
+    ref = loss_sensor_layout_loop(X, k, grid_xy, weights, lambda_cluster=0.3, cap_radius=80.0)
+    L = loss_sensor_layout(X, k, grid_xy, weights, lambda_cluster=0.3, cap_radius=80.0)
+    L_chunks = loss_sensor_layout(X, k, grid_xy, weights, lambda_cluster=0.3, cap_radius=80.0,
+                                  max_memory_mb=0.001)
+    L32 = loss_sensor_layout(X, k, grid_xy, weights, lambda_cluster=0.3, cap_radius=80.0,
+                             dtype=np.float32)
+    np.testing.assert_allclose(L, ref, rtol=1e-12)
+    np.testing.assert_allclose(L_chunks, ref, rtol=1e-12)
+    np.testing.assert_allclose(L32, ref, rtol=1e-5)
+
+
+def test_float32_at_projected_scale():
+    # Coordenadas en Web Mercator (EPSG:3857, ~1e7 m): sin centrar, float32
+    # redondea a ~1 m y el error relativo sería del orden de 1e-2.
+    rng = np.random.default_rng(7)
+    origin = np.array([-1.17e7, 2.87e6])
+    G, k = 2000, 4
+    grid_xy = origin + rng.random((G, 2)) * 2000.0
+    weights = rng.random(G)
+    X = np.tile(origin, k) + rng.random((25, 2 * k)) * 2000.0
+    ref = loss_sensor_layout_loop(X, k, grid_xy, weights, cap_radius=300.0)
+    L32 = loss_sensor_layout(X, k, grid_xy, weights, cap_radius=300.0, dtype=np.float32)
+    L64 = loss_sensor_layout(X, k, grid_xy, weights, cap_radius=300.0)
+    np.testing.assert_allclose(L64, ref, rtol=1e-12)
+    np.testing.assert_allclose(L32, ref, rtol=1e-6)
+
+
+def test_max_memory_bounds_block_temporaries():
+    rng = np.random.default_rng(3)
+    G, k, P = 20000, 3, 50
+    grid_xy = rng.random((G, 2)) * 1000.0
+    weights = rng.random(G)
+    X = rng.random((P, 2 * k)) * 1000.0
+
+    peaks = {}
+    for mb in (0.25, 64.0):
+        tracemalloc.start()
+        loss_sensor_layout(X, k, grid_xy, weights, max_memory_mb=mb)
+        peaks[mb] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    # Con 64 MB todo cabe en un bloque: (P, G) x 3 temporales en float64.
+    assert peaks[64.0] >= P * G * 8 * 3
+    assert peaks[0.25] < 0.25 * 2**20 + 2 * grid_xy.nbytes